@@ -0,0 +1,63 @@
+"""Compare fanning out jobs with one enqueue_job call per job against the pipelined bulk enqueue.
+
+Runs against the Redis configured in REDIS_URL. Jobs are written to a dedicated queue that is deleted afterwards, so
+no worker picks them up. Round-trip time dominates, so run it against a remote Redis for realistic numbers.
+
+Usage (from the repo root):
+    python -m scripts.benchmarks.bulk_enqueue_benchmark --jobs 100 500
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from arq import ArqRedis
+from arq.constants import job_key_prefix
+
+from src.infra.arq.bulk_enqueue import JobSpec, enqueue_jobs
+from src.infra.arq.redis_pool import RedisPool
+
+
+async def _cleanup(redis: ArqRedis, queue_name: str) -> None:
+    job_ids = await redis.zrange(queue_name, 0, -1)
+    if job_ids:
+        await redis.delete(*(job_key_prefix + job_id.decode() for job_id in job_ids))
+    await redis.delete(queue_name)
+
+
+async def run(jobs: list[int]) -> None:
+    """Enqueue every job count serially and in bulk and print the fan-out latency."""
+    redis = await RedisPool.create_redis_pool()
+    queue_name = f"benchmark:{uuid4().hex}"
+    payload = ["x" * 2048]
+    print(f"{'jobs':>6}{'serial ms':>12}{'bulk ms':>10}{'speedup':>9}")
+    try:
+        for count in jobs:
+            started = time.perf_counter()
+            for _ in range(count):
+                await redis.enqueue_job("benchmark", payload, _queue_name=queue_name)
+            serial_ms = (time.perf_counter() - started) * 1000
+            await _cleanup(redis, queue_name)
+
+            started = time.perf_counter()
+            await enqueue_jobs(redis, [JobSpec("benchmark", (payload,), queue_name=queue_name) for _ in range(count)])
+            bulk_ms = (time.perf_counter() - started) * 1000
+            await _cleanup(redis, queue_name)
+
+            print(f"{count:>6}{serial_ms:>12.1f}{bulk_ms:>10.1f}{serial_ms / bulk_ms:>9.1f}")
+    finally:
+        await _cleanup(redis, queue_name)
+        await redis.aclose()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[100, 500])
+    args = parser.parse_args()
+    asyncio.run(run(args.jobs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Compare the per-user and sharded Chroma collection layouts at different tenant counts.
+
+Runs against an in-process Chroma instance with random embeddings, so no embedding provider or server is needed.
+Every layout and tenant count runs in a fresh process, memory is reported as the growth of that process's peak RSS.
+
+Usage (from the repo root):
+    python -m scripts.benchmarks.collection_layout_benchmark --tenants 1000 10000 --shard-count 16
+"""
+
+import argparse
+import random
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from uuid import UUID, uuid4
+
+import chromadb
+from chromadb.config import Settings
+
+from src.models.vector_models import CollectionLayout, VectorCollection
+
+
+@dataclass
+class LayoutResult:
+    """Measurements of a single layout run."""
+
+    layout: CollectionLayout
+    tenants: int
+    collections: int
+    ingest_seconds: float
+    query_p50_ms: float
+    query_p95_ms: float
+    peak_rss_delta_mb: float
+
+
+def _random_vectors(count: int, dim: int) -> list[list[float]]:
+    return [[random.random() for _ in range(dim)] for _ in range(count)]  # noqa: S311
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_layout(
+    layout: CollectionLayout,
+    user_ids: list[UUID],
+    docs_per_tenant: int,
+    dim: int,
+    shard_count: int,
+    queries: int,
+    seed: int,
+) -> LayoutResult:
+    """Ingest docs_per_tenant vectors for every tenant and measure filtered query latency."""
+    random.seed(seed)
+    client = chromadb.Client(Settings(anonymized_telemetry=False, allow_reset=True))
+    client.reset()
+    rss_before = _peak_rss_mb()
+
+    def collection_for(user_id: UUID) -> VectorCollection:
+        return VectorCollection(
+            user_id=user_id, layout=layout, shard_count=shard_count if layout == CollectionLayout.SHARDED else 1
+        )
+
+    started = time.perf_counter()
+    collections = {}
+    for user_id in user_ids:
+        vector_collection = collection_for(user_id)
+        collection = collections.get(vector_collection.name)
+        if collection is None:
+            collection = client.get_or_create_collection(vector_collection.name)
+            collections[vector_collection.name] = collection
+        collection.add(
+            ids=[str(uuid4()) for _ in range(docs_per_tenant)],
+            embeddings=_random_vectors(docs_per_tenant, dim),
+            documents=[f"document {i}" for i in range(docs_per_tenant)],
+            metadatas=[{"user_id": str(user_id), "source_id": "benchmark"} for _ in range(docs_per_tenant)],
+        )
+    ingest_seconds = time.perf_counter() - started
+
+    latencies = []
+    for user_id in random.sample(user_ids, min(queries, len(user_ids))):
+        vector_collection = collection_for(user_id)
+        where = {"user_id": str(user_id)} if vector_collection.is_shared else None
+        started = time.perf_counter()
+        collections[vector_collection.name].query(
+            query_embeddings=_random_vectors(1, dim), n_results=min(5, docs_per_tenant), where=where
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    return LayoutResult(
+        layout=layout,
+        tenants=len(user_ids),
+        collections=len(collections),
+        ingest_seconds=ingest_seconds,
+        query_p50_ms=statistics.median(latencies),
+        query_p95_ms=latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0],
+        peak_rss_delta_mb=_peak_rss_mb() - rss_before,
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--docs-per-tenant", type=int, default=20)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--shard-count", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(f"{'layout':<10}{'tenants':>9}{'colls':>8}{'ingest s':>10}{'p50 ms':>9}{'p95 ms':>9}{'peak MB':>9}")
+    for tenants in args.tenants:
+        user_ids = [uuid4() for _ in range(tenants)]
+        for layout in CollectionLayout:
+            # A fresh process per run, ru_maxrss never goes down, so a shared process reports the previous run's peak
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                result = executor.submit(
+                    run_layout,
+                    layout,
+                    user_ids,
+                    args.docs_per_tenant,
+                    args.dim,
+                    args.shard_count,
+                    args.queries,
+                    args.seed,
+                ).result()
+            print(
+                f"{result.layout.value:<10}{result.tenants:>9}{result.collections:>8}{result.ingest_seconds:>10.2f}"
+                f"{result.query_p50_ms:>9.2f}{result.query_p95_ms:>9.2f}{result.peak_rss_delta_mb:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
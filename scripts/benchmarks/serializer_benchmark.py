@@ -0,0 +1,185 @@
+"""Measure throughput and payload size of the ARQ job serializer for realistic job arguments.
+
+Every serializer configuration (generic and schema mode, each with and without compression) encodes and decodes the
+arguments of the content processing jobs: document batches, chunk batches, task results and processing events,
+wrapped the way ARQ wraps job arguments. By default synthetic markdown pages are generated, pass --documents to use
+a JSON file with a list of crawled documents instead (e.g. an export of the documents table).
+
+Usage (from the repo root):
+    python -m scripts.benchmarks.serializer_benchmark --batch-sizes 10 100 500
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from src.infra.arq.serializer import Compression, MsgpackSerializer, zstandard
+from src.models.content_models import Chunk, ContentProcessingEvent, Document, DocumentMetadata, SourceStage
+from src.models.task_models import KollektivTaskResult, KollektivTaskStatus
+
+WORDS = "the a vector index query chunk document source token embedding search retrieval model async redis job".split()
+
+
+@dataclass
+class SerializerResult:
+    """Measurements of a single serializer configuration on a single payload."""
+
+    serializer: str
+    payload: str
+    raw_bytes: int
+    redis_bytes: int
+    encode_ms: float
+    decode_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.redis_bytes
+
+    @property
+    def encode_mb_s(self) -> float:
+        return self.raw_bytes / 1024 / 1024 / (self.encode_ms / 1000)
+
+    @property
+    def decode_mb_s(self) -> float:
+        return self.raw_bytes / 1024 / 1024 / (self.decode_ms / 1000)
+
+
+def _paragraph(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words)).capitalize() + "."  # noqa: S311
+
+
+def synthetic_documents(count: int) -> list[Document]:
+    """Generate markdown pages with headers, prose and code blocks."""
+    source_id = uuid4()
+    documents = []
+    for i in range(count):
+        sections = [
+            f"## Section {s}\n\n{_paragraph(80)}\n\n```python\nawait client.query(index={s})\n```" for s in range(6)
+        ]
+        documents.append(
+            Document(
+                source_id=source_id,
+                content=f"# Page {i}\n\n" + "\n\n".join(sections),
+                metadata=DocumentMetadata(title=f"Page {i}", source_url=f"https://docs.example.com/page-{i}"),
+            )
+        )
+    return documents
+
+
+def load_documents(path: Path) -> list[Document]:
+    """Load documents from a JSON list of document dicts."""
+    return [Document.model_validate(item) for item in json.loads(path.read_text())]
+
+
+def split_into_chunks(documents: list[Document], chunk_chars: int = 1000) -> list[Chunk]:
+    """Split documents into fixed size chunks, close enough to the chunker output for payload size purposes."""
+    chunks = []
+    for document in documents:
+        for start in range(0, len(document.content), chunk_chars):
+            text = document.content[start : start + chunk_chars]
+            chunks.append(
+                Chunk(
+                    source_id=document.source_id,
+                    document_id=document.document_id,
+                    headers={"h1": document.metadata.title},
+                    text=text,
+                    token_count=len(text.split()),
+                    page_title=document.metadata.title,
+                    page_url=document.metadata.source_url,
+                )
+            )
+    return chunks
+
+
+def job(function: str, *args: Any, **kwargs: Any) -> dict[str, Any]:
+    """Wrap arguments the way ARQ passes a job to the serializer."""
+    return {"t": 1, "f": function, "a": list(args), "k": kwargs, "et": int(time.time() * 1000)}
+
+
+def build_payloads(documents: list[Document]) -> dict[str, dict[str, Any]]:
+    """Job payloads of the content processing pipeline for a batch of documents."""
+    source_id = documents[0].source_id
+    return {
+        f"{len(documents)} documents": job("process_documents", documents, user_id=uuid4(), source_id=source_id),
+        f"{len(documents)} doc chunks": job("persist_chunks", split_into_chunks(documents), uuid4(), uuid4().hex),
+        "task result": {
+            "r": KollektivTaskResult(
+                status=KollektivTaskStatus.SUCCESS,
+                message="Chunks persisted",
+                data={"chunk_count": 120, "source_id": str(source_id)},
+            ),
+            "s": True,
+        },
+        "event": {"event": ContentProcessingEvent(source_id=source_id, stage=SourceStage.CHUNKS_GENERATED)},
+    }
+
+
+def build_serializers(threshold: int) -> dict[str, MsgpackSerializer]:
+    """Every mode, uncompressed and with each available codec."""
+    codecs = [Compression.ZLIB] + ([Compression.ZSTD] if zstandard is not None else [])
+    serializers = {}
+    for mode in ("generic", "schema"):
+        serializers[mode] = MsgpackSerializer(compression_threshold=0, mode=mode)
+        for codec in codecs:
+            serializers[f"{mode}+{codec.name.lower()}"] = MsgpackSerializer(
+                compression_threshold=threshold, compression=codec, mode=mode
+            )
+    return serializers
+
+
+def measure(serializer: MsgpackSerializer, name: str, payload_name: str, payload: Any, repeat: int) -> SerializerResult:
+    """Serialize and deserialize a payload `repeat` times and report median timings."""
+    encode, decode = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = serializer.serializer(payload)
+        encode.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        serializer.deserializer(data)
+        decode.append((time.perf_counter() - started) * 1000)
+
+    raw_bytes = len(MsgpackSerializer(compression_threshold=0, mode="generic").serializer(payload))
+    return SerializerResult(
+        name, payload_name, raw_bytes, len(data), statistics.median(encode), statistics.median(decode)
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--documents", type=Path, help="JSON file with a list of documents")
+    parser.add_argument("--threshold", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    serializers = build_serializers(args.threshold)
+    corpus = load_documents(args.documents) if args.documents else synthetic_documents(max(args.batch_sizes))
+
+    print(
+        f"{'payload':<16}{'serializer':<14}{'raw KB':>9}{'redis KB':>10}{'ratio':>7}"
+        f"{'enc ms':>9}{'dec ms':>9}{'enc MB/s':>10}{'dec MB/s':>10}"
+    )
+    payloads: dict[str, Any] = {}
+    for batch_size in args.batch_sizes:
+        payloads.update(build_payloads(corpus[:batch_size]))
+    for payload_name, payload in payloads.items():
+        for name, serializer in serializers.items():
+            result = measure(serializer, name, payload_name, payload, args.repeat)
+            print(
+                f"{result.payload:<16}{result.serializer:<14}{result.raw_bytes / 1024:>9.1f}"
+                f"{result.redis_bytes / 1024:>10.1f}{result.ratio:>7.2f}{result.encode_ms:>9.3f}"
+                f"{result.decode_ms:>9.3f}{result.encode_mb_s:>10.1f}{result.decode_mb_s:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Local stand-in for the Firecrawl v1 crawl API, for integration and load tests of the ingestion pipeline.
+
+Crawls are served from a synthetic corpus generated on the fly, so memory stays flat regardless of crawl size. For
+every crawl the stub sends crawl.started, one crawl.page per page at a configurable rate, and crawl.completed to the
+webhook of the crawl. It then serves the pages as paginated results like Firecrawl does, following `next` links.
+
+Endpoints:
+    POST /v1/crawl       start a crawl, honours `limit`, `webhook` and the x-idempotency-key header
+    GET  /v1/crawl/{id}  crawl status and results, paginated with `skip`
+
+Usage (from the repo root), then point the API at it with FIRECRAWL_API_URL=http://127.0.0.1:3002/v1:
+    python -m scripts.firecrawl_stub --port 3002 --page-rate 50 --page-bytes 20000
+"""
+
+import argparse
+import asyncio
+import random
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import uuid4
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Request
+
+WORDS = (
+    "crawler index vector chunk embedding token query retrieval source document summary pipeline worker queue "
+    "latency batch storage webhook schema payload cache request response async client server"
+).split()
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub.
+
+    Attributes:
+        page_bytes: Approximate size of the markdown of a page
+        page_rate: crawl.page webhooks sent per second, 0 for no throttling
+        results_page_size: Pages per results response, Firecrawl pages results by size instead
+        results_latency: Seconds added to every results response
+        webhook_concurrency: Webhooks in flight at once, Firecrawl delivers page webhooks concurrently
+        webhook_timeout: Seconds to wait for a webhook response
+        seed: Seed of the synthetic corpus
+    """
+
+    page_bytes: int = 5_000
+    page_rate: float = 20.0
+    results_page_size: int = 100
+    results_latency: float = 0.0
+    webhook_concurrency: int = 8
+    webhook_timeout: float = 30.0
+    seed: int = 0
+
+
+@dataclass
+class StubCrawl:
+    """A crawl served by the stub."""
+
+    crawl_id: str
+    url: str
+    limit: int
+    webhook: str | None
+    crawled: int = 0
+    status: str = "scraping"
+    webhooks: list[tuple[str, int]] = field(default_factory=list)  # (event type, response status) of sent webhooks
+
+
+def make_page(config: StubConfig, crawl: StubCrawl, index: int) -> dict[str, Any]:
+    """Page `index` of a crawl, in the format of Firecrawl's scrape results."""
+    rng = random.Random(f"{config.seed}:{crawl.crawl_id}:{index}")  # noqa: S311 - synthetic text, not security related
+    paragraphs = []
+    size = 0
+    while size < config.page_bytes:
+        paragraph = " ".join(rng.choices(WORDS, k=60)).capitalize() + "."
+        paragraphs.append(f"## Section {len(paragraphs) + 1}\n\n{paragraph}")
+        size += len(paragraph) + 20
+    url = f"{crawl.url.rstrip('/')}/page-{index}"
+    return {
+        "markdown": f"# Page {index}\n\n" + "\n\n".join(paragraphs),
+        "metadata": {
+            "title": f"Page {index}",
+            "description": f"Synthetic page {index} of {crawl.url}",
+            "sourceURL": url,
+            "og:url": url,
+            "statusCode": 200,
+        },
+    }
+
+
+class FirecrawlStub:
+    """Firecrawl-compatible app and the crawls it serves.
+
+    Args:
+        config: Behaviour of the stub
+        webhook_client: Client used to send webhooks, defaults to a client created with the first webhook
+    """
+
+    def __init__(self, config: StubConfig | None = None, webhook_client: httpx.AsyncClient | None = None):
+        self.config = config or StubConfig()
+        self.crawls: dict[str, StubCrawl] = {}
+        self.idempotency_keys: dict[str, str] = {}
+        self.webhook_client = webhook_client
+        self.tasks: set[asyncio.Task] = set()
+        self.errors: list[int] = []  # status codes returned by the next crawl submissions, to exercise retries
+        self.requests: list[tuple[dict[str, str], dict[str, Any]]] = []  # headers and body of crawl submissions
+
+        self.app = FastAPI(title="Firecrawl stub", lifespan=self.lifespan)
+        self.app.post("/v1/crawl")(self.start_crawl)
+        self.app.get("/v1/crawl/{crawl_id}")(self.get_crawl)
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        """Stop running crawls and close the webhook client on shutdown."""
+        yield
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.webhook_client is not None:
+            await self.webhook_client.aclose()
+
+    async def start_crawl(
+        self,
+        request: Request,
+        authorization: str | None = Header(None),
+        x_idempotency_key: str | None = Header(None),
+    ) -> dict[str, Any]:
+        """Start a crawl and its webhooks."""
+        body = await request.json()
+        self.requests.append((dict(request.headers), body))
+        if self.errors:
+            raise HTTPException(status_code=self.errors.pop(0), detail="Injected error")
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+        if x_idempotency_key in self.idempotency_keys:
+            crawl_id = self.idempotency_keys[x_idempotency_key]
+        else:
+            if not body.get("url"):
+                raise HTTPException(status_code=400, detail="url is required")
+            crawl = StubCrawl(
+                crawl_id=str(uuid4()), url=body["url"], limit=body.get("limit", 10), webhook=body.get("webhook")
+            )
+            crawl_id = crawl.crawl_id
+            self.crawls[crawl_id] = crawl
+            if x_idempotency_key:
+                self.idempotency_keys[x_idempotency_key] = crawl_id
+            task = asyncio.create_task(self.run_crawl(crawl))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return {"success": True, "id": crawl_id, "url": f"{request.base_url}v1/crawl/{crawl_id}"}
+
+    async def get_crawl(self, crawl_id: str, request: Request, skip: int = 0) -> dict[str, Any]:
+        """Status of a crawl with one page of its results."""
+        crawl = self.crawls.get(crawl_id)
+        if crawl is None:
+            raise HTTPException(status_code=404, detail="Crawl not found")
+        if self.config.results_latency:
+            await asyncio.sleep(self.config.results_latency)
+
+        end = min(skip + self.config.results_page_size, crawl.crawled)
+        next_url = f"{request.base_url}v1/crawl/{crawl_id}?skip={end}" if end < crawl.crawled else None
+        return {
+            "success": True,
+            "status": crawl.status,
+            "total": crawl.limit,
+            "completed": crawl.crawled,
+            "creditsUsed": crawl.crawled,
+            "next": next_url,
+            "data": [make_page(self.config, crawl, index) for index in range(skip, end)],
+        }
+
+    async def run_crawl(self, crawl: StubCrawl) -> None:
+        """Crawl the synthetic pages at the configured rate, sending the webhooks of the crawl."""
+        await self.send_webhook(crawl, "crawl.started")
+        semaphore = asyncio.Semaphore(self.config.webhook_concurrency)
+        interval = 1 / self.config.page_rate if self.config.page_rate else 0
+
+        async def send_page(index: int) -> None:
+            async with semaphore:
+                await self.send_webhook(crawl, "crawl.page", [make_page(self.config, crawl, index)])
+
+        pages = []
+        for index in range(crawl.limit):
+            crawl.crawled = index + 1
+            pages.append(asyncio.create_task(send_page(index)))
+            if interval:
+                await asyncio.sleep(interval)
+        await asyncio.gather(*pages)
+
+        crawl.status = "completed"
+        await self.send_webhook(crawl, "crawl.completed")
+
+    async def send_webhook(self, crawl: StubCrawl, event_type: str, data: list[dict[str, Any]] | None = None) -> None:
+        """Deliver a webhook of a crawl, recording the response status (0 if it could not be delivered)."""
+        if crawl.webhook is None:
+            return
+        if self.webhook_client is None:
+            self.webhook_client = httpx.AsyncClient(timeout=self.config.webhook_timeout)
+        payload = {"success": True, "type": event_type, "id": crawl.crawl_id, "data": data or []}
+        try:
+            response = await self.webhook_client.post(crawl.webhook, json=payload)
+            crawl.webhooks.append((event_type, response.status_code))
+        except httpx.HTTPError:
+            crawl.webhooks.append((event_type, 0))
+
+
+def main() -> None:
+    """Parse arguments and serve the stub."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3002)
+    parser.add_argument("--page-bytes", type=int, default=StubConfig.page_bytes)
+    parser.add_argument("--page-rate", type=float, default=StubConfig.page_rate, help="0 for no throttling")
+    parser.add_argument("--results-page-size", type=int, default=StubConfig.results_page_size)
+    parser.add_argument("--results-latency", type=float, default=StubConfig.results_latency)
+    parser.add_argument("--webhook-concurrency", type=int, default=StubConfig.webhook_concurrency)
+    parser.add_argument("--seed", type=int, default=StubConfig.seed)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        page_bytes=args.page_bytes,
+        page_rate=args.page_rate,
+        results_page_size=args.results_page_size,
+        results_latency=args.results_latency,
+        webhook_concurrency=args.webhook_concurrency,
+        seed=args.seed,
+    )
+    uvicorn.run(FirecrawlStub(config).app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
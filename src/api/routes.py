@@ -13,6 +13,7 @@ class Routes:
         """System routes (non-versioned)."""
 
         HEALTH = "/health"
+        METRICS = "/metrics"
         SENTRY_DEBUG = "/sentry-debug"
 
         class Webhooks:
@@ -32,7 +33,9 @@ class Routes:
             """Content management routes."""
 
             SOURCES = "/sources"
+            SOURCE = "/sources/{source_id}"
             SOURCE_EVENTS = "/sources/{source_id}/events"
+            SOURCE_REINDEX = "/sources/{source_id}/reindex"
 
         class Chat:
             """Chat routes."""
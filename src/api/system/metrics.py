@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.api.dependencies import RedisManagerDep
+from src.api.routes import CURRENT_API_VERSION, Routes
+from src.infra.arq.worker_metrics import WorkerMetrics, render_prometheus
+from src.infra.logger import get_logger
+
+logger = get_logger()
+
+router = APIRouter(prefix=CURRENT_API_VERSION)
+
+
+@router.get(
+    Routes.System.METRICS,
+    response_class=PlainTextResponse,
+    summary="Worker Metrics",
+    description="ARQ queue depth, job wait and run times, outcomes and payload sizes in the Prometheus text format.",
+)
+async def worker_metrics(redis_manager: RedisManagerDep) -> PlainTextResponse:
+    """Expose the metrics all ARQ workers flushed to Redis for scraping."""
+    client = await redis_manager.get_async_client()
+    snapshot = await WorkerMetrics(redis=client).snapshot()
+    return PlainTextResponse(render_prometheus(snapshot), media_type="text/plain; version=0.0.4")
@@ -7,7 +7,7 @@ from sse_starlette.sse import EventSourceResponse
 from src.api.dependencies import ContentServiceDep, UserIdDep
 from src.api.routes import CURRENT_API_VERSION, Routes
 from src.api.v0.schemas.base_schemas import ErrorCode, ErrorResponse
-from src.core._exceptions import CrawlerError, NonRetryableError
+from src.core._exceptions import CrawlerError, DataSourceError, NonRetryableError
 from src.infra.logger import get_logger
 from src.models.content_models import (
     AddContentSourceRequest,
@@ -15,6 +15,7 @@ from src.models.content_models import (
     SourceEvent,
     SourceOverview,
     SourceSummary,
+    SourceTaskResponse,
 )
 
 logger = get_logger()
@@ -104,6 +105,62 @@ async def get_sources(content_service: ContentServiceDep, user_id: UserIdDep) ->
         ) from e
 
 
+@router.delete(
+    Routes.V0.Sources.SOURCE,
+    response_model=SourceTaskResponse,
+    responses={
+        202: {"model": SourceTaskResponse},
+        404: {"model": ErrorResponse, "description": "Source not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def delete_source(source_id: UUID, content_service: ContentServiceDep, user_id: UserIdDep) -> SourceTaskResponse:
+    """Schedules deletion of a source and its vectors."""
+    try:
+        return await content_service.delete_source(source_id=source_id, user_id=user_id)
+    except DataSourceError as e:
+        raise HTTPException(
+            status_code=404, detail=ErrorResponse(code=ErrorCode.CLIENT_ERROR, detail=e.error_message)
+        ) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                code=ErrorCode.SERVER_ERROR,
+                detail="An error occured while trying to delete the source. We are working on it already.",
+            ),
+        ) from e
+
+
+@router.post(
+    Routes.V0.Sources.SOURCE_REINDEX,
+    response_model=SourceTaskResponse,
+    responses={
+        202: {"model": SourceTaskResponse},
+        404: {"model": ErrorResponse, "description": "Source not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def reindex_source(source_id: UUID, content_service: ContentServiceDep, user_id: UserIdDep) -> SourceTaskResponse:
+    """Schedules a rebuild of a source's vectors from its stored chunks."""
+    try:
+        return await content_service.reindex_source(source_id=source_id, user_id=user_id)
+    except DataSourceError as e:
+        raise HTTPException(
+            status_code=404, detail=ErrorResponse(code=ErrorCode.CLIENT_ERROR, detail=e.error_message)
+        ) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                code=ErrorCode.SERVER_ERROR,
+                detail="An error occured while trying to reindex the source. We are working on it already.",
+            ),
+        ) from e
+
+
 # @router.patch(
 #     Routes.V0.Sources.SOURCES,
 #     response_model=UpdateSourcesResponse,
@@ -125,25 +182,3 @@ async def get_sources(content_service: ContentServiceDep, user_id: UserIdDep) ->
 #             status_code=500,
 #             detail="An error occured while trying to update the source. We are working on it already.",
 #         ) from e
-
-
-# @router.delete(
-#     Routes.V0.Sources.SOURCES,
-#     response_model=DeleteSourcesResponse,
-#     responses={
-#         200: {"model": DeleteSourcesResponse},  # successfully deleted
-#         404: {"model": ErrorResponse},  # Source not found
-#         500: {"model": ErrorResponse},  # Internal error
-#     },
-#     status_code=status.HTTP_200_OK,
-# )
-# async def delete_sources(request: DeleteSourcesRequest, content_service: ContentServiceDep) -> DeleteSourcesResponse:
-#     """Deletes a source."""
-#     try:
-#         return await content_service.delete_sources(request)
-#     # How do we handle 404?
-#     except Exception as e:
-#         raise HTTPException(
-#             status_code=500,
-#             detail="An error occured while trying to delete the source. We are working on it already.",
-#         ) from e
@@ -4,6 +4,7 @@ from src.api.dependencies import ContentServiceDep
 from src.api.routes import Routes
 from src.api.v0.schemas.webhook_schemas import WebhookResponse
 from src.infra.logger import get_logger
+from src.infra.settings import settings
 from src.services.webhook_handler import FireCrawlWebhookHandler
 
 logger = get_logger()
@@ -26,7 +27,7 @@ async def handle_firecrawl_webhook(
         content_service: Injected content service dependency
 
     Returns:
-        WebhookResponse: Response indicating successful processing
+        WebhookResponse: Response indicating successful processing, or queueing with deferred processing
 
     Raises:
         HTTPException: 400 if webhook payload is invalid
@@ -52,6 +53,17 @@ async def handle_firecrawl_webhook(
         # Create internal event object
         webhook_event = handler._create_webhook_event(event_data=parsed_payload, raw_payload=raw_payload)
 
+        # Acknowledge right away and leave processing to a worker
+        if settings.webhook_deferred_processing:
+            try:
+                queued = await content_service.defer_webhook_event(event=webhook_event)
+            except Exception as e:
+                logger.error(f"Error queueing webhook event: {str(e)}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error queueing webhook: {str(e)}"
+                ) from e
+            return handler._create_deferred_response(event=webhook_event, queued=queued)
+
         # Process the event
         try:
             await content_service.handle_webhook_event(event=webhook_event)
@@ -12,6 +12,7 @@ from src.api.config.cors_config import get_cors_config
 from src.api.handlers.error_handlers import global_exception_handler, non_retryable_exception_handler
 from src.api.middleware.rate_limit import HealthCheckRateLimit
 from src.api.system.health import router as health_router
+from src.api.system.metrics import router as metrics_router
 from src.api.system.sentry_debug import router as sentry_debug_router
 from src.api.v0.endpoints.chat import chat_router, conversations_router
 from src.api.v0.endpoints.sources import router as content_router
@@ -67,6 +68,7 @@ def create_app() -> FastAPI:
 
     # Add routes
     app.include_router(health_router, tags=["system"])
+    app.include_router(metrics_router, tags=["system"])
     app.include_router(sentry_debug_router, tags=["system"])
     app.include_router(webhook_router, tags=["webhooks"])
     app.include_router(content_router, tags=["sources"])
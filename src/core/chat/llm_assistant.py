@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from collections.abc import AsyncGenerator, Iterable
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 from uuid import UUID
 
 import anthropic
@@ -22,12 +22,13 @@ from anthropic.types import (
     ToolParam,
 )
 from anthropic.types.message_stream_event import MessageStreamEvent
-from pydantic import ConfigDict, Field
+from pydantic import ConfigDict, Field, PrivateAttr
 from weave import Model
 
 from src.core._exceptions import NonRetryableLLMError
 from src.core.chat.prompt_manager import PromptManager
 from src.core.chat.tool_manager import ToolManager
+from src.core.search.context_packer import ContextPacker
 from src.core.search.retriever import Retriever
 from src.infra.decorators import (
     anthropic_error_handler,
@@ -54,6 +55,9 @@ from src.models.chat_models import (
 )
 from src.models.llm_models import SystemPrompt, Tool, ToolName
 
+if TYPE_CHECKING:
+    from src.core.search.query_cache import QueryCache
+
 settings = get_settings()
 logger = get_logger()
 
@@ -64,6 +68,7 @@ class ClaudeAssistant(Model):
 
     Args:
         retriever (Retriever): The retriever instance for RAG operations.
+        query_cache (QueryCache, optional): Cache of multi-query expansions. Expansions are not cached when None.
         api_key (str, optional): The API key for the Anthropic client. Defaults to ANTHROPIC_API_KEY.
         model_name (str, optional): The name of the model to use. Defaults to MAIN_MODEL.
 
@@ -84,6 +89,9 @@ class ClaudeAssistant(Model):
     prompt_manager: PromptManager = Field(default_factory=PromptManager)
     tool_manager: ToolManager = Field(default_factory=ToolManager)
     retriever: Retriever | None = Field(default=None, description="Retriever instance")
+    context_packer: ContextPacker = Field(default_factory=ContextPacker)
+    # Private, so pydantic needs no runtime import of QueryCache
+    _query_cache: QueryCache | None = PrivateAttr(default=None)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -92,6 +100,7 @@ class ClaudeAssistant(Model):
         retriever: Retriever,
         api_key: str | None = None,
         model_name: str | None = None,
+        query_cache: QueryCache | None = None,
     ):
         # Initialize weave if configured
         if settings.weave_project_name and settings.weave_project_name.strip():
@@ -110,6 +119,7 @@ class ClaudeAssistant(Model):
         self.tools = [Tool.from_tool_param(self.tool_manager.get_tool(ToolName.RAG_SEARCH))]
         self.system_prompt = self.prompt_manager.get_system_prompt(document_summary_prompt="NO DOCUMENTS LOADED YET")
         self.retriever = retriever
+        self._query_cache = query_cache
         logger.info("✓ Initialized Claude assistant successfully")
 
     # TODO: this method needs to be refactored completely and use Supabase stored summaries
@@ -276,11 +286,13 @@ class ClaudeAssistant(Model):
             data=StreamErrorEvent(error=event.error),
         )
 
-    async def get_tool_result(self, tool_use_block: ToolUseBlock, user_id: UUID) -> ToolResultBlock:
-        """Handle tool use for specified tools."""
+    async def get_tool_result(
+        self, tool_use_block: ToolUseBlock, user_id: UUID, use_cache: bool = True
+    ) -> ToolResultBlock:
+        """Handle tool use for specified tools. Set use_cache to False to bypass the query cache for this request."""
         try:
             if tool_use_block.name == ToolName.RAG_SEARCH:
-                search_results = await self.use_rag_search(tool_use_block, user_id)
+                search_results = await self.use_rag_search(tool_use_block, user_id, use_cache=use_cache)
                 if search_results is None:
                     # Special tool use block for no context
                     tool_result = ToolResultBlock(
@@ -304,11 +316,15 @@ class ClaudeAssistant(Model):
             ) from e
 
     # TODO: this method belongs to retriever, it should not have user_id as an argument (naughty, naughty)
-    async def use_rag_search(self, tool_inputs: ToolUseBlock, user_id: UUID) -> list[str] | None:
+    async def use_rag_search(
+        self, tool_inputs: ToolUseBlock, user_id: UUID, use_cache: bool = True
+    ) -> list[str] | None:
         """Perform RAG search using the provided tool input.
 
         Args:
             tool_inputs: ToolUseBlock containing the rag_query
+            user_id: The user whose sources are searched
+            use_cache: Whether cached query expansions and embeddings may be used
         """
         rag_query = tool_inputs.input.get("rag_query")  # This matches the new schema
         if not rag_query:
@@ -316,12 +332,12 @@ class ClaudeAssistant(Model):
             return None
         logger.debug(f"Using this query for RAG search: {rag_query}")
         # Merge these two methods
-        multiple_queries = await self.generate_multi_query(rag_query)
+        multiple_queries = await self.generate_multi_query(rag_query, use_cache=use_cache)
         combined_queries = multiple_queries + [rag_query]
 
         # get ranked search results
         results = await self.retriever.retrieve(
-            rag_query=rag_query, combined_queries=combined_queries, top_n=3, user_id=user_id
+            rag_query=rag_query, combined_queries=combined_queries, top_n=3, user_id=user_id, use_cache=use_cache
         )
 
         if not results:
@@ -335,14 +351,14 @@ class ClaudeAssistant(Model):
         return preprocessed_results
 
     @base_error_handler
-    async def preprocess_ranked_documents(self, ranked_documents: list[dict[str, Any]]) -> list[str]:
+    async def preprocess_ranked_documents(self, ranked_documents: dict[int, dict[str, Any]]) -> list[str]:
         """
-        Preprocess ranked documents to generate a list of formatted document strings.
+        Pack ranked documents into the token budget and format them as context strings.
 
         Args:
-            ranked_documents (dict[str, Any]): A dictionary where keys are document identifiers and values are
-            dictionaries
-            containing document details such as 'relevance_score' and 'text'.
+            ranked_documents (dict[int, dict[str, Any]]): A dictionary where keys are document identifiers and values
+            are dictionaries containing document details such as 'relevance_score', 'text', 'document_id' and
+            'token_count'.
 
         Returns:
             list[str]: A list of formatted document strings, each containing the document's relevance score and text.
@@ -350,19 +366,33 @@ class ClaudeAssistant(Model):
         """
         preprocessed_context = []
 
-        for _, result in ranked_documents.items():  # The first item (_) is the key, second (result) is the dictionary.
-            relevance_score = result.get("relevance_score", None)
-            text = result.get("text")
-
+        for span in self.context_packer.pack(ranked_documents):
             # create a structured format
-            formatted_document = f"Document's relevance score: {relevance_score}: \nDocument text: {text}: \n--------\n"
+            formatted_document = (
+                f"Document's relevance score: {span.relevance_score}: \nDocument text: {span.text}: \n--------\n"
+            )
             preprocessed_context.append(formatted_document)
 
         return preprocessed_context
 
     @anthropic_error_handler
     @weave.op()
-    async def generate_multi_query(self, query: str, model: str | None = None, n_queries: int = 3) -> list[str]:
+    async def generate_multi_query(
+        self, query: str, model: str | None = None, n_queries: int = 3, use_cache: bool = True
+    ) -> list[str]:
+        """Generate multiple search queries from a single user query, served from the query cache when possible."""
+        if self._query_cache is None:
+            return await self._request_multi_query(query, n_queries)
+
+        return await self._query_cache.get_or_generate_expansions(
+            query,
+            model=self.model_name,
+            n_queries=n_queries,
+            generate=lambda: self._request_multi_query(query, n_queries),
+            use_cache=use_cache,
+        )
+
+    async def _request_multi_query(self, query: str, n_queries: int) -> list[str]:
         """Generate multiple search queries from a single user query using Claude's tool use capability."""
         messages = [
             MessageParam(
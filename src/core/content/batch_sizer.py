@@ -0,0 +1,130 @@
+from collections.abc import Callable, Sequence
+from enum import Enum
+from typing import TypeVar
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.infra.logger import get_logger
+from src.infra.settings import settings
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+# Rough number of characters per token of markdown, used where token counts are not known yet
+CHARS_PER_TOKEN = 4
+
+
+def pack_batches(
+    items: Sequence[T],
+    weigh: Callable[[T], tuple[int, int]],
+    max_items: int,
+    max_bytes: int | None = None,
+    token_budget: int | None = None,
+) -> list[list[T]]:
+    """Split items into consecutive batches limited by item count, bytes and tokens.
+
+    Items are added to a batch until the next one would exceed a limit. An item exceeding a limit on its own gets a
+    batch of its own.
+
+    Args:
+        items: Items to batch, order is kept
+        weigh: Returns the (tokens, bytes) of an item
+        max_items: Maximum number of items per batch
+        max_bytes: Maximum bytes per batch, unlimited when None
+        token_budget: Maximum tokens per batch, unlimited when None
+
+    Returns:
+        list[list[T]]: The batches
+    """
+    batches: list[list[T]] = []
+    batch: list[T] = []
+    batch_tokens = batch_bytes = 0
+    for item in items:
+        tokens, size = weigh(item)
+        if batch and (
+            len(batch) >= max_items
+            or (max_bytes is not None and batch_bytes + size > max_bytes)
+            or (token_budget is not None and batch_tokens + tokens > token_budget)
+        ):
+            batches.append(batch)
+            batch, batch_tokens, batch_bytes = [], 0, 0
+        batch.append(item)
+        batch_tokens += tokens
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class BatchKind(str, Enum):
+    """Kinds of ingestion jobs whose batches are sized by throughput."""
+
+    CHUNKING = "chunking"  # chunk_document_batch: documents to chunks
+    PERSISTENCE = "persistence"  # persist_chunks: chunks to Chroma and Supabase
+
+
+class BatchSizer:
+    """Sizes ingestion batches by token volume so that jobs take about `target_job_seconds`.
+
+    The token budget of a batch is the observed throughput of its kind of job (tokens per second, an exponentially
+    weighted moving average) times the target duration, clamped to [min_tokens, max_tokens]. Jobs report their
+    throughput with `record`. Throughput is kept in Redis, so batches planned in one worker are sized by what jobs
+    in all workers observed. Redis failures fall back to the local estimate.
+
+    Args:
+        redis (Redis | None): Shares throughput between workers. Local estimates only when None.
+        target_job_seconds (float): Target duration of a job.
+        default_throughput (dict[BatchKind, float]): Tokens per second assumed before anything was observed.
+        smoothing (float): Weight of a new observation in the moving average.
+        min_tokens (int): Lower bound of the token budget.
+        max_tokens (int): Upper bound of the token budget.
+    """
+
+    key = "batch_sizer:throughput"
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        target_job_seconds: float = settings.ingest_target_job_seconds,
+        default_throughput: dict[BatchKind, float] | None = None,
+        smoothing: float = 0.2,
+        min_tokens: int = 2_000,
+        max_tokens: int = 2_000_000,
+    ):
+        self.redis = redis
+        self.target_job_seconds = target_job_seconds
+        self.throughput = {BatchKind.CHUNKING: 20_000.0, BatchKind.PERSISTENCE: 10_000.0, **(default_throughput or {})}
+        self.smoothing = smoothing
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+
+    async def _load(self, kind: BatchKind) -> float:
+        if self.redis is not None:
+            try:
+                value = await self.redis.hget(self.key, kind.value)
+                if value is not None:
+                    self.throughput[kind] = float(value)
+            except RedisError as e:
+                logger.warning(f"Failed to load {kind.value} throughput, using local estimate: {e}")
+        return self.throughput[kind]
+
+    async def token_budget(self, kind: BatchKind) -> int:
+        """Get the number of tokens a batch of this kind should hold to take about the target duration."""
+        budget = int(await self._load(kind) * self.target_job_seconds)
+        return max(self.min_tokens, min(self.max_tokens, budget))
+
+    async def record(self, kind: BatchKind, tokens: int, seconds: float) -> None:
+        """Record the throughput a job observed."""
+        if tokens <= 0 or seconds <= 0:
+            return
+        observed = tokens / seconds
+        current = await self._load(kind)
+        self.throughput[kind] = current + self.smoothing * (observed - current)
+        logger.debug(f"{kind.value} throughput: observed {observed:.0f}, estimate {self.throughput[kind]:.0f} tokens/s")
+        if self.redis is not None:
+            try:
+                await self.redis.hset(self.key, kind.value, self.throughput[kind])
+            except RedisError as e:
+                logger.warning(f"Failed to store {kind.value} throughput: {e}")
@@ -4,12 +4,14 @@ from uuid import UUID
 
 import tiktoken
 
+from src.core.content.batch_sizer import CHARS_PER_TOKEN, pack_batches
 from src.infra.data.data_repository import DataRepository
 from src.infra.decorators import generic_error_handler
 from src.infra.external.supabase_manager import SupabaseManager
 from src.infra.logger import configure_logging, get_logger
 from src.infra.settings import get_settings
 from src.models.content_models import Chunk, Document
+from src.models.task_models import ClaimCheck
 from src.services.data_service import DataService
 
 logger = get_logger()
@@ -27,8 +29,9 @@ class MarkdownChunker:
         min_chunk_size: int = 100,
         overlap_percentage: float = 0.05,
         save: bool = False,
-        document_batch_size: int = 50,
-        chunk_batch_size: int = 500,
+        document_batch_size: int = settings.ingest_max_documents_per_batch,
+        chunk_batch_size: int = settings.ingest_max_chunks_per_batch,
+        max_batch_bytes: int = settings.ingest_max_batch_bytes,
     ):
         self.tokenizer = tiktoken.get_encoding("cl100k_base")
         self.max_tokens = max_tokens  # Hard limit
@@ -37,6 +40,7 @@ class MarkdownChunker:
         self.overlap_percentage = overlap_percentage  # 5% overlap
         self.document_batch_size = document_batch_size
         self.chunk_batch_size = chunk_batch_size
+        self.max_batch_bytes = max_batch_bytes
 
         # Precompile regex patterns for performance
         self.boilerplate_patterns = [
@@ -55,13 +59,31 @@ class MarkdownChunker:
         self.inline_code_pattern = re.compile(r"`([^`\n]+)`")
 
     # Batching operations
-    def batch_documents(self, documents: list[Document]) -> list[list[Document]]:
-        """Batch documents into smaller chunks."""
-        return [documents[i : i + self.document_batch_size] for i in range(0, len(documents), self.document_batch_size)]
+    @staticmethod
+    def weigh_document(document: Document | ClaimCheck) -> tuple[int, int]:
+        """Estimate (tokens, bytes) of a document, or of a claim-checked document from its weight."""
+        if isinstance(document, ClaimCheck):
+            size = document.weight if document.weight is not None else document.size
+        else:
+            size = len(document.content)
+        return size // CHARS_PER_TOKEN, size
+
+    @staticmethod
+    def weigh_chunk(chunk: Chunk) -> tuple[int, int]:
+        """Get (tokens, bytes) of a chunk, bytes are approximated by the length of its text."""
+        return chunk.token_count, len(chunk.text) + len(chunk.content or "")
+
+    def batch_documents(
+        self, documents: list[Document] | list[ClaimCheck], token_budget: int | None = None
+    ) -> list[list[Document]] | list[list[ClaimCheck]]:
+        """Batch documents by count, size and, if given, a token budget."""
+        return pack_batches(
+            documents, self.weigh_document, self.document_batch_size, self.max_batch_bytes, token_budget
+        )
 
-    def batch_chunks(self, chunks: list[Chunk]) -> list[list[Chunk]]:
-        """Batch chunks into smaller chunks."""
-        return [chunks[i : i + self.chunk_batch_size] for i in range(0, len(chunks), self.chunk_batch_size)]
+    def batch_chunks(self, chunks: list[Chunk], token_budget: int | None = None) -> list[list[Chunk]]:
+        """Batch chunks by count, size and, if given, a token budget."""
+        return pack_batches(chunks, self.weigh_chunk, self.chunk_batch_size, self.max_batch_bytes, token_budget)
 
     # Pre-processing operations
     @generic_error_handler
@@ -187,6 +209,11 @@ class MarkdownChunker:
             chunks = self.post_process_chunks(chunks, document)
             logger.info(f"Post-processed {len(chunks)} chunks")
 
+            # Give chunks ids derived from their document and position, so reprocessing overwrites instead of
+            # duplicating them
+            for position, chunk in enumerate(chunks):
+                chunk.chunk_id = Chunk.stable_id(document.document_id, position)
+
             # Collect all
             processed_chunks.extend(chunks)
 
@@ -1,13 +1,13 @@
+import asyncio
+import importlib.util
+from collections.abc import AsyncIterator
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import httpx
-from firecrawl import FirecrawlApp
-from requests.exceptions import ConnectionError, Timeout
-from requests.exceptions import HTTPError as RequestsHTTPError
 
 from src.core._exceptions import CrawlerError, EmptyContentError
-from src.infra.decorators import generic_error_handler, tenacity_retry_wrapper
+from src.infra.decorators import tenacity_retry_wrapper
 from src.infra.logger import get_logger
 from src.infra.settings import get_settings
 from src.models.content_models import Document, DocumentMetadata
@@ -21,41 +21,62 @@ from src.models.firecrawl_models import (
 settings = get_settings()
 logger = get_logger()
 
+# HTTP/2 needs the optional h2 package (httpx[http2]), without it the client falls back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Gateway errors of the Firecrawl API are transient and retried, other error responses are not
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
 
 class FireCrawler:
     """
     A class for crawling and mapping URLs using the Firecrawl API.
 
     This class handles the interaction with the FireCrawl API, managing crawl jobs,
-    and processing crawl results.
+    and processing crawl results. All requests go through one pooled async HTTP client, so none of them blocks the
+    event loop.
 
     Args:
         api_key (str, optional): FireCrawl API key. Defaults to FIRECRAWL_API_KEY.
         api_url (str, optional): FireCrawl API URL. Defaults to FIRECRAWL_API_URL.
+        http_client (httpx.AsyncClient, optional): Client for API requests. Defaults to a pooled client created
+            on first use.
 
     Attributes:
         api_key (str): The FireCrawl API key.
         api_url (str): The FireCrawl API base URL.
-        firecrawl_app (FirecrawlApp): Instance of FireCrawl API client.
     """
 
     def __init__(
         self,
         api_key: str | None = settings.firecrawl_api_key,
         api_url: str = settings.firecrawl_api_url,
+        http_client: httpx.AsyncClient | None = None,
     ) -> None:
         if not api_key:
             raise ValueError("API key cannot be None")
         self.api_key: str = api_key
-        self.api_url = api_url
-        self.firecrawl_app = self.initialize_firecrawl()
-
-    @generic_error_handler
-    def initialize_firecrawl(self) -> FirecrawlApp:
-        """Initialize and return the Firecrawl app."""
-        app = FirecrawlApp(api_key=self.api_key)
+        self.api_url = api_url.rstrip("/")
+        self._http_client = http_client
         logger.info("✓ Initialized Firecrawler successfully")
-        return app
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Long-lived client shared by all API requests, so connections and TLS sessions are reused."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=30,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=60),
+            )
+        return self._http_client
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
 
     def _build_params(self, request: CrawlRequest) -> CrawlParams:
         """
@@ -88,44 +109,54 @@ class FireCrawler:
             logger.exception(f"Error building params: {e}")
             raise
 
-    @tenacity_retry_wrapper((Timeout, ConnectionError))
     async def start_crawl(self, request: CrawlRequest) -> FireCrawlResponse:
         """Start a new crawl job with webhook configuration."""
+        params = self._build_params(request)
+        # Retries of the same crawl share an idempotency key, so a request that timed out after Firecrawl accepted
+        # it does not start a second crawl
+        response = await self._post_crawl(params, idempotency_key=str(uuid4()))
+        firecrawl_response = FireCrawlResponse.from_firecrawl_response(response)
+
+        logger.info(f"Received response from FireCrawl: {firecrawl_response}")
+        return firecrawl_response
+
+    @tenacity_retry_wrapper((httpx.ConnectError, httpx.TimeoutException, httpx.HTTPStatusError))
+    async def _post_crawl(self, params: CrawlParams, idempotency_key: str) -> dict[str, Any]:
+        """Submit a crawl to the FireCrawl API, retrying network and gateway errors."""
         try:
-            params = self._build_params(request)
-            response = self.firecrawl_app.async_crawl_url(str(request.url), params.dict())
-            firecrawl_response = FireCrawlResponse.from_firecrawl_response(response)
-
-            logger.info(f"Received response from FireCrawl: {firecrawl_response}")
-            return firecrawl_response
-        except (ConnectionError, Timeout) as e:
+            response = await self.http_client.post(
+                f"{self.api_url}/crawl", json=params.dict(), headers={"x-idempotency-key": idempotency_key}
+            )
+            response.raise_for_status()
+            return response.json()
+        except (httpx.ConnectError, httpx.TimeoutException) as e:
             # Network errors will be retried by tenacity
             logger.warning(f"Error starting crawl: {e}")
             raise
-        except RequestsHTTPError as e:
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in RETRYABLE_STATUS_CODES:
+                logger.warning(f"Retryable error starting crawl: {e}")
+                raise
             # Non-network errors will not be retried by tenacity
             logger.exception(f"Error starting crawl: {e}")
             raise CrawlerError(f"Error starting crawl: {e}") from e
+        except ValueError as e:
+            logger.exception(f"Invalid response starting crawl: {e}")
+            raise CrawlerError(f"Invalid response starting crawl: {e}") from e
 
-    async def get_results(self, firecrawl_id: str, source_id: UUID) -> list[Document]:
+    async def get_results(self, firecrawl_id: str, source_id: UUID, prefetch: bool = True) -> list[Document]:
         """Get final results for a completed job.
 
         Args:
             firecrawl_id: The FireCrawl job ID
             source_id: UUID of DataSource object mapped to the crawl
+            prefetch: Fetch the next page of results while the current one is converted to documents
 
         Returns:
             list[Document]: list of Document objects containing crawl results
         """
-        next_url: str | None = f"https://api.firecrawl.dev/v1/crawl/{firecrawl_id}"
         documents: list[Document] = []
-
-        while next_url is not None:
-            logger.info("Accumulating job results.")
-            batch_data, next_url = await self._fetch_results_from_url(next_url)
-
-            # Extract new list of documents
-            document_batch = self._get_documents_from_batch(batch=batch_data, source_id=source_id)
+        async for document_batch in self.iter_results(firecrawl_id, source_id, prefetch=prefetch):
             documents.extend(document_batch)
 
         # Only checks at the end if data exists
@@ -137,11 +168,49 @@ class FireCrawler:
 
         return documents
 
+    async def iter_results(
+        self, firecrawl_id: str, source_id: UUID, prefetch: bool = True
+    ) -> AsyncIterator[list[Document]]:
+        """Yield the documents of a completed job page by page, without accumulating them.
+
+        Args:
+            firecrawl_id: The FireCrawl job ID
+            source_id: UUID of DataSource object mapped to the crawl
+            prefetch: Fetch the next page of results while the current one is converted and consumed
+
+        Yields:
+            list[Document]: Documents of one page of results
+        """
+        fetch: asyncio.Task | None = asyncio.create_task(
+            self._fetch_results_from_url(f"{self.api_url}/crawl/{firecrawl_id}")
+        )
+
+        try:
+            while fetch is not None:
+                logger.info("Accumulating job results.")
+                batch_data, next_url = await fetch
+                fetch = None
+                if prefetch and next_url is not None:
+                    fetch = asyncio.create_task(self._fetch_results_from_url(next_url))
+
+                # Extract new list of documents, off the event loop so the prefetch progresses meanwhile
+                yield await asyncio.to_thread(self._get_documents_from_batch, batch=batch_data, source_id=source_id)
+
+                if not prefetch and next_url is not None:
+                    fetch = asyncio.create_task(self._fetch_results_from_url(next_url))
+        finally:
+            if fetch is not None:
+                fetch.cancel()
+
     def _get_documents_from_batch(self, batch: dict[str, Any], source_id: UUID) -> list[Document]:
         """Iterates over batch data and returns a list of documents."""
+        return self.documents_from_pages(pages=batch.get("data", []), source_id=source_id)
+
+    def documents_from_pages(self, pages: list[dict[str, Any]], source_id: UUID) -> list[Document]:
+        """Convert scraped pages, as returned by crawl results and crawl.page webhooks, into documents."""
         document_batch: list[Document] = []
 
-        for page in batch.get("data", []):
+        for page in pages:
             if page.get("markdown"):
                 # Get necessary data
                 markdown_content = page.get("markdown")
@@ -183,9 +252,8 @@ class FireCrawler:
             Tuple of (batch data dict, next URL string or None)
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(next_url, headers={"Authorization": f"Bearer {self.api_key}"}, timeout=30)
-                response.raise_for_status()
+            response = await self.http_client.get(next_url)
+            response.raise_for_status()
 
             batch_data = response.json()
             next_url = batch_data.get("next")  # This will be str | None
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+from typing import IO, TYPE_CHECKING, Self
+
+import msgpack
+
+from src.infra.logger import get_logger
+from src.models.content_models import Document
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from types import TracebackType
+    from uuid import UUID
+
+logger = get_logger()
+
+
+class DocumentSpool:
+    """Append-only, file-backed buffer of documents, so that crawl results do not have to be held in memory.
+
+    Documents are written as msgpack frames to an anonymous temporary file, which the OS removes once the spool is
+    closed. Only the ids of spooled documents are kept in memory. File I/O runs in a thread to keep the event loop
+    free. Reading yields batches of documents and can be repeated, but must not be interleaved with appending.
+
+    Args:
+        directory (str | None): Directory of the spool file. Defaults to the system temporary directory.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self._file: IO[bytes] = tempfile.TemporaryFile(prefix="kollektiv-spool-", dir=directory)
+        self._packer = msgpack.Packer()
+        self._lock = asyncio.Lock()
+        self.document_ids: list[UUID] = []
+        self.size = 0  # bytes written
+
+    def __len__(self) -> int:
+        """Number of spooled documents."""
+        return len(self.document_ids)
+
+    async def __aenter__(self) -> Self:
+        """Use the spool as an async context manager that closes it on exit."""
+        return self
+
+    async def __aexit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Close the spool."""
+        self.close()
+
+    def _write(self, documents: list[Document]) -> int:
+        self._file.seek(0, 2)
+        frames = b"".join(self._packer.pack(document.model_dump(mode="json")) for document in documents)
+        self._file.write(frames)
+        return len(frames)
+
+    async def append(self, documents: list[Document]) -> None:
+        """Append documents to the spool."""
+        if not documents:
+            return
+        async with self._lock:
+            self.size += await asyncio.to_thread(self._write, documents)
+        self.document_ids.extend(document.document_id for document in documents)
+
+    @staticmethod
+    def _read(unpacker: msgpack.Unpacker, batch_size: int) -> list[Document]:
+        batch = []
+        for frame in unpacker:
+            batch.append(Document.model_validate(frame))
+            if len(batch) == batch_size:
+                break
+        return batch
+
+    async def batches(self, batch_size: int) -> AsyncIterator[list[Document]]:
+        """Read the spooled documents back in order, `batch_size` documents at a time."""
+        async with self._lock:
+            self._file.flush()
+            self._file.seek(0)
+            unpacker = msgpack.Unpacker(self._file, raw=False)
+            while batch := await asyncio.to_thread(self._read, unpacker, batch_size):
+                yield batch
+
+    def close(self) -> None:
+        """Close and remove the spool file."""
+        if not self._file.closed:
+            logger.debug(f"Closing spool of {len(self)} documents ({self.size} bytes)")
+            self._file.close()
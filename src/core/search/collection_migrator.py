@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from chromadb.errors import InvalidCollectionException
+
+from src.core.search.vector_db import DEFAULT_BATCH_SIZE
+from src.infra.external.chroma_manager import ChromaManager
+from src.infra.logger import configure_logging, get_logger
+from src.models.vector_models import CollectionLayout, VectorCollection
+
+if TYPE_CHECKING:
+    from chromadb.api import AsyncClientAPI
+    from chromadb.api.models.AsyncCollection import AsyncCollection
+
+logger = get_logger()
+
+
+class CollectionMigrator:
+    """Moves vectors between the per-user and the sharded collection layouts.
+
+    Vectors are copied together with their stored embeddings, so no re-embedding is needed. The copy is an upsert,
+    which makes a migration safe to re-run after a failure. Source vectors are only removed when `delete_source` is set
+    and the copy of the user finished.
+    """
+
+    def __init__(
+        self,
+        client: AsyncClientAPI,
+        source_layout: CollectionLayout,
+        target_layout: CollectionLayout,
+        shard_count: int,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        if source_layout == target_layout:
+            raise ValueError("Source and target layouts must differ")
+        self.client = client
+        self.source_layout = source_layout
+        self.target_layout = target_layout
+        self.shard_count = shard_count
+        self.batch_size = batch_size
+
+    def _collection(self, user_id: UUID, layout: CollectionLayout) -> VectorCollection:
+        shard_count = self.shard_count if layout == CollectionLayout.SHARDED else 1
+        return VectorCollection(user_id=user_id, layout=layout, shard_count=shard_count)
+
+    @staticmethod
+    def _user_filter(layout: CollectionLayout, user_id: UUID) -> dict[str, Any] | None:
+        return {"user_id": str(user_id)} if layout == CollectionLayout.SHARDED else None
+
+    async def list_user_ids(self) -> list[UUID]:
+        """Discover the users present in the source layout."""
+        collections = await self.client.list_collections()
+        # Chroma <0.6 returns collection objects, newer versions return names
+        names = [getattr(collection, "name", collection) for collection in collections]
+
+        if self.source_layout == CollectionLayout.PER_USER:
+            user_ids = []
+            for name in names:
+                try:
+                    user_ids.append(UUID(name))
+                except ValueError:
+                    continue
+            return user_ids
+
+        user_ids_set: set[UUID] = set()
+        for name in names:
+            if not name.startswith("shard_"):
+                continue
+            collection = await self.client.get_collection(name)
+            offset = 0
+            while True:
+                batch = await collection.get(limit=self.batch_size, offset=offset, include=["metadatas"])
+                if not batch["ids"]:
+                    break
+                for metadata in batch["metadatas"]:
+                    if metadata and "user_id" in metadata:
+                        user_ids_set.add(UUID(metadata["user_id"]))
+                offset += len(batch["ids"])
+        return sorted(user_ids_set)
+
+    async def _get_source_collection(self, user_id: UUID) -> AsyncCollection | None:
+        name = self._collection(user_id, self.source_layout).name
+        try:
+            return await self.client.get_collection(name)
+        except InvalidCollectionException:
+            logger.warning(f"Source collection {name} of user {user_id} does not exist, skipping")
+            return None
+
+    async def migrate_user(self, user_id: UUID, delete_source: bool = False) -> int:
+        """Copy all vectors of a user into the target layout.
+
+        Returns:
+            int: Number of copied vectors
+        """
+        source = await self._get_source_collection(user_id)
+        if source is None:
+            return 0
+        target = await self.client.get_or_create_collection(self._collection(user_id, self.target_layout).name)
+
+        where = self._user_filter(self.source_layout, user_id)
+        copied_ids: list[str] = []
+        offset = 0
+        while True:
+            batch = await source.get(
+                where=where,
+                limit=self.batch_size,
+                offset=offset,
+                include=["documents", "metadatas", "embeddings"],
+            )
+            ids = batch["ids"]
+            if not ids:
+                break
+
+            metadatas = [{**(metadata or {}), "user_id": str(user_id)} for metadata in batch["metadatas"]]
+            await target.upsert(
+                ids=ids,
+                documents=batch["documents"],
+                metadatas=metadatas,
+                embeddings=batch["embeddings"],
+            )
+            copied_ids.extend(ids)
+            offset += len(ids)
+
+        if delete_source:
+            if self.source_layout == CollectionLayout.PER_USER:
+                await self.client.delete_collection(source.name)
+            else:
+                for i in range(0, len(copied_ids), self.batch_size):
+                    await source.delete(ids=copied_ids[i : i + self.batch_size])
+
+        logger.info(f"Migrated {len(copied_ids)} vectors of user {user_id} to {target.name}")
+        return len(copied_ids)
+
+    async def migrate(self, user_ids: list[UUID] | None = None, delete_source: bool = False) -> dict[UUID, int]:
+        """Migrate the given users, or every user found in the source layout."""
+        user_ids = user_ids if user_ids is not None else await self.list_user_ids()
+        results = {}
+        for user_id in user_ids:
+            results[user_id] = await self.migrate_user(user_id, delete_source=delete_source)
+        logger.info(f"Migrated {sum(results.values())} vectors of {len(results)} users")
+        return results
+
+
+async def main() -> None:
+    """Run a layout migration against the configured Chroma instance."""
+    parser = argparse.ArgumentParser(description="Migrate vectors between Chroma collection layouts")
+    parser.add_argument("--source", type=CollectionLayout, required=True, choices=list(CollectionLayout))
+    parser.add_argument("--target", type=CollectionLayout, required=True, choices=list(CollectionLayout))
+    parser.add_argument("--shard-count", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--user-id", type=UUID, action="append", dest="user_ids", help="Limit to these users")
+    parser.add_argument("--delete-source", action="store_true", help="Remove migrated vectors from the source")
+    args = parser.parse_args()
+
+    chroma_manager = await ChromaManager.create_async()
+    migrator = CollectionMigrator(
+        client=await chroma_manager.get_async_client(),
+        source_layout=args.source,
+        target_layout=args.target,
+        shard_count=args.shard_count,
+        batch_size=args.batch_size,
+    )
+    await migrator.migrate(user_ids=args.user_ids, delete_source=args.delete_source)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
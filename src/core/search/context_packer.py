@@ -0,0 +1,184 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+import tiktoken
+
+from src.infra.logger import get_logger
+from src.infra.settings import settings
+
+logger = get_logger()
+
+# Separator between headers and text produced by Chunker.combine_headers_and_text
+CONTENT_SEPARATOR = "\n\n Content: "
+
+
+@dataclass
+class ContextSpan:
+    """A run of chunks from the same document packed as a single piece of context."""
+
+    document_id: str | None
+    relevance_score: float
+    header: str
+    body: str
+    token_count: int
+    chunk_indexes: list[int] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Full span text with the headers of its first chunk."""
+        return f"{self.header}{CONTENT_SEPARATOR}{self.body}" if self.header else self.body
+
+
+class ContextPacker:
+    """
+    Selects, merges and trims ranked chunks to fit a token budget.
+
+    Chunks of the same document that follow each other are merged into one span, dropping the text that
+    Chunker.add_overlap copied from the previous chunk. Spans are then added in relevance order until the budget is
+    spent; the last span is trimmed if enough budget is left for it to be useful.
+
+    Args:
+        token_budget (int): Maximum number of tokens of packed context.
+        min_trim_tokens (int): Minimum remaining budget for which a span is trimmed instead of dropped.
+        min_overlap_chars (int): Shortest shared text treated as overlap between two chunks.
+        max_overlap_chars (int): Longest shared text searched for, bounds the cost of overlap detection.
+        tokenizer (tiktoken.Encoding, optional): Tokenizer for headers and trimming. Defaults to cl100k_base, loaded on
+            first use.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = settings.rag_context_token_budget,
+        min_trim_tokens: int = settings.rag_context_min_trim_tokens,
+        min_overlap_chars: int = 20,
+        max_overlap_chars: int = 2000,
+        tokenizer: tiktoken.Encoding | None = None,
+    ):
+        self.token_budget = token_budget
+        self.min_trim_tokens = min_trim_tokens
+        self.min_overlap_chars = min_overlap_chars
+        self.max_overlap_chars = max_overlap_chars
+        self._tokenizer = tokenizer
+
+    @property
+    def tokenizer(self) -> tiktoken.Encoding:
+        """Tokenizer used for counting and trimming, loaded lazily as it may need to be downloaded."""
+        if self._tokenizer is None:
+            self._tokenizer = tiktoken.get_encoding("cl100k_base")
+        return self._tokenizer
+
+    def _count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text))
+
+    @staticmethod
+    def _split_content(text: str) -> tuple[str, str]:
+        """Split chunk content into its headers and text parts."""
+        header, separator, body = text.partition(CONTENT_SEPARATOR)
+        if not separator:
+            return "", text
+        return header, body
+
+    def _overlap_length(self, preceding: str, following: str) -> int:
+        """Length of the longest prefix of `following` that is a suffix of `preceding`."""
+        max_length = min(len(preceding), len(following), self.max_overlap_chars)
+        for length in range(max_length, self.min_overlap_chars - 1, -1):
+            if preceding.endswith(following[:length]):
+                return length
+        return 0
+
+    def _to_span(self, index: int, result: dict[str, Any]) -> ContextSpan:
+        header, body = self._split_content(result["text"])
+        # token_count is precomputed for the chunk text at ingestion, only headers need counting here
+        body_tokens = result.get("token_count")
+        if body_tokens is None:
+            body_tokens = self._count_tokens(body)
+        return ContextSpan(
+            document_id=result.get("document_id"),
+            relevance_score=result["relevance_score"],
+            header=header,
+            body=body,
+            token_count=body_tokens + (self._count_tokens(header) if header else 0),
+            chunk_indexes=[index],
+        )
+
+    def _merge(self, first: ContextSpan, second: ContextSpan) -> ContextSpan | None:
+        """Merge two spans of the same document if `second` continues `first`, otherwise return None."""
+        overlap = self._overlap_length(first.body, second.body)
+        if not overlap:
+            return None
+        second_header_tokens = self._count_tokens(second.header) if second.header else 0
+        return ContextSpan(
+            document_id=first.document_id,
+            relevance_score=max(first.relevance_score, second.relevance_score),
+            header=first.header,
+            body=first.body + second.body[overlap:],
+            token_count=first.token_count
+            + second.token_count
+            - second_header_tokens
+            - self._count_tokens(second.body[:overlap]),
+            chunk_indexes=first.chunk_indexes + second.chunk_indexes,
+        )
+
+    def merge_adjacent(self, ranked_documents: dict[int, dict[str, Any]]) -> list[ContextSpan]:
+        """Turn ranked results into spans, merging adjacent chunks of the same document."""
+        ordered = sorted(ranked_documents.items(), key=lambda item: item[1]["relevance_score"], reverse=True)
+        spans: list[ContextSpan] = []
+
+        for index, result in ordered:
+            span = self._to_span(index, result)
+            for position, existing in enumerate(spans):
+                if span.document_id is None or existing.document_id != span.document_id:
+                    continue
+                merged = self._merge(existing, span) or self._merge(span, existing)
+                if merged is not None:
+                    spans[position] = merged
+                    break
+            else:
+                spans.append(span)
+
+        return spans
+
+    def _trim(self, span: ContextSpan, max_tokens: int) -> ContextSpan:
+        """Cut a span down to max_tokens, keeping its beginning."""
+        header_tokens = self._count_tokens(span.header) if span.header else 0
+        body = self.tokenizer.decode(self.tokenizer.encode(span.body)[: max(max_tokens - header_tokens, 0)])
+        return ContextSpan(
+            document_id=span.document_id,
+            relevance_score=span.relevance_score,
+            header=span.header,
+            body=body,
+            token_count=max_tokens,
+            chunk_indexes=span.chunk_indexes,
+        )
+
+    def pack(self, ranked_documents: dict[int, dict[str, Any]]) -> list[ContextSpan]:
+        """
+        Select spans in relevance order until the token budget is spent.
+
+        Args:
+            ranked_documents (dict[int, dict[str, Any]]): Ranked results with text, relevance_score and optionally
+                document_id and token_count.
+
+        Returns:
+            list[ContextSpan]: Packed spans, most relevant first.
+        """
+        spans = self.merge_adjacent(ranked_documents)
+        packed: list[ContextSpan] = []
+        remaining = self.token_budget
+
+        for span in spans:
+            if span.token_count <= remaining:
+                packed.append(span)
+                remaining -= span.token_count
+            elif remaining >= self.min_trim_tokens:
+                packed.append(self._trim(span, remaining))
+                remaining = 0
+
+            if remaining == 0:
+                break
+
+        logger.info(
+            f"Packed {sum(len(span.chunk_indexes) for span in packed)} of {len(ranked_documents)} chunks into "
+            f"{len(packed)} spans using {self.token_budget - remaining}/{self.token_budget} tokens"
+        )
+        return packed
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from enum import Enum
+from typing import Any
+
+import logfire
+from redis.exceptions import RedisError
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.worker_metrics import WorkerMetrics, metric_field
+from src.infra.external.redis_manager import RedisManager
+from src.infra.logger import get_logger
+from src.infra.settings import settings
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+# Logfire (OpenTelemetry) instrument, a no-op until logfire is configured
+_lookups = logfire.metric_counter("query_cache.lookups", description="Query cache lookups by kind and outcome")
+
+
+class QueryCacheKind(str, Enum):
+    """Kinds of values stored in the query cache."""
+
+    EXPANSION = "expansion"
+    EMBEDDING = "embedding"
+
+
+class QueryCache:
+    """Two-level cache for multi-query expansions and query embeddings.
+
+    Values are looked up in a process-local LRU first, then in Redis, and only computed on a miss. Keys are built from
+    the normalized query and the model, so whitespace and case differences share an entry. Redis failures are logged
+    and treated as misses, the cache never fails a search.
+
+    Hits, misses and bypasses are counted per kind in `stats` and as a logfire metric. `run` adds them to the metrics
+    hash of the workers every `metrics_flush_interval` seconds, as query_cache_lookups_total by kind and outcome, so
+    they are scraped from the API's metrics endpoint with the worker metrics.
+
+    Args:
+        redis_manager (RedisManager | None): Redis used as the shared second level. Local LRU only when None.
+        max_size (int): Maximum number of entries in the local LRU.
+        expansion_ttl (int): Seconds multi-query expansions are kept.
+        embedding_ttl (int): Seconds query embeddings are kept.
+        enabled (bool): When False every lookup is a bypass.
+    """
+
+    key_prefix = "query_cache"
+
+    def __init__(
+        self,
+        redis_manager: RedisManager | None = None,
+        max_size: int = settings.query_cache_max_size,
+        expansion_ttl: int = settings.query_expansion_cache_ttl,
+        embedding_ttl: int = settings.query_embedding_cache_ttl,
+        enabled: bool = settings.query_cache_enabled,
+    ):
+        self.redis_manager = redis_manager
+        self.max_size = max_size
+        self.ttls = {QueryCacheKind.EXPANSION: expansion_ttl, QueryCacheKind.EMBEDDING: embedding_ttl}
+        self.enabled = enabled
+        self.stats: Counter[str] = Counter()
+        self.pending: Counter[str] = Counter()  # lookups not flushed to the metrics hash yet
+        self._local: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so that case and whitespace differences share a cache entry."""
+        return " ".join(query.lower().split())
+
+    def _key(self, kind: QueryCacheKind, model: str, query: str, *parts: Any) -> str:
+        raw = "\x1f".join([model, self.normalize(query), *map(str, parts)])
+        digest = hashlib.sha256(raw.encode()).hexdigest()
+        return f"{self.key_prefix}:{kind.value}:{digest}"
+
+    def _record(self, kind: QueryCacheKind, outcome: str, count: int = 1) -> None:
+        if count == 0:
+            return
+        self.stats[f"{kind.value}_{outcome}"] += count
+        self.pending[metric_field("query_cache_lookups_total", kind=kind.value, outcome=outcome)] += count
+        _lookups.add(count, {"kind": kind.value, "outcome": outcome})
+
+    def _get_local(self, key: str) -> Any | None:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Any, ttl: int) -> None:
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def _get_remote(self, keys: list[str]) -> list[Any | None]:
+        if self.redis_manager is None or not keys:
+            return [None] * len(keys)
+        try:
+            client = await self.redis_manager.get_async_client()
+            values = await client.mget(keys)
+        except RedisError as e:
+            logger.warning(f"Query cache read failed, treating as miss: {e}")
+            return [None] * len(keys)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def _set_remote(self, items: dict[str, Any], ttl: int) -> None:
+        if self.redis_manager is None or not items:
+            return
+        try:
+            client = await self.redis_manager.get_async_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, json.dumps(value), ex=ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Query cache write failed: {e}")
+
+    async def _get_many(self, kind: QueryCacheKind, keys: list[str]) -> list[Any | None]:
+        """Look up keys in the local LRU and then Redis, promoting Redis hits into the LRU."""
+        values = [self._get_local(key) for key in keys]
+        self._record(kind, "local_hit", sum(value is not None for value in values))
+
+        missing = [i for i, value in enumerate(values) if value is None]
+        remote_values = await self._get_remote([keys[i] for i in missing])
+        for i, value in zip(missing, remote_values, strict=True):
+            if value is not None:
+                values[i] = value
+                self._set_local(keys[i], value, self.ttls[kind])
+                self._record(kind, "redis_hit")
+            else:
+                self._record(kind, "miss")
+        return values
+
+    async def _set_many(self, kind: QueryCacheKind, items: dict[str, Any]) -> None:
+        ttl = self.ttls[kind]
+        for key, value in items.items():
+            self._set_local(key, value, ttl)
+        await self._set_remote(items, ttl)
+
+    async def get_or_generate_expansions(
+        self,
+        query: str,
+        model: str,
+        n_queries: int,
+        generate: Callable[[], Awaitable[list[str]]],
+        use_cache: bool = True,
+    ) -> list[str]:
+        """
+        Return cached multi-query expansions of a query or generate and cache them.
+
+        Args:
+            query (str): The user query that is expanded.
+            model (str): The model generating the expansions, part of the cache key.
+            n_queries (int): Number of expansions requested, part of the cache key.
+            generate (Callable[[], Awaitable[list[str]]]): Produces the expansions on a miss.
+            use_cache (bool): When False the cache is bypassed for this call and nothing is stored.
+
+        Returns:
+            list[str]: The expanded queries.
+        """
+        if not (self.enabled and use_cache):
+            self._record(QueryCacheKind.EXPANSION, "bypass")
+            return await generate()
+
+        key = self._key(QueryCacheKind.EXPANSION, model, query, n_queries)
+        (cached,) = await self._get_many(QueryCacheKind.EXPANSION, [key])
+        if cached is not None:
+            return cached
+
+        expansions = await generate()
+        await self._set_many(QueryCacheKind.EXPANSION, {key: expansions})
+        return expansions
+
+    async def get_or_embed(
+        self,
+        texts: list[str],
+        model: str,
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+        use_cache: bool = True,
+    ) -> list[list[float]]:
+        """
+        Return embeddings for texts, embedding only those that are not cached.
+
+        Args:
+            texts (list[str]): Query texts to embed.
+            model (str): The embedding model, part of the cache key.
+            embed (Callable[[list[str]], Sequence[Sequence[float]]]): Embeds a batch of texts on a miss.
+            use_cache (bool): When False the cache is bypassed for this call and nothing is stored.
+
+        Returns:
+            list[list[float]]: One embedding per text, in input order.
+        """
+        if not (self.enabled and use_cache):
+            self._record(QueryCacheKind.EMBEDDING, "bypass", len(texts))
+            return [[float(x) for x in embedding] for embedding in embed(texts)]
+
+        keys = [self._key(QueryCacheKind.EMBEDDING, model, text) for text in texts]
+        embeddings = await self._get_many(QueryCacheKind.EMBEDDING, keys)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = embed([texts[i] for i in missing])
+            new_items = {}
+            for i, embedding in zip(missing, computed, strict=True):
+                embeddings[i] = [float(x) for x in embedding]
+                new_items[keys[i]] = embeddings[i]
+            await self._set_many(QueryCacheKind.EMBEDDING, new_items)
+
+        return embeddings
+
+    def hit_rate(self, kind: QueryCacheKind) -> float:
+        """Share of cached lookups of a kind served from either cache level."""
+        hits = self.stats[f"{kind.value}_local_hit"] + self.stats[f"{kind.value}_redis_hit"]
+        total = hits + self.stats[f"{kind.value}_miss"]
+        return hits / total if total else 0.0
+
+    async def flush_stats(self) -> None:
+        """Add the lookups counted since the last flush to the metrics hash, keeping them on Redis failures."""
+        if self.redis_manager is None or not self.pending:
+            return
+        pending, self.pending = self.pending, Counter()
+        try:
+            client = await self.redis_manager.get_async_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for field, count in pending.items():
+                    pipe.hincrbyfloat(WorkerMetrics.key, field, count)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to flush query cache metrics, keeping them for the next flush: {e}")
+            self.pending.update(pending)
+
+    async def run(self, flush_interval: float = arq_settings.metrics_flush_interval) -> None:
+        """Flush lookup counts every `flush_interval` seconds until cancelled, flushing once more on cancellation."""
+        try:
+            while True:
+                await asyncio.sleep(flush_interval)
+                await self.flush_stats()
+        finally:
+            await self.flush_stats()
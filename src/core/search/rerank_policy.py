@@ -0,0 +1,104 @@
+from collections import Counter
+from enum import Enum
+from typing import Any
+
+from src.infra.logger import get_logger
+from src.infra.settings import settings
+
+logger = get_logger()
+
+
+class RerankDecision(str, Enum):
+    """Outcome of the rerank policy for a single search."""
+
+    RERANK = "rerank"
+    SKIP_FEW_CANDIDATES = "skip_few_candidates"
+    SKIP_DISTANCE_GAP = "skip_distance_gap"
+    SKIP_LATENCY_BUDGET = "skip_latency_budget"
+
+
+class RerankPolicy:
+    """Decides whether a Cohere rerank is worth paying for on a given set of vector results.
+
+    Reranking is skipped when:
+    - only a handful of unique chunks came back and all of them are returned, so the order can't change which
+    - every result that is returned is ahead of the next one by a wide distance gap, so the order of the returned
+      results is already settled
+    - vector search alone already exhausted the latency budget
+
+    Without a rerank, results farther than `max_distance` are dropped as irrelevant, in place of Cohere's relevance
+    cutoff. Decisions are counted in `stats` so the skip rate can be monitored.
+
+    Args:
+        enabled (bool): When False every search is reranked.
+        max_candidates (int): Skip when at most this many unique chunks are found and all of them are returned.
+        min_distance_gap (float | None): Skip when the distances of the returned results, and of the first result
+            that is not returned, all differ by at least this much.
+        latency_budget_ms (int | None): Skip when the search already took longer than this.
+        max_distance (float): Distance beyond which results are dropped when reranking is skipped.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.rerank_skip_enabled,
+        max_candidates: int = settings.rerank_skip_max_candidates,
+        min_distance_gap: float | None = settings.rerank_skip_min_distance_gap,
+        latency_budget_ms: int | None = settings.rerank_latency_budget_ms,
+        max_distance: float = settings.rerank_skip_max_distance,
+    ):
+        self.enabled = enabled
+        self.max_candidates = max_candidates
+        self.min_distance_gap = min_distance_gap
+        self.latency_budget_ms = latency_budget_ms
+        self.max_distance = max_distance
+        self.stats: Counter[RerankDecision] = Counter()
+
+    def decide(self, unique_documents: dict[str, Any], elapsed_ms: float, top_n: int | None = None) -> RerankDecision:
+        """Decide whether to rerank the deduplicated vector results, of which `top_n` are returned (None for all)."""
+        decision = self._decide(unique_documents, elapsed_ms, top_n)
+        self.stats[decision] += 1
+        if decision != RerankDecision.RERANK:
+            logger.info(f"Skipping rerank ({decision.value}), skip rate so far: {self.skip_rate:.1%}")
+        return decision
+
+    def _decide(self, unique_documents: dict[str, Any], elapsed_ms: float, top_n: int | None) -> RerankDecision:
+        if not self.enabled:
+            return RerankDecision.RERANK
+
+        if len(unique_documents) <= self.max_candidates and (top_n is None or len(unique_documents) <= top_n):
+            return RerankDecision.SKIP_FEW_CANDIDATES
+
+        if self.min_distance_gap is not None:
+            # The returned results and the first one left out must all be a gap apart
+            distances = sorted(doc["distance"] for doc in unique_documents.values())
+            if top_n is not None:
+                distances = distances[: top_n + 1]
+            gaps = [farther - closer for closer, farther in zip(distances, distances[1:], strict=False)]
+            if gaps and min(gaps) >= self.min_distance_gap:
+                return RerankDecision.SKIP_DISTANCE_GAP
+
+        if self.latency_budget_ms is not None and elapsed_ms >= self.latency_budget_ms:
+            return RerankDecision.SKIP_LATENCY_BUDGET
+
+        return RerankDecision.RERANK
+
+    @property
+    def skip_rate(self) -> float:
+        """Share of searches where reranking was skipped."""
+        total = sum(self.stats.values())
+        if total == 0:
+            return 0.0
+        return 1 - self.stats[RerankDecision.RERANK] / total
+
+    def rank_by_distance(self, unique_documents: dict[str, Any]) -> dict[int, dict[str, int | float | str]]:
+        """Build results in the same shape as reranked results, ordered by vector distance.
+
+        The relevance score is derived as 1 / (1 + distance) so that closer chunks score higher. Results farther than
+        `max_distance` are dropped, like reranked results below the relevance threshold are.
+        """
+        ordered = sorted(enumerate(unique_documents.values()), key=lambda item: item[1]["distance"])
+        return {
+            index: {"text": doc["text"], "index": index, "relevance_score": 1 / (1 + doc["distance"])}
+            for index, doc in ordered
+            if doc["distance"] <= self.max_distance
+        }
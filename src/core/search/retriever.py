@@ -4,6 +4,7 @@ from uuid import UUID
 
 from cohere.v2.types import V2RerankResponse
 
+from src.core.search.rerank_policy import RerankDecision, RerankPolicy
 from src.core.search.reranker import Reranker
 from src.core.search.vector_db import VectorDatabase
 from src.infra.logger import get_logger
@@ -18,14 +19,16 @@ class Retriever:
     Args:
         vector_db (VectorDB): The vector database used for querying documents.
         reranker (Reranker): The reranker used for reranking documents.
+        rerank_policy (RerankPolicy, optional): Decides when reranking can be skipped. Defaults to settings.
     """
 
-    def __init__(self, vector_db: VectorDatabase, reranker: Reranker):
+    def __init__(self, vector_db: VectorDatabase, reranker: Reranker, rerank_policy: RerankPolicy | None = None):
         self.vector_db = vector_db
         self.reranker = reranker
+        self.rerank_policy = rerank_policy or RerankPolicy()
 
     async def retrieve(
-        self, rag_query: str, combined_queries: list[str], top_n: int | None, user_id: UUID
+        self, rag_query: str, combined_queries: list[str], top_n: int | None, user_id: UUID, use_cache: bool = True
     ) -> list[dict[str, Any]]:
         """
         Retrieve and rank documents based on user query and combined queries.
@@ -35,6 +38,7 @@ class Retriever:
             combined_queries (list[str]): A list of queries to combine for document retrieval.
             top_n (int, optional): The maximum number of top documents to return. Defaults to None.
             user_id (UUID): The user ID for the query.w
+            use_cache (bool): Whether cached query embeddings may be used. Defaults to True.
 
         Returns:
             list: A list of limited, ranked, and relevant documents.
@@ -46,7 +50,7 @@ class Retriever:
         start_time = time.time()  # Start timing
 
         # get expanded search results
-        search_results = await self.vector_db.query(user_id=user_id, user_query=combined_queries)
+        search_results = await self.vector_db.query(user_id=user_id, user_query=combined_queries, use_cache=use_cache)
         if not search_results or not search_results.get("documents")[0]:
             logger.warning("No documents found in search results")
             return []
@@ -54,11 +58,18 @@ class Retriever:
         unique_documents = self.vector_db.deduplicate_documents(search_results)
         logger.info(f"Search returned {len(unique_documents)} unique chunks")
 
-        # rerank the results
-        ranked_documents = self.reranker.rerank(rag_query, unique_documents)
+        # rerank the results, unless vector search is already decisive
+        elapsed_ms = (time.time() - start_time) * 1000
+        if self.rerank_policy.decide(unique_documents, elapsed_ms, top_n=top_n) == RerankDecision.RERANK:
+            ranked_documents = self.reranker.rerank(rag_query, unique_documents)
 
-        # filter irrelevnat results
-        filtered_results = self.filter_irrelevant_results(ranked_documents, relevance_threshold=0.1)
+            # filter irrelevnat results
+            filtered_results = self.filter_irrelevant_results(ranked_documents, relevance_threshold=0.1)
+        else:
+            filtered_results = self.rerank_policy.rank_by_distance(unique_documents)
+
+        # keep document id and token count around for context packing
+        self.attach_metadata(filtered_results, unique_documents)
 
         # limit the number of returned chunks
         limited_results = self.limit_results(filtered_results, top_n=top_n)
@@ -70,6 +81,20 @@ class Retriever:
 
         return limited_results
 
+    def attach_metadata(self, results: dict[int, dict[str, Any]], unique_documents: dict[str, Any]) -> None:
+        """
+        Copy chunk metadata needed downstream onto ranked results.
+
+        Args:
+            results (dict[int, dict[str, Any]]): Ranked results keyed by their index in unique_documents.
+            unique_documents (dict[str, Any]): Deduplicated search results the indexes refer to.
+        """
+        documents = list(unique_documents.values())
+        for index, result in results.items():
+            metadata = documents[index].get("metadata") or {}
+            result["document_id"] = metadata.get("document_id")
+            result["token_count"] = metadata.get("token_count")
+
     def filter_irrelevant_results(
         self, response: V2RerankResponse, relevance_threshold: float = 0.1
     ) -> dict[int, dict[str, int | float | str]]:
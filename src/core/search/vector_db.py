@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
 from chromadb.api.async_api import AsyncCollection, GetResult
@@ -10,33 +10,104 @@ from src.core.search.embedding_manager import EmbeddingManager
 from src.infra.decorators import generic_error_handler
 from src.infra.external.chroma_manager import ChromaManager
 from src.infra.logger import get_logger
+from src.infra.settings import get_settings
 from src.models.content_models import Chunk
-from src.models.vector_models import VectorCollection
+from src.models.vector_models import CollectionLayout, VectorCollection
 from src.services.data_service import DataService
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from src.core.search.query_cache import QueryCache
+
 logger = get_logger()
+settings = get_settings()
+
+# Chroma rejects requests above its max batch size (~5.4k for the default sqlite backend)
+DEFAULT_BATCH_SIZE = 5000
 
 
 class VectorDatabase:
-    """Vector database responsible for storing and querying chunks."""
+    """Vector database responsible for storing and querying chunks.
+
+    Supports two collection layouts (see CollectionLayout):
+    - PER_USER: every user gets a dedicated collection named after the user id.
+    - SHARDED: users are spread over `shard_count` shared collections by hash(user_id). Every vector carries
+      `user_id` and `source_id` metadata and every read, query and delete is filtered by `user_id`.
+    """
 
     def __init__(
         self,
         chroma_manager: ChromaManager,
         embedding_manager: EmbeddingManager,
         data_service: DataService,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        layout: CollectionLayout = settings.chroma_collection_layout,
+        shard_count: int = settings.chroma_shard_count,
+        query_cache: QueryCache | None = None,
     ):
         self.chroma_manager = chroma_manager
         self.embedding_manager = embedding_manager
         self.data_service = data_service
+        self.batch_size = batch_size
+        self.layout = layout
+        self.shard_count = shard_count if layout == CollectionLayout.SHARDED else 1
+        self.query_cache = query_cache
+
+        # Shared collections are never dropped, so their handles can be cached for the lifetime of the process
+        self._shared_collections: dict[str, AsyncCollection] = {}
+
+    @staticmethod
+    def _batched(items: list[str], batch_size: int) -> Iterator[list[str]]:
+        """Yield consecutive batches of at most batch_size items."""
+        for i in range(0, len(items), batch_size):
+            yield items[i : i + batch_size]
+
+    @staticmethod
+    def _prepare_chunks(chunks: list[Chunk], user_id: UUID) -> tuple[list[str], list[str], list[dict[str, str | int]]]:
+        """Convert chunks into ids, documents and metadatas accepted by Chroma."""
+        ids = [str(chunk.chunk_id) for chunk in chunks]
+        documents = [chunk.content for chunk in chunks]
+        metadatas = [
+            {
+                "page_url": str(chunk.page_url),
+                "page_title": str(chunk.page_title),
+                "source_id": str(chunk.source_id),
+                "document_id": str(chunk.document_id),
+                "token_count": chunk.token_count,
+                "user_id": str(user_id),
+            }
+            for chunk in chunks
+        ]
+        return ids, documents, metadatas
+
+    def _collection_for(self, user_id: UUID) -> VectorCollection:
+        """Describe the collection holding the user's vectors in the configured layout."""
+        return VectorCollection(user_id=user_id, layout=self.layout, shard_count=self.shard_count)
+
+    def _where(self, user_id: UUID, source_id: UUID | None = None) -> dict[str, Any] | None:
+        """Build the metadata filter that scopes an operation to a user and optionally a source."""
+        conditions: list[dict[str, Any]] = []
+        if self.layout == CollectionLayout.SHARDED:
+            conditions.append({"user_id": str(user_id)})
+        if source_id is not None:
+            conditions.append({"source_id": str(source_id)})
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
 
     async def _create_collection(self, user_id: UUID) -> VectorCollection:
         """Create a collection for a user."""
         # 1. Create collection in ChromaDB
         try:
             client = await self.chroma_manager.get_async_client()
-            collection_name = VectorCollection(user_id=user_id).name
-            collection = await client.create_collection(collection_name)
+            collection_name = self._collection_for(user_id).name
+            collection = await client.create_collection(
+                collection_name, embedding_function=self.embedding_manager.get_embedding_function()
+            )
             logger.info(f"Created collection for user ID: {str(user_id)}")
         except ValueError:
             logger.exception(
@@ -51,16 +122,35 @@ class VectorDatabase:
         """Get an existing collection for a user."""
         try:
             client = await self.chroma_manager.get_async_client()
-            collection_name = VectorCollection(user_id=user_id).name
-            collection = await client.get_collection(collection_name)
+            collection_name = self._collection_for(user_id).name
+            collection = await client.get_collection(
+                collection_name, embedding_function=self.embedding_manager.get_embedding_function()
+            )
             logger.info(f"Collection for user ID {str(user_id)} exists")
             return collection
         except InvalidCollectionException:
             logger.info(f"Collection for user ID {str(user_id)} does not exist")
             return None
 
+    async def _get_shared_collection(self, user_id: UUID) -> AsyncCollection:
+        """Get or create the shared collection of the user's shard."""
+        collection_name = self._collection_for(user_id).name
+        collection = self._shared_collections.get(collection_name)
+        if collection is None:
+            client = await self.chroma_manager.get_async_client()
+            # get_or_create is safe when several workers race to create the same shard
+            collection = await client.get_or_create_collection(
+                collection_name, embedding_function=self.embedding_manager.get_embedding_function()
+            )
+            self._shared_collections[collection_name] = collection
+            logger.info(f"Using shared collection {collection_name}")
+        return collection
+
     async def get_or_create_collection(self, user_id: UUID) -> AsyncCollection:
         """Get or create a collection for a user."""
+        if self.layout == CollectionLayout.SHARDED:
+            return await self._get_shared_collection(user_id)
+
         existing_collection = await self._get_existing_collection(user_id)
 
         if existing_collection:
@@ -69,9 +159,30 @@ class VectorDatabase:
             new_collection = await self._create_collection(user_id)
             return new_collection
 
+    async def _get_ids(self, collection: AsyncCollection, where: dict[str, Any] | None) -> list[str]:
+        """Get the ids of all vectors in a collection matching the filter, reading batch_size ids at a time."""
+        ids: list[str] = []
+        while True:
+            results = await collection.get(where=where, limit=self.batch_size, offset=len(ids), include=[])
+            ids.extend(results["ids"])
+            if len(results["ids"]) < self.batch_size:
+                return ids
+
+    async def _delete_ids(self, collection: AsyncCollection, ids: list[str]) -> None:
+        """Delete vectors by id in batches."""
+        for batch in self._batched(ids, self.batch_size):
+            await collection.delete(ids=batch)
+
     async def delete_collection(self, user_id: UUID) -> None:
-        """Delete a collection for a user."""
-        collection_name = VectorCollection(user_id=user_id).name
+        """Delete a collection for a user. In the sharded layout only the user's vectors are removed."""
+        if self.layout == CollectionLayout.SHARDED:
+            collection = await self.get_or_create_collection(user_id)
+            ids = await self._get_ids(collection, self._where(user_id))
+            await self._delete_ids(collection, ids)
+            logger.info(f"Deleted {len(ids)} vectors of user {user_id} from shared collection {collection.name}")
+            return
+
+        collection_name = self._collection_for(user_id).name
         client = await self.chroma_manager.get_async_client()
         try:
             await client.delete_collection(name=collection_name)
@@ -80,22 +191,12 @@ class VectorDatabase:
             logger.exception(f"Collection for user ID {str(user_id)} does not exist")
 
     async def add_data(self, chunks: list[Chunk], user_id: UUID, fake_embeddings: bool = False) -> None:
-        """Add data to the vector database."""
+        """Add data to the vector database, chunks that were added before are overwritten."""
         collection = await self.get_or_create_collection(user_id)
-
-        ids = [str(chunk.chunk_id) for chunk in chunks]
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [
-            {
-                "page_url": str(chunk.page_url),
-                "page_title": str(chunk.page_title),
-                "source_id": str(chunk.source_id),
-            }
-            for chunk in chunks
-        ]
+        ids, documents, metadatas = self._prepare_chunks(chunks, user_id)
 
         try:
-            await collection.add(
+            await collection.upsert(
                 ids=ids,
                 documents=documents,
                 metadatas=metadatas,
@@ -108,21 +209,83 @@ class VectorDatabase:
                 f"Error adding documents to collection {collection.name}, please check the ids, documents, and metadatas"
             )
 
+    async def get_source_chunk_ids(self, user_id: UUID, source_id: UUID) -> list[str]:
+        """Get the ids of all vectors that belong to a source."""
+        collection = await self.get_or_create_collection(user_id)
+        return await self._get_ids(collection, self._where(user_id, source_id))
+
+    async def delete_source(self, user_id: UUID, source_id: UUID) -> int:
+        """Delete all vectors of a single source without touching the rest of the user collection.
+
+        Args:
+            user_id: The user the collection belongs to
+            source_id: The source whose vectors should be removed
+
+        Returns:
+            int: Number of deleted vectors
+        """
+        collection = await self.get_or_create_collection(user_id)
+        ids = await self.get_source_chunk_ids(user_id, source_id)
+        await self._delete_ids(collection, ids)
+
+        logger.info(f"Deleted {len(ids)} vectors of source {source_id} from collection {collection.name}")
+        return len(ids)
+
+    async def replace_source(self, user_id: UUID, source_id: UUID, chunks: list[Chunk]) -> int:
+        """Replace all vectors of a source with a new set of chunks.
+
+        New chunks are upserted before stale ones are deleted, so the source stays searchable throughout the
+        replacement and a failure midway leaves the previous vectors in place.
+
+        Args:
+            user_id: The user the collection belongs to
+            source_id: The source whose vectors should be replaced
+            chunks: The new chunks of the source
+
+        Returns:
+            int: Number of stale vectors that were deleted
+        """
+        if any(chunk.source_id != source_id for chunk in chunks):
+            raise ValueError(f"All chunks must belong to source {source_id}")
+
+        collection = await self.get_or_create_collection(user_id)
+        existing_ids = await self.get_source_chunk_ids(user_id, source_id)
+
+        # 1. Upsert the new chunks in batches
+        ids, documents, metadatas = self._prepare_chunks(chunks, user_id)
+        for start in range(0, len(ids), self.batch_size):
+            end = start + self.batch_size
+            await collection.upsert(ids=ids[start:end], documents=documents[start:end], metadatas=metadatas[start:end])
+
+        # 2. Remove vectors that are not part of the new set
+        new_ids = set(ids)
+        stale_ids = [chunk_id for chunk_id in existing_ids if chunk_id not in new_ids]
+        await self._delete_ids(collection, stale_ids)
+
+        logger.info(
+            f"Replaced vectors of source {source_id}: upserted {len(ids)}, deleted {len(stale_ids)} stale vectors"
+        )
+        return len(stale_ids)
+
     async def get_data(self, user_id: UUID, lookup_ids: list[UUID]) -> GetResult:
         """Get data from the vector database by id."""
         collection = await self.get_or_create_collection(user_id)
         ids = [str(lookup_id) for lookup_id in lookup_ids]
-        results = await collection.get(ids=ids)
+        results = await collection.get(ids=ids, where=self._where(user_id))
         return results
 
     @generic_error_handler
-    async def query(self, user_id: UUID, user_query: str | list[str], n_results: int = 10) -> dict[str, Any]:
+    async def query(
+        self, user_id: UUID, user_query: str | list[str], n_results: int = 10, use_cache: bool = True
+    ) -> dict[str, Any]:
         """
         Query the collection to retrieve documents based on the user's query.
 
         Args:
+            user_id (UUID): The user whose collection is queried.
             user_query (str | list[str]): A string or list of strings representing the user's query.
             n_results (int, optional): The number of results to retrieve. Defaults to 10.
+            use_cache (bool, optional): Whether cached query embeddings may be used. Defaults to True.
 
         Returns:
             list: A list of search results matching the query.
@@ -132,11 +295,27 @@ class VectorDatabase:
         """
         collection = await self.get_or_create_collection(user_id)
         query_texts = [user_query] if isinstance(user_query, str) else user_query
+        if self.query_cache is None:
+            query_input: dict[str, Any] = {"query_texts": query_texts}
+        else:
+            query_input = {"query_embeddings": await self._embed_queries(query_texts, use_cache)}
+
         search_results = await collection.query(
-            query_texts=query_texts, n_results=n_results, include=["documents", "distances", "embeddings"]
+            **query_input,
+            n_results=n_results,
+            where=self._where(user_id),
+            include=["documents", "distances", "metadatas", "embeddings"],
         )
         return search_results
 
+    async def _embed_queries(self, query_texts: list[str], use_cache: bool) -> list[list[float]]:
+        """Embed query texts with the embedding manager's function, reusing cached embeddings when possible."""
+        embedding_function = self.embedding_manager.get_embedding_function()
+        model = f"{self.embedding_manager.provider.value}:{self.embedding_manager.model.value}"
+        return await self.query_cache.get_or_embed(
+            query_texts, model=model, embed=embedding_function, use_cache=use_cache
+        )
+
     def deduplicate_documents(self, search_results: dict[str, Any]) -> dict[str, Any]:
         """
         Remove duplicate documents from search results based on unique chunk IDs.
@@ -145,7 +324,7 @@ class VectorDatabase:
             search_results (dict[str, Any]): A dictionary containing lists of documents, distances, and IDs.
 
         Returns:
-            dict[str, Any]: A dictionary of unique documents with their corresponding text and distance.
+            dict[str, Any]: A dictionary of unique documents with their corresponding text, distance and metadata.
 
         Raises:
             None.
@@ -153,10 +332,11 @@ class VectorDatabase:
         documents = search_results["documents"][0]
         distances = search_results["distances"][0]
         ids = search_results["ids"][0]
+        metadatas = (search_results.get("metadatas") or [None])[0] or [None] * len(ids)
 
         unique_documents = {}
 
-        for chunk_id, doc, distance in zip(ids, documents, distances, strict=True):
+        for chunk_id, doc, distance, metadata in zip(ids, documents, distances, metadatas, strict=True):
             if chunk_id not in unique_documents:
-                unique_documents[chunk_id] = {"text": doc, "distance": distance}
+                unique_documents[chunk_id] = {"text": doc, "distance": distance, "metadata": metadata or {}}
         return unique_documents
@@ -6,7 +6,9 @@ from arq.connections import RedisSettings
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+from src.infra.arq.queues import QueueName
 from src.infra.arq.serializer import deserialize, serialize
+from src.infra.external.backend_limiter import Backend
 from src.infra.logger import get_logger
 from src.infra.settings import get_settings
 
@@ -33,6 +35,46 @@ class ArqSettings(BaseSettings):
     job_retries: int = Field(3, description="Number of default job retries, decreased from 5 to 3")
     health_check_interval: int = Field(60, description="Health check interval")
     max_jobs: int = Field(1000, description="Maximum number of jobs in the queue")
+    queue_weights: dict[QueueName, int] = Field(
+        {QueueName.CONTROL: 1, QueueName.FINALIZATION: 1, QueueName.BULK: 8},
+        description="Share of max_jobs per queue consumed by a worker, queues with weight 0 are not consumed",
+    )
+    metrics_flush_interval: float = Field(15, description="Seconds between flushes of worker metrics to Redis")
+
+    # Backpressure settings
+    backend_max_concurrency: dict[Backend, int] = Field(
+        {Backend.CHROMA: 16, Backend.SUPABASE: 32},
+        description="Maximum concurrent requests per backend across all jobs of a worker process",
+    )
+    backend_latency_targets: dict[Backend, float] = Field(
+        {Backend.CHROMA: 10.0, Backend.SUPABASE: 5.0},
+        description="Seconds per request above which a backend is considered overloaded and concurrency is reduced",
+    )
+
+    # Fan-in settings
+    fan_in_ttl: int = Field(60 * 60 * 24, description="Seconds a fan-in latch and its child results are kept")
+
+    # Checkpoint settings
+    checkpoint_ttl: int = Field(
+        60 * 60 * 24, description="Seconds the completed work of an unfinished ingestion is remembered for retries"
+    )
+
+    # Ingestion coalescing settings
+    ingestion_lease_ttl: int = Field(
+        60 * 60 * 6, description="Seconds after which the lease of an unfinished ingestion run expires"
+    )
+
+    # Webhook settings
+    webhook_event_retry_delay: int = Field(
+        5, gt=0, description="Seconds before a failed webhook event is retried, multiplied by the attempt number"
+    )
+
+    # Bulk enqueue settings
+    bulk_enqueue_chunk_size: int = Field(500, gt=0, description="Maximum number of jobs enqueued in one transaction")
+
+    # Claim-check settings
+    claim_check_enabled: bool = Field(True, description="Pass large job payloads by reference instead of inline")
+    claim_check_ttl: int = Field(60 * 60 * 24, description="Seconds claim-checked payloads are kept in Redis")
 
     @property
     def redis_settings(self) -> RedisSettings:
@@ -0,0 +1,133 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from arq import ArqRedis
+from arq.constants import job_key_prefix, result_key_prefix
+from arq.jobs import Job, serialize_job
+from arq.utils import timestamp_ms, to_ms, to_unix_ms
+from redis.exceptions import WatchError
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.queues import queue_for
+from src.infra.logger import get_logger
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """Arguments of a single `ArqRedis.enqueue_job` call, the queue defaults to the queue of the task."""
+
+    function: str
+    args: tuple[Any, ...] = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    job_id: str | None = None
+    queue_name: str | None = None
+    defer_until: datetime | None = None
+    defer_by: int | float | timedelta | None = None
+    expires: int | float | timedelta | None = None
+    job_try: int | None = None
+
+    @property
+    def queue(self) -> str:
+        """Queue the job is enqueued on."""
+        return self.queue_name or queue_for(self.function)
+
+    async def enqueue(self, redis: ArqRedis, job_id: str | None = None) -> Job | None:
+        """Enqueue the job on its own with `ArqRedis.enqueue_job`."""
+        return await redis.enqueue_job(
+            self.function,
+            *self.args,
+            _job_id=job_id or self.job_id,
+            _queue_name=self.queue,
+            _defer_until=self.defer_until,
+            _defer_by=self.defer_by,
+            _expires=self.expires,
+            _job_try=self.job_try,
+            **self.kwargs,
+        )
+
+
+async def enqueue_jobs(
+    redis: ArqRedis, jobs: Sequence[JobSpec], chunk_size: int = arq_settings.bulk_enqueue_chunk_size
+) -> list[Job | None]:
+    """Enqueue many jobs with a constant number of Redis round trips per chunk of jobs.
+
+    Has the same semantics as calling `enqueue_job` for every job: a job whose ID already has a job or a result is not
+    enqueued and None is returned in its place, as is the case for a repeated ID within `jobs`.
+
+    Per chunk, the job keys are watched and checked for existence in one round trip each, then all jobs are written
+    in one MULTI/EXEC. If a watched key changes in between, the chunk falls back to enqueueing its jobs one by one.
+
+    Returns:
+        list[Job | None]: A job or None per job spec, in order.
+    """
+    results: list[Job | None] = []
+    for start in range(0, len(jobs), chunk_size):
+        results.extend(await _enqueue_chunk(redis, jobs[start : start + chunk_size]))
+    return results
+
+
+async def _enqueue_chunk(redis: ArqRedis, jobs: Sequence[JobSpec]) -> list[Job | None]:
+    if any(spec.defer_until and spec.defer_by for spec in jobs):
+        raise RuntimeError("use either 'defer_until' or 'defer_by' or neither, not both")
+
+    job_ids = [spec.job_id or uuid4().hex for spec in jobs]
+    async with redis.pipeline(transaction=True) as pipe:
+        await pipe.watch(*(job_key_prefix + job_id for job_id in job_ids))
+
+        async with redis.pipeline(transaction=False) as check:
+            for job_id in job_ids:
+                check.exists(job_key_prefix + job_id, result_key_prefix + job_id)
+            existing = await check.execute()
+
+        seen: set[str] = set()
+        enqueued = []
+        for job_id, exists in zip(job_ids, existing, strict=True):
+            enqueued.append(not exists and job_id not in seen)
+            seen.add(job_id)
+        if not any(enqueued):
+            await pipe.reset()
+            return [None] * len(jobs)
+
+        enqueue_time_ms = timestamp_ms()
+        pipe.multi()
+        for spec, job_id, enqueue in zip(jobs, job_ids, enqueued, strict=True):
+            if not enqueue:
+                continue
+            if spec.defer_until is not None:
+                score = to_unix_ms(spec.defer_until)
+            elif defer_by_ms := to_ms(spec.defer_by):
+                score = enqueue_time_ms + defer_by_ms
+            else:
+                score = enqueue_time_ms
+            expires_ms = to_ms(spec.expires) or score - enqueue_time_ms + redis.expires_extra_ms
+            job = serialize_job(
+                spec.function, spec.args, spec.kwargs, spec.job_try, enqueue_time_ms, serializer=redis.job_serializer
+            )
+            pipe.psetex(job_key_prefix + job_id, expires_ms, job)
+            pipe.zadd(spec.queue, {job_id: score})
+        try:
+            await pipe.execute()
+        except WatchError:
+            logger.warning(f"Jobs changed while enqueueing {len(jobs)} jobs in bulk, enqueueing them one by one")
+            return [
+                await spec.enqueue(redis, job_id) if enqueue else None
+                for spec, job_id, enqueue in zip(jobs, job_ids, enqueued, strict=True)
+            ]
+
+    return [
+        Job(
+            job_id,
+            redis=redis,
+            _queue_name=spec.queue,
+            _deserializer=redis.job_deserializer,
+        )
+        if enqueue
+        else None
+        for spec, job_id, enqueue in zip(jobs, job_ids, enqueued, strict=True)
+    ]
@@ -0,0 +1,64 @@
+from enum import Enum
+from uuid import UUID
+
+from arq import ArqRedis
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.logger import get_logger
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+
+class CheckpointStage(str, Enum):
+    """Units of ingestion work that are checkpointed once completed."""
+
+    DOCUMENTS = "documents"  # documents whose chunks are all persisted
+    CHUNKS = "chunks"  # chunks persisted to Chroma and Supabase
+    SUMMARY = "summary"  # source summary generated
+
+
+class IngestionCheckpoint:
+    """Records which ingestion work of a source has completed, so that retries only do the unfinished rest.
+
+    Completed ids are kept in a Redis set per source and stage. Jobs skip what a checkpoint covers, so re-enqueueing
+    `process_documents` after a failure, or ARQ re-running jobs after a worker restart, does not redo finished batches.
+    Writes are idempotent (chunk ids are deterministic and storage upserts), so work that completed but was not
+    checkpointed yet is simply written again.
+
+    The checkpoint is cleared once the source completed. Otherwise it expires after `ttl` seconds.
+
+    Key layout:
+    - checkpoint:{source_id}:{stage} - set of completed ids
+    """
+
+    key_prefix = "checkpoint"
+
+    def __init__(self, redis: ArqRedis, ttl: int = arq_settings.checkpoint_ttl):
+        self.redis = redis
+        self.ttl = ttl
+
+    def _key(self, source_id: UUID, stage: CheckpointStage) -> str:
+        return f"{self.key_prefix}:{source_id}:{stage.value}"
+
+    async def completed(self, source_id: UUID, stage: CheckpointStage, ids: list[UUID]) -> set[UUID]:
+        """Get the subset of ids that completed the stage."""
+        if not ids:
+            return set()
+        flags = await self.redis.smismember(self._key(source_id, stage), [str(id_) for id_ in ids])
+        return {id_ for id_, flag in zip(ids, flags, strict=True) if flag}
+
+    async def mark_completed(self, source_id: UUID, stage: CheckpointStage, ids: list[UUID]) -> None:
+        """Record that ids completed the stage."""
+        if not ids:
+            return
+        key = self._key(source_id, stage)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(key, *(str(id_) for id_ in ids))
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+        logger.debug(f"Checkpointed {len(ids)} {stage.value} of source {source_id}")
+
+    async def clear(self, source_id: UUID) -> None:
+        """Remove the checkpoint of a source once it completed."""
+        await self.redis.delete(*(self._key(source_id, stage) for stage in CheckpointStage))
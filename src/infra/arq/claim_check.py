@@ -0,0 +1,74 @@
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+from arq import ArqRedis
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.serializer import deserialize, serialize
+from src.infra.logger import get_logger
+from src.models.task_models import ClaimCheck
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+
+class PayloadStore:
+    """Stores large job payloads in Redis once and hands out ClaimCheck references to pass between jobs.
+
+    Every item is stored under its own key, so a job that only needs part of a payload (e.g. a batch of documents)
+    carries and loads only the references it needs. Payloads expire after `ttl` seconds.
+    """
+
+    key_prefix = "claim_check"
+
+    def __init__(self, redis: ArqRedis, ttl: int = arq_settings.claim_check_ttl):
+        self.redis = redis
+        self.ttl = ttl
+
+    async def put_many(self, items: list[Any], weigh: Callable[[Any], int] | None = None) -> list[ClaimCheck]:
+        """Store each item under its own key and return a claim check per item.
+
+        Args:
+            items: Payloads to store
+            weigh: Optionally gives the weight of an item, kept on its claim check so that consumers can size work
+                without loading the payload
+        """
+        if not items:
+            return []
+
+        claims = []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for item in items:
+                payload = serialize({"payload": item})
+                claim = ClaimCheck(
+                    key=f"{self.key_prefix}:{uuid4().hex}",
+                    size=len(payload),
+                    weight=weigh(item) if weigh is not None else None,
+                )
+                pipe.set(claim.key, payload, ex=self.ttl)
+                claims.append(claim)
+            await pipe.execute()
+
+        logger.debug(f"Stored {len(claims)} payloads ({sum(c.size for c in claims)} bytes) as claim checks")
+        return claims
+
+    async def get_many(self, claims: list[ClaimCheck]) -> list[Any]:
+        """Load the payloads of the given claim checks, in order.
+
+        Raises:
+            KeyError: If a payload has expired or was deleted.
+        """
+        if not claims:
+            return []
+
+        payloads = await self.redis.mget([claim.key for claim in claims])
+        missing = [claim.key for claim, payload in zip(claims, payloads, strict=True) if payload is None]
+        if missing:
+            raise KeyError(f"{len(missing)} claim-checked payloads are missing, first: {missing[0]}")
+        return [deserialize(payload)["payload"] for payload in payloads]
+
+    async def delete_many(self, claims: list[ClaimCheck]) -> None:
+        """Delete payloads that are no longer needed."""
+        if claims:
+            await self.redis.delete(*(claim.key for claim in claims))
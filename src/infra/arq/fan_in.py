@@ -0,0 +1,210 @@
+from typing import Any
+from uuid import uuid4
+
+from arq import ArqRedis
+from redis.exceptions import WatchError
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.queues import queue_for
+from src.infra.arq.serializer import deserialize, serialize
+from src.infra.logger import get_logger
+from src.models.task_models import KollektivTaskResult
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+
+class FanIn:
+    """Redis countdown latch that joins parallel ARQ jobs without blocking a worker slot.
+
+    The parent creates a latch for N children and names a continuation job. Each child counts the latch down with its
+    result when it finishes. The child whose result completes the set enqueues the continuation, which reads all child
+    results from the latch. Nobody waits or polls, so parents return immediately and free their slot.
+
+    Counting down records the result with HSETNX and reads the number of recorded results in one MULTI/EXEC, so
+    exactly one child observes the full count, and a retried child that reports twice is only counted once.
+
+    When the number of children is not known upfront, e.g. while pages of a crawl are still arriving, the latch is
+    created open. Children are added as they are enqueued and the latch is closed once no more will be added. Closing
+    fixes the count to the number of added children, the continuation fires when both the latch is closed and all
+    children reported.
+
+    Key layout (all keys expire after `ttl` seconds so abandoned latches clean themselves up):
+    - fan_in:{latch_id}:count        - number of children, OPEN while children are still being added
+    - fan_in:{latch_id}:added        - number of children added to an open latch
+    - fan_in:{latch_id}:results      - hash of member -> serialized KollektivTaskResult
+    - fan_in:{latch_id}:continuation - serialized continuation function name and arguments
+    """
+
+    key_prefix = "fan_in"
+    OPEN = -1
+
+    def __init__(self, redis: ArqRedis, ttl: int = arq_settings.fan_in_ttl):
+        self.redis = redis
+        self.ttl = ttl
+
+    def _key(self, latch_id: str, name: str) -> str:
+        return f"{self.key_prefix}:{latch_id}:{name}"
+
+    def continuation_job_id(self, latch_id: str) -> str:
+        """Job id of the continuation, fixed so that it can only ever be enqueued once per latch."""
+        return f"{self.key_prefix}_continuation:{latch_id}"
+
+    @staticmethod
+    def child_job_id(latch_id: str, function: str) -> str:
+        """Job id of a child that is enqueued once per latch, so its result can be told apart from the others."""
+        return f"{function}:{latch_id}"
+
+    async def create(self, count: int, continuation: str, *args: Any) -> str:
+        """Create a latch for `count` children.
+
+        Must be called before any child is enqueued. The continuation is enqueued as
+        `continuation(latch_id, *args)` once all children counted down, or immediately when count is zero.
+
+        Returns:
+            str: The latch id to pass to the children.
+        """
+        latch_id = uuid4().hex
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(latch_id, "count"), count, ex=self.ttl)
+            pipe.set(
+                self._key(latch_id, "continuation"),
+                serialize({"function": continuation, "args": list(args)}),
+                ex=self.ttl,
+            )
+            await pipe.execute()
+        logger.debug(f"Created fan-in {latch_id} for {count} jobs, continuation: {continuation}")
+
+        if count == 0:
+            await self._fire(latch_id)
+        return latch_id
+
+    async def create_open(self, continuation: str, *args: Any) -> str:
+        """Create a latch whose children are added with `add` until it is closed with `close`.
+
+        Returns:
+            str: The latch id to pass to the children.
+        """
+        return await self.create(self.OPEN, continuation, *args)
+
+    async def add(self, latch_id: str, count: int = 1) -> bool:
+        """Add children to an open latch, must be called before the children are enqueued.
+
+        Returns:
+            bool: False if the latch was closed already, the children must then not report to it
+        """
+        added_key = self._key(latch_id, "added")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.incrby(added_key, count)
+            pipe.expire(added_key, self.ttl)
+            pipe.get(self._key(latch_id, "count"))
+            _, _, latch_count = await pipe.execute()
+        return latch_count is not None and int(latch_count) == self.OPEN
+
+    async def remove(self, latch_id: str, count: int = 1) -> bool:
+        """Take back children added to an open latch that could not be enqueued.
+
+        Returns:
+            bool: False if the latch was closed meanwhile, the children are then part of its count and must report
+        """
+        count_key, added_key = self._key(latch_id, "count"), self._key(latch_id, "added")
+        while True:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(count_key)
+                    latch_count = await pipe.get(count_key)
+                    if latch_count is None or int(latch_count) != self.OPEN:
+                        return False
+                    pipe.multi()
+                    pipe.decrby(added_key, count)
+                    await pipe.execute()
+                    return True
+                except WatchError:
+                    continue
+
+    async def close(self, latch_id: str) -> bool:
+        """Close an open latch, its continuation fires once all added children reported.
+
+        Returns:
+            bool: False if the latch was closed already or does not exist
+        """
+        count_key, added_key, results_key = (self._key(latch_id, name) for name in ("count", "added", "results"))
+        while True:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(count_key, added_key)
+                    count = await pipe.get(count_key)
+                    if count is None or int(count) != self.OPEN:
+                        return False
+                    added = int(await pipe.get(added_key) or 0)
+                    pipe.multi()
+                    pipe.set(count_key, added, ex=self.ttl)
+                    pipe.hlen(results_key)
+                    _, recorded = await pipe.execute()
+                    break
+                except WatchError:
+                    continue
+
+        logger.debug(f"Closed fan-in {latch_id} with {added} jobs, {recorded} reported")
+        if recorded >= added:
+            await self._fire(latch_id)
+        return True
+
+    async def count_down(self, latch_id: str, member: str, result: KollektivTaskResult) -> bool:
+        """Record a child's result and trigger the continuation if it was the last child.
+
+        Args:
+            latch_id: The latch created by the parent
+            member: Unique name of the child, normally its job id, so a retried child is only counted once
+            result: The child's result, handed to the continuation
+
+        Returns:
+            bool: True if this call completed the latch
+        """
+        results_key = self._key(latch_id, "results")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hsetnx(results_key, member, serialize({"result": result}))
+            pipe.expire(results_key, self.ttl)
+            pipe.hlen(results_key)
+            pipe.get(self._key(latch_id, "count"))
+            added, _, recorded, count = await pipe.execute()
+
+        if not added:
+            logger.warning(f"Member {member} already counted down fan-in {latch_id}, ignoring")
+            return False
+        if count is None:
+            logger.error(f"Fan-in {latch_id} does not exist or has expired, dropping result of {member}")
+            return False
+        if int(count) == self.OPEN or recorded < int(count):
+            return False
+
+        await self._fire(latch_id)
+        return True
+
+    async def _fire(self, latch_id: str) -> None:
+        """Enqueue the continuation of a completed latch."""
+        raw = await self.redis.get(self._key(latch_id, "continuation"))
+        if raw is None:
+            logger.error(f"Continuation of fan-in {latch_id} is missing, it may have expired")
+            return
+        continuation = deserialize(raw)
+        await self.redis.enqueue_job(
+            continuation["function"],
+            latch_id,
+            *continuation["args"],
+            _job_id=self.continuation_job_id(latch_id),
+            _queue_name=queue_for(continuation["function"]),
+        )
+        logger.debug(f"Fan-in {latch_id} complete, enqueued {continuation['function']}")
+
+    async def results(self, latch_id: str) -> dict[str, KollektivTaskResult]:
+        """Get the results recorded by the children, keyed by member."""
+        raw_results = await self.redis.hgetall(self._key(latch_id, "results"))
+        return {
+            (member.decode() if isinstance(member, bytes) else member): deserialize(value)["result"]
+            for member, value in raw_results.items()
+        }
+
+    async def delete(self, latch_id: str) -> None:
+        """Remove a latch once its continuation consumed the results."""
+        await self.redis.delete(*(self._key(latch_id, name) for name in ("count", "added", "results", "continuation")))
@@ -0,0 +1,91 @@
+import hashlib
+from collections.abc import Iterable
+from uuid import UUID, uuid4
+
+from arq import ArqRedis
+from redis.exceptions import WatchError
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.logger import get_logger
+from src.models.content_models import Document
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+
+class IngestionLease:
+    """Coalesces duplicate ingestions of the same content into one run.
+
+    Content is identified by the source and a fingerprint of its documents. The trigger that acquires the lease
+    starts a run whose job id is the content identity plus a token unique to the run, and stores that job id in the
+    lease. Triggers that find the lease taken, e.g. a redelivered completion webhook, attach to the in-flight run
+    instead of starting another one. The run releases the lease once it completed or failed. Every run has its own
+    job id, so a retry of a failed run is not rejected by ARQ while the failed job's result is still kept. Releasing
+    only deletes the lease while it still holds the run's job id, so a run that outlived its lease cannot release the
+    lease of a newer run. The lease expires after `ttl` seconds in case the run never finishes.
+
+    Key layout:
+    - ingestion_lease:{source_id}:{fingerprint} - job id of the run holding the lease
+    """
+
+    key_prefix = "ingestion_lease"
+
+    def __init__(self, redis: ArqRedis, ttl: int = arq_settings.ingestion_lease_ttl):
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def digest(document: Document) -> str:
+        """Digest of a single document, the unit a fingerprint is built from."""
+        return f"{document.metadata.source_url}\x1f{hashlib.sha256(document.content.encode()).hexdigest()}"
+
+    @staticmethod
+    def combine(digests: Iterable[str]) -> str:
+        """Fingerprint of document digests, so callers can fingerprint documents they do not hold at once."""
+        return hashlib.sha256("\x1e".join(sorted(digests)).encode()).hexdigest()[:32]
+
+    @classmethod
+    def fingerprint(cls, documents: list[Document]) -> str:
+        """Fingerprint of the content of documents, independent of their order and ids."""
+        return cls.combine(cls.digest(document) for document in documents)
+
+    def _key(self, source_id: UUID, fingerprint: str) -> str:
+        return f"{self.key_prefix}:{source_id}:{fingerprint}"
+
+    @staticmethod
+    def job_id(source_id: UUID, fingerprint: str, token: str) -> str:
+        """Job id of the process_documents job of a run."""
+        return f"process_documents:{source_id}:{fingerprint}:{token}"
+
+    async def acquire(self, source_id: UUID, fingerprint: str) -> str | None:
+        """Take the lease of a run.
+
+        Returns:
+            str | None: Job id of the run the caller should start, None if a run of the same content is in flight
+        """
+        run_id = self.job_id(source_id, fingerprint, uuid4().hex)
+        acquired = await self.redis.set(self._key(source_id, fingerprint), run_id, nx=True, ex=self.ttl)
+        return run_id if acquired else None
+
+    async def release(self, source_id: UUID, fingerprint: str, run_id: str) -> bool:
+        """Release the lease once the run finished, unless it was taken over by another run meanwhile.
+
+        Returns:
+            bool: True if the lease was held by the run and released
+        """
+        key = self._key(source_id, fingerprint)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                holder = await pipe.get(key)
+                if (holder.decode() if isinstance(holder, bytes) else holder) != run_id:
+                    logger.warning(f"Ingestion lease of source {source_id} ({fingerprint}) is not held by {run_id}")
+                    return False
+                pipe.multi()
+                pipe.delete(key)
+                await pipe.execute()
+            except WatchError:
+                logger.warning(f"Ingestion lease of source {source_id} ({fingerprint}) changed while releasing it")
+                return False
+        logger.debug(f"Released ingestion lease of source {source_id} ({fingerprint})")
+        return True
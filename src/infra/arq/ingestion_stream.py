@@ -0,0 +1,114 @@
+import hashlib
+from uuid import UUID, uuid4
+
+from arq import ArqRedis
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.fan_in import FanIn
+from src.infra.logger import get_logger
+from src.models.content_models import Document
+from src.models.task_models import KollektivTaskResult, KollektivTaskStatus
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+
+class IngestionStream:
+    """Tracks a source whose pages are processed while the crawl is still running.
+
+    Every page claims its URL before it is processed, so a page delivered twice, or delivered by a webhook and found
+    again in the final crawl results, is processed once. Processing jobs report to an open fan-in created with the
+    stream. Finalizing the stream, which happens once per stream, adds the last jobs and closes the fan-in, whose
+    continuation then finalizes the source.
+
+    Key layout (all keys expire after `ttl` seconds):
+    - ingestion_stream:{source_id}:latch    - id of the open fan-in of the stream
+    - ingestion_stream:{source_id}:pages    - set of claimed page URLs
+    - ingestion_stream:{source_id}:finalize - set once the stream is being finalized
+    """
+
+    key_prefix = "ingestion_stream"
+
+    def __init__(self, redis: ArqRedis, ttl: int = arq_settings.fan_in_ttl):
+        self.redis = redis
+        self.ttl = ttl
+        self.fan_in = FanIn(redis, ttl=ttl)
+
+    def _key(self, source_id: UUID, name: str) -> str:
+        return f"{self.key_prefix}:{source_id}:{name}"
+
+    async def latch(self, source_id: UUID, user_id: UUID) -> str:
+        """Get the fan-in of the stream, opening the stream on first use.
+
+        The fan-in continues with `check_content_processing_complete` once the stream is finalized and all its jobs
+        reported.
+        """
+        key = self._key(source_id, "latch")
+        latch_id = await self.redis.get(key)
+        if latch_id is None:
+            # Create the fan-in first, so the latch id is only ever visible for an existing fan-in
+            candidate = await self.fan_in.create_open("check_content_processing_complete", user_id, source_id)
+            if await self.redis.set(key, candidate, nx=True, ex=self.ttl):
+                logger.info(f"Opened ingestion stream of source {source_id} with fan-in {candidate}")
+                return candidate
+            await self.fan_in.delete(candidate)
+            latch_id = await self.redis.get(key)
+        return latch_id.decode() if isinstance(latch_id, bytes) else latch_id
+
+    async def claim(self, source_id: UUID, documents: list[Document]) -> list[Document]:
+        """Claim the pages of documents, returning only the documents no one claimed before.
+
+        All documents get ids derived from the source and their URL, so the same page always maps to the same
+        document and chunks.
+        """
+        if not documents:
+            return []
+        pages = [self.page_key(document) for document in documents]
+        key = self._key(source_id, "pages")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for page in pages:
+                pipe.sadd(key, page)
+            pipe.expire(key, self.ttl)
+            claimed = (await pipe.execute())[:-1]
+
+        new_documents = []
+        for document, page, is_new in zip(documents, pages, claimed, strict=True):
+            document.document_id = Document.stable_id(source_id, page)
+            if is_new:
+                new_documents.append(document)
+        return new_documents
+
+    async def unclaim(self, source_id: UUID, documents: list[Document]) -> None:
+        """Release the pages of documents that could not be processed, so a redelivery or finalizing processes them."""
+        if documents:
+            await self.redis.srem(self._key(source_id, "pages"), *(self.page_key(document) for document in documents))
+
+    @staticmethod
+    def page_key(document: Document) -> str:
+        """Identity of the page of a document, its URL or, without one, a hash of its content."""
+        return document.metadata.source_url or hashlib.sha256(document.content.encode()).hexdigest()
+
+    async def add(self, latch_id: str, count: int = 1) -> bool:
+        """Add jobs to the stream's fan-in, False if the stream was finalized already."""
+        return await self.fan_in.add(latch_id, count)
+
+    async def remove(self, latch_id: str) -> None:
+        """Take back a job added to the stream's fan-in that could not be enqueued.
+
+        If the stream was closed meanwhile, the job is part of the fan-in's count, so it reports a failure instead of
+        leaving the fan-in waiting for a job that never runs.
+        """
+        if not await self.fan_in.remove(latch_id):
+            await self.fan_in.count_down(
+                latch_id,
+                f"unenqueued:{uuid4().hex}",
+                KollektivTaskResult(status=KollektivTaskStatus.FAILED, message="Streamed pages could not be enqueued"),
+            )
+
+    async def begin_finalize(self, source_id: UUID) -> bool:
+        """Mark the stream as being finalized, False if it was finalized already."""
+        return bool(await self.redis.set(self._key(source_id, "finalize"), 1, nx=True, ex=self.ttl))
+
+    async def close(self, latch_id: str) -> bool:
+        """Close the stream's fan-in once its last jobs were added."""
+        return await self.fan_in.close(latch_id)
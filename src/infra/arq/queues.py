@@ -0,0 +1,48 @@
+from enum import Enum
+
+from arq.constants import default_queue_name
+
+
+class QueueName(str, Enum):
+    """Named ARQ queues, each consumed by its own worker so that small jobs never wait behind bulk work."""
+
+    CONTROL = "control"  # status events and fan-out of new work
+    FINALIZATION = "finalization"  # per-source completion: summaries and fan-in continuations
+    BULK = "bulk"  # chunking, chunk persistence and other heavy I/O
+
+    @property
+    def key(self) -> str:
+        """Redis key of the queue. Bulk uses the ARQ default queue, so jobs enqueued without a queue land there."""
+        return default_queue_name if self == QueueName.BULK else f"{default_queue_name}:{self.value}"
+
+
+# Queue of every task, tasks not listed here run on the bulk queue
+TASK_QUEUES: dict[str, QueueName] = {
+    "publish_event": QueueName.CONTROL,
+    "process_documents": QueueName.CONTROL,
+    "handle_webhook_event": QueueName.CONTROL,
+    "generate_summary": QueueName.FINALIZATION,
+    "complete_document_batch": QueueName.FINALIZATION,
+    "check_content_processing_complete": QueueName.FINALIZATION,
+    "chunk_document_batch": QueueName.BULK,
+    "persist_chunks": QueueName.BULK,
+    "delete_source": QueueName.BULK,
+    "reindex_source": QueueName.BULK,
+}
+
+
+def queue_for(function: str) -> str:
+    """Get the Redis key of the queue a task is enqueued on."""
+    return TASK_QUEUES.get(function, QueueName.BULK).key
+
+
+def allocate_max_jobs(queue_weights: dict[QueueName, int], max_jobs: int) -> dict[QueueName, int]:
+    """Split the concurrent job limit of a worker process between queues by weight.
+
+    Queues with weight 0 are not consumed, every other queue gets at least one slot.
+    """
+    active = {queue: weight for queue, weight in queue_weights.items() if weight > 0}
+    total = sum(active.values())
+    if not total:
+        raise ValueError("At least one queue must have a positive weight")
+    return {queue: max(1, max_jobs * weight // total) for queue, weight in active.items()}
@@ -1,14 +1,17 @@
 import importlib
+import zlib
 from collections.abc import Callable
 from datetime import date, datetime, time
-from functools import lru_cache
-from typing import Any
-from uuid import UUID
+from enum import Enum, IntEnum
+from functools import cached_property, lru_cache
+from typing import Any, Literal
+from uuid import UUID, SafeUUID
 
 import msgpack
 from pydantic import BaseModel
 
 from src.infra.logger import get_logger
+from src.infra.settings import settings
 
 logger = get_logger()
 
@@ -19,22 +22,274 @@ Deserializer = Callable[[bytes], dict[str, Any]]
 
 
 @lru_cache(maxsize=128)
-def get_model_class(qualified_name: str) -> type[BaseModel]:
-    """Get Pydantic model class from its fully qualified name."""
+def get_class(qualified_name: str) -> type:
+    """Get a class from its fully qualified name."""
     try:
         module_name, class_name = qualified_name.rsplit(".", 1)
         module = importlib.import_module(module_name)
-        model_cls = getattr(module, class_name)
-
-        if not issubclass(model_cls, BaseModel):
-            raise ValueError(f"Class {qualified_name} is not a Pydantic model")
-
-        return model_cls
+        return getattr(module, class_name)
     except Exception as e:
-        logger.error(f"Failed to load model {qualified_name}: {str(e)}")
+        logger.error(f"Failed to load class {qualified_name}: {str(e)}")
         raise
 
 
+@lru_cache(maxsize=128)
+def get_model_class(qualified_name: str) -> type[BaseModel]:
+    """Get Pydantic model class from its fully qualified name."""
+    model_cls = get_class(qualified_name)
+    if not issubclass(model_cls, BaseModel):
+        logger.error(f"Failed to load model {qualified_name}: not a Pydantic model")
+        raise ValueError(f"Class {qualified_name} is not a Pydantic model")
+    return model_cls
+
+
+class Compression(IntEnum):
+    """Codecs of compressed payloads, the value is stored in the payload header."""
+
+    ZLIB = 1
+
+
+# Compressed and schema encoded payloads start with 0xc1, which is never used by msgpack, followed by a format byte:
+# a Compression value or SCHEMA_FORMAT. Plain msgpack payloads can't start with it.
+HEADER_MAGIC = b"\xc1"
+SCHEMA_FORMAT = 0xF0
+SCHEMA_MAGIC = HEADER_MAGIC + bytes([SCHEMA_FORMAT])
+ZLIB_LEVEL = 6
+DEFAULT_COMPRESSION = Compression[settings.job_compression_codec.upper()]
+
+
+def compress(data: bytes, codec: Compression) -> bytes:
+    """Compress data and prefix it with the header describing the codec."""
+    return HEADER_MAGIC + bytes([codec]) + zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(data: bytes) -> bytes:
+    """Strip the compression header and decompress, uncompressed payloads are returned as is."""
+    if not data.startswith(HEADER_MAGIC) or data[1] == SCHEMA_FORMAT:
+        return data
+    if data[1] != Compression.ZLIB:
+        raise ValueError(f"Unknown payload compression {data[1]}")
+    return zlib.decompress(data[2:])
+
+
+SerializerMode = Literal["generic", "schema"]
+_object_setattr = object.__setattr__
+_UUID_UNKNOWN_SAFETY = SafeUUID.unknown
+
+
+def _uuid_from_bytes(data: bytes) -> UUID:
+    """Same as UUID(bytes=data), skipping the argument parsing of UUID.__init__."""
+    uuid = object.__new__(UUID)
+    _object_setattr(uuid, "int", int.from_bytes(data))
+    _object_setattr(uuid, "is_safe", _UUID_UNKNOWN_SAFETY)
+    return uuid
+
+
+class _ModelColumns:
+    """A list of models of one class, packed column by column."""
+
+    __slots__ = ("cls", "models")
+
+    def __init__(self, cls: type[BaseModel], models: list[BaseModel]):
+        self.cls = cls
+        self.models = models
+
+
+class SchemaCodec:
+    """Schema-aware msgpack encoding of job payloads.
+
+    Instead of dumping every model to a JSON-like dict tagged with its class name, models are packed as msgpack
+    extension types holding a class reference and the field values in field order:
+    - Classes in `registered_types` are referenced by a small integer tag, other classes by their qualified name,
+      which is only resolved to models and enums of this application
+    - Lists of two or more models of the same class are packed as one column of values per field, columns of UUIDs
+      and datetimes as a single extension value each
+    - UUIDs, dates, times and enums are extension types as well, containers are left to msgpack
+    - Trusted payloads are rebuilt with `model_construct`, skipping validation, untrusted ones with `model_validate`
+
+    Tags and field order are part of the wire format: never reuse a tag, and only add fields at the end of a model while
+    jobs written by the previous version may still be queued.
+    """
+
+    EXT_UUID = 1
+    EXT_DATETIME = 2
+    EXT_DATE = 3
+    EXT_TIME = 4
+    EXT_MODEL = 5
+    EXT_MODEL_COLUMNS = 6
+    EXT_ENUM = 7
+    EXT_UUID_COLUMN = 8
+    EXT_DATETIME_COLUMN = 9
+
+    registered_types: dict[int, str] = {
+        1: "src.models.content_models.Document",
+        2: "src.models.content_models.DocumentMetadata",
+        3: "src.models.content_models.Chunk",
+        4: "src.models.task_models.KollektivTaskResult",
+        5: "src.models.task_models.ClaimCheck",
+        6: "src.models.content_models.ContentProcessingEvent",
+        32: "src.models.task_models.KollektivTaskStatus",
+        33: "src.models.content_models.SourceStage",
+        34: "src.models.pubsub_models.EventType",
+    }
+
+    # Classes referenced by name must be defined in this package
+    trusted_package = "src."
+
+    _scalar_types = (str, int, float, bool, type(None), bytes)
+
+    def __init__(self, trusted: bool = True):
+        self.trusted = trusted
+
+    @cached_property
+    def _tags(self) -> dict[type, int]:
+        return {get_class(name): tag for tag, name in self.registered_types.items()}
+
+    def _ref(self, cls: type) -> int | str:
+        tag = self._tags.get(cls)
+        return tag if tag is not None else f"{cls.__module__}.{cls.__qualname__}"
+
+    def _resolve(self, ref: int | str, base: type) -> type:
+        """Get the class of a reference, which must be a subclass of `base` defined in this application.
+
+        References come from the payload, so they are never called before they are known to be a model or an enum.
+        """
+        name = self.registered_types.get(ref) if isinstance(ref, int) else ref
+        if not isinstance(name, str) or not name.startswith(self.trusted_package):
+            raise ValueError(f"Refusing to resolve class reference {ref!r}")
+        try:
+            cls = get_class(name)
+        except (ImportError, AttributeError, ValueError) as e:
+            raise ValueError(f"Class reference {ref!r} cannot be resolved") from e
+        if not isinstance(cls, type) or not issubclass(cls, base):
+            raise ValueError(f"Class reference {ref!r} is not a {base.__name__}")
+        return cls
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _field_names(cls: type[BaseModel]) -> tuple[str, ...]:
+        return tuple(cls.model_fields)
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _validation_keys(cls: type[BaseModel]) -> tuple[str, ...]:
+        """Keys accepted by model_validate whether or not the model populates by name, in field order."""
+        return tuple(field.alias or name for name, field in cls.model_fields.items())
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _is_plain(cls: type[BaseModel]) -> bool:
+        """Whether model_construct with all fields amounts to setting the instance dict."""
+        return cls.__pydantic_post_init__ is None and cls.model_config.get("extra") != "allow"
+
+    def _prepare(self, obj: Any) -> Any:
+        """Mark homogeneous model lists for columnar packing, everything else is handled by `_default`."""
+        obj_type = type(obj)
+        if obj_type is list or obj_type is tuple:
+            if not obj or type(obj[0]) in self._scalar_types:
+                return obj
+            first_type = type(obj[0])
+            if len(obj) > 1 and issubclass(first_type, BaseModel) and all(type(item) is first_type for item in obj):
+                return _ModelColumns(first_type, obj)
+            return [self._prepare(item) for item in obj]
+        if obj_type is dict:
+            return {key: self._prepare(value) for key, value in obj.items()}
+        return obj
+
+    def _column(self, values: list[Any]) -> Any:
+        """Pack a column of field values, typed columns avoid packing every value as its own extension type."""
+        first_type = type(values[0])
+        if first_type is UUID and all(type(value) is UUID for value in values):
+            return msgpack.ExtType(self.EXT_UUID_COLUMN, b"".join(value.bytes for value in values))
+        if first_type is datetime and all(type(value) is datetime for value in values):
+            return msgpack.ExtType(self.EXT_DATETIME_COLUMN, msgpack.packb([value.isoformat() for value in values]))
+        if first_type in self._scalar_types:
+            return values
+        return [self._prepare(value) for value in values]
+
+    def _default(self, obj: Any) -> Any:
+        """Pack types msgpack does not know as extension types."""
+        if isinstance(obj, BaseModel):
+            values = [self._prepare(getattr(obj, name)) for name in type(obj).model_fields]
+            return msgpack.ExtType(self.EXT_MODEL, self.packb([self._ref(type(obj)), values]))
+        if isinstance(obj, _ModelColumns):
+            columns = [self._column([model.__dict__[name] for model in obj.models]) for name in obj.cls.model_fields]
+            return msgpack.ExtType(self.EXT_MODEL_COLUMNS, self.packb([self._ref(obj.cls), len(obj.models), columns]))
+        if isinstance(obj, UUID):
+            return msgpack.ExtType(self.EXT_UUID, obj.bytes)
+        if isinstance(obj, Enum):
+            return msgpack.ExtType(self.EXT_ENUM, self.packb([self._ref(type(obj)), obj.value]))
+        if isinstance(obj, datetime):
+            return msgpack.ExtType(self.EXT_DATETIME, obj.isoformat().encode())
+        if isinstance(obj, date):
+            return msgpack.ExtType(self.EXT_DATE, obj.isoformat().encode())
+        if isinstance(obj, time):
+            return msgpack.ExtType(self.EXT_TIME, obj.isoformat().encode())
+        # Subclasses of builtins are only passed here because of strict_types
+        for base in (list, tuple, dict, str, int, float):
+            if isinstance(obj, base):
+                return self._prepare(list(obj) if base is tuple else base(obj))
+        raise TypeError(f"Cannot serialize object of type {type(obj).__qualname__}")
+
+    def _build(self, cls: type[BaseModel], values: Any) -> BaseModel:
+        names = self._field_names(cls)
+        if len(values) > len(names):
+            raise ValueError(f"Payload has {len(values)} values for the {len(names)} fields of {cls.__qualname__}")
+
+        # Payloads written before fields were appended to the model lack the trailing fields, which get defaults
+        if not self.trusted:
+            return cls.model_validate(dict(zip(self._validation_keys(cls), values, strict=False)))
+        data = dict(zip(names, values, strict=False))
+        if len(values) < len(names) or not self._is_plain(cls):
+            return cls.model_construct(**data)
+        # Same result as model_construct(**data) with every field given, without its per-field bookkeeping
+        model = cls.__new__(cls)
+        _object_setattr(model, "__dict__", data)
+        _object_setattr(model, "__pydantic_fields_set__", set(data))
+        _object_setattr(model, "__pydantic_extra__", None)
+        _object_setattr(model, "__pydantic_private__", None)
+        return model
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == self.EXT_UUID:
+            return _uuid_from_bytes(data)
+        if code == self.EXT_MODEL:
+            ref, values = self.unpackb(data)
+            return self._build(self._resolve(ref, BaseModel), values)
+        if code == self.EXT_MODEL_COLUMNS:
+            ref, count, columns = self.unpackb(data)
+            cls = self._resolve(ref, BaseModel)
+            rows = zip(*columns, strict=True) if columns else [()] * count
+            return [self._build(cls, row) for row in rows]
+        if code == self.EXT_UUID_COLUMN:
+            # Columns such as source_id mostly repeat a few values, UUIDs are immutable so instances can be shared
+            uuids: dict[bytes, UUID] = {}
+            return [
+                uuids.get(raw) or uuids.setdefault(raw, _uuid_from_bytes(raw))
+                for raw in (data[i : i + 16] for i in range(0, len(data), 16))
+            ]
+        if code == self.EXT_DATETIME_COLUMN:
+            return [datetime.fromisoformat(value) for value in msgpack.unpackb(data)]
+        if code == self.EXT_ENUM:
+            ref, value = self.unpackb(data)
+            return self._resolve(ref, Enum)(value)
+        if code == self.EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == self.EXT_DATE:
+            return date.fromisoformat(data.decode())
+        if code == self.EXT_TIME:
+            return time.fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def packb(self, obj: Any) -> bytes:
+        """Pack an object to schema encoded msgpack, without header."""
+        return msgpack.packb(self._prepare(obj), default=self._default, strict_types=True, use_bin_type=True)
+
+    def unpackb(self, data: bytes) -> Any:
+        """Unpack schema encoded msgpack, without header."""
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
 class MsgpackSerializer:
     """Custom serializer based on msgpack that supports Pydantic models, UUIDs, and other types.
 
@@ -43,9 +298,23 @@ class MsgpackSerializer:
     - Supports UUIDs, lists, tuples, and nested dictionaries
     - Provides safe fallbacks for failed model reconstruction
     - Uses msgpack for efficient binary serialization
+    - Compresses payloads of at least `compression_threshold` bytes, behind a header naming the codec, so that
+      compressed and plain payloads (e.g. jobs enqueued before compression was enabled) both decode
+    - In "schema" mode, encodes payloads with the faster and smaller SchemaCodec. Payloads of either mode are
+      decoded regardless of the configured mode.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        compression_threshold: int = settings.job_compression_threshold,
+        compression: Compression = DEFAULT_COMPRESSION,
+        mode: SerializerMode = settings.job_serializer_mode,
+        trusted: bool = settings.job_serializer_trusted,
+    ) -> None:
+        self.compression_threshold = compression_threshold
+        self.compression = compression
+        self.mode = mode
+        self.schema_codec = SchemaCodec(trusted=trusted)
         self.serializer: Serializer = self._serialize
         self.deserializer: Deserializer = self._deserialize
 
@@ -112,12 +381,22 @@ class MsgpackSerializer:
         return obj
 
     def _serialize(self, obj: dict[str, Any]) -> bytes:
-        """Serialize to msgpack bytes."""
-        logger.debug(f"Serializing object with type: {type(obj)}")
-        return msgpack.packb(self._normalize(obj))
+        """Serialize to msgpack bytes, compressed if the payload is large enough and compression pays off."""
+        if self.mode == "schema":
+            packed = SCHEMA_MAGIC + self.schema_codec.packb(obj)
+        else:
+            logger.debug(f"Serializing object with type: {type(obj)}")
+            packed = msgpack.packb(self._normalize(obj))
+        if not self.compression_threshold or len(packed) < self.compression_threshold:
+            return packed
+        compressed = compress(packed, self.compression)
+        return compressed if len(compressed) < len(packed) else packed
 
     def _deserialize(self, data: bytes) -> dict[str, Any]:
-        """Deserialize from msgpack bytes."""
+        """Deserialize from (optionally compressed) msgpack bytes."""
+        data = decompress(data)
+        if data.startswith(SCHEMA_MAGIC):
+            return self.schema_codec.unpackb(data[len(SCHEMA_MAGIC) :])
         deserialized = self._denormalize(msgpack.unpackb(data, raw=False))
         logger.debug(f"Deserialized object with type: {type(deserialized)}")
         return deserialized
@@ -127,72 +406,3 @@ class MsgpackSerializer:
 _msgpack_serializer = MsgpackSerializer()
 serialize = _msgpack_serializer.serializer
 deserialize = _msgpack_serializer.deserializer
-
-
-# Comprehensive test suite
-if __name__ == "__main__":
-    from uuid import uuid4
-
-    from src.models.content_models import Chunk, Document, DocumentMetadata, ProcessingEvent
-
-    def test_serialization(obj: Any, name: str) -> None:
-        """Test serialization/deserialization of an object and print results."""
-        print(f"\nTesting {name}:")
-        print(f"Original: {obj}")
-
-        serialized = serialize({"data": obj})
-        deserialized = deserialize(serialized)
-
-        print(f"Deserialized: {deserialized['data']}")
-        print(f"Types match: {type(obj) == type(deserialized['data'])}")
-        print("-" * 50)
-
-    # Test 1: Simple Pydantic Model
-    doc = Document(
-        document_id=uuid4(),
-        source_id=uuid4(),
-        content="Hello, world!",
-        metadata=DocumentMetadata(source_url="https://example.com"),
-    )
-    test_serialization(doc, "Simple Pydantic Model (Document)")
-
-    # Test 2: UUID
-    test_id = uuid4()
-    test_serialization(test_id, "UUID")
-
-    # Test 3: List with mixed types
-    mixed_list = [uuid4(), doc, {"nested": "dict"}, [1, 2, 3]]
-    test_serialization(mixed_list, "Mixed List")
-
-    # Test 4: Dictionary with mixed types
-    mixed_dict = {"uuid": uuid4(), "model": doc, "list": [1, 2, 3], "nested": {"key": "value"}}
-    test_serialization(mixed_dict, "Mixed Dictionary")
-
-    # Test 5: Nested Pydantic Models
-    chunk = Chunk(
-        chunk_id=uuid4(),
-        document_id=doc.document_id,
-        source_id=doc.document_id,
-        text="Chunk content",
-        token_count=100,
-        page_title="Test Page",
-        page_url="https://example.com",
-        headers={"Content-Type": "text/plain"},
-    )
-    test_serialization(chunk, "Nested Model (Chunk)")
-
-    # Test 6: Complex nested structure
-    complex_obj = {
-        "document": doc,
-        "chunks": [chunk, chunk],
-        "metadata": {"ids": [uuid4(), uuid4()], "nested_doc": doc},
-    }
-    test_serialization(complex_obj, "Complex Nested Structure")
-
-    # Test 7: Event with metadata
-    event = ProcessingEvent(
-        source_id=uuid4(),
-        event_type="processing",
-        metadata={"status": "complete"},
-    )
-    test_serialization(event, "Event with Metadata")
@@ -1,91 +1,84 @@
 import asyncio
 import functools
+import time
 from collections.abc import Awaitable, Callable
 from typing import Any, TypeVar
 from uuid import UUID
 
-from arq.jobs import Job
+from arq import Retry
 from pydantic import BaseModel
 
-from src.infra.arq.serializer import deserialize
+from src.api.v0.schemas.webhook_schemas import FireCrawlWebhookEvent
+from src.core.content.batch_sizer import BatchKind
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.bulk_enqueue import JobSpec, enqueue_jobs
+from src.infra.arq.checkpoint import CheckpointStage, IngestionCheckpoint
+from src.infra.arq.claim_check import PayloadStore
+from src.infra.arq.fan_in import FanIn
+from src.infra.arq.ingestion_lease import IngestionLease
 from src.infra.arq.worker_services import WorkerServices
 from src.infra.events.channels import Channels
 from src.infra.events.event_publisher import EventPublisher
+from src.infra.external.backend_limiter import Backend
 from src.infra.logger import get_logger
 from src.infra.settings import get_settings
 from src.models.content_models import Chunk, ContentProcessingEvent, Document, SourceStage
-from src.models.task_models import KollektivTaskResult, KollektivTaskStatus
+from src.models.task_models import ClaimCheck, KollektivTaskResult, KollektivTaskStatus
 
 # Define types
 T = TypeVar("T", bound=BaseModel)
 logger = get_logger()
 settings = get_settings()
+arq_settings = get_arq_settings()
 
 # Define task function - updated to handle varying parameter counts
 TaskFunction = Callable[..., Awaitable[KollektivTaskResult]]
 
 
 # HELPER FUNCTIONS
-async def _gather_job_results(
-    ctx: dict[str, Any], job_ids: list[str], operation_name: str
-) -> list[KollektivTaskResult]:
-    """Gather results from multiple ARQ jobs.
+async def _count_down(
+    ctx: dict[str, Any], fan_in_id: str | None, result: KollektivTaskResult, member: str | None = None
+) -> KollektivTaskResult:
+    """Report a child job's result to its parent's fan-in, if it has one.
 
     Args:
         ctx: Context dictionary containing worker services and Redis connection
-        job_ids: List of job IDs to gather results from
-        operation_name: Name of the operation for error reporting
+        fan_in_id: ID of the fan-in latch created by the parent job, None for standalone jobs
+        result: Result of the child job
+        member: Name of the child in the fan-in, defaults to the current job id
 
     Returns:
-        list[KollektivTaskResult]: List of results from all jobs
-
-    Raises:
-        Exception: If any job failed with an exception or returned a failure status
+        KollektivTaskResult: The unchanged result, so tasks can `return await _count_down(...)`
     """
-    try:
-        # Create Job objects from IDs
-        jobs = [_create_job_reference(ctx, job_id) for job_id in job_ids]
-        results = await asyncio.gather(*[job.result() for job in jobs])
+    if fan_in_id is not None:
+        await FanIn(ctx["arq_redis"]).count_down(fan_in_id, member or ctx["job_id"], result)
+    return result
 
-        # Check if any job returned a failure status
-        failures = [r for r in results if r.status == KollektivTaskStatus.FAILED]
-        if failures:
-            logger.error(
-                f"{operation_name} failed: {len(failures)} out of {len(results)} jobs failed. "
-                f"First failure: {failures[0].message}"
-            )
-            raise Exception(
-                f"{operation_name} failed: {len(failures)} out of {len(results)} jobs failed. "
-                f"First failure: {failures[0].message}"
-            )
-        else:
-            logger.info(f"{operation_name} completed successfully with {len(results)} jobs")
 
-        return results
+async def _load_payloads(ctx: dict[str, Any], items: list[T] | list[ClaimCheck]) -> list[T]:
+    """Resolve claim checks into their payloads, inline payloads are returned as is.
 
-    except Exception as e:
-        # This catches both gather exceptions and our failure check exception
-        raise Exception(f"{operation_name} failed: {str(e)}") from e
+    Args:
+        ctx: Context dictionary containing worker services and Redis connection
+        items: Either the payloads themselves or claim checks referencing them
 
+    Returns:
+        list[T]: The payloads
+    """
+    if items and isinstance(items[0], ClaimCheck):
+        return await PayloadStore(ctx["arq_redis"]).get_many(items)
+    return items
 
-def _create_job_reference(ctx: dict[str, Any], job_id: str) -> Job:
-    """Create a job reference.
 
-    Args:
-        ctx: Context dictionary containing worker services
-        job_id: ID of the job to create a reference for
+async def _release_lease(ctx: dict[str, Any], source_id: UUID, fingerprint: str | None, run_id: str | None) -> None:
+    """Release the ingestion lease of a coalesced run, so the same content can be processed again."""
+    if fingerprint is not None and run_id is not None:
+        await IngestionLease(ctx["arq_redis"]).release(source_id, fingerprint, run_id)
 
-    Returns:
-        Job: Job reference
 
-    Raises:
-        Exception: If any error occurs
-    """
-    try:
-        return Job(job_id=job_id, redis=ctx["arq_redis"], _deserializer=deserialize)
-    except Exception as e:
-        logger.exception(f"Error creating job reference: {e}")
-        raise
+def _summary_job_id(fan_in_id: str) -> str:
+    """Job id of the summary job of a fan-in, so its result can be told apart from the chunking results."""
+    return FanIn.child_job_id(fan_in_id, "generate_summary")
 
 
 async def publish_event(ctx: dict[str, Any], event: ContentProcessingEvent) -> KollektivTaskResult:
@@ -124,15 +117,23 @@ async def publish_event(ctx: dict[str, Any], event: ContentProcessingEvent) -> K
 
 
 async def process_documents(
-    ctx: dict[str, Any], documents: list[Document], user_id: UUID, source_id: UUID
+    ctx: dict[str, Any],
+    documents: list[Document] | list[ClaimCheck],
+    user_id: UUID,
+    source_id: UUID,
+    fingerprint: str | None = None,
 ) -> KollektivTaskResult:
     """Entry point for processing list[Document].
 
+    With claim checks the documents are never loaded here: batches and the summary job receive references only.
+
     Args:
         ctx: Context dictionary containing worker services and Redis connection
-        documents: List of documents to process
+        documents: List of documents to process, or claim checks of the documents
         user_id: UUID of the user processing the documents
         source_id: UUID of the source being processed
+        fingerprint: Content fingerprint of a coalesced run, its ingestion lease is released when the run finishes.
+            The job id of this job identifies the run.
 
     Returns:
         KollektivTaskResult: Status and job IDs for tracking
@@ -140,7 +141,9 @@ async def process_documents(
     # Get access to the services
     logger.info(f"Processing {len(documents)} documents")
 
+    run_id = ctx.get("job_id") if fingerprint is not None else None
     if not documents:
+        await _release_lease(ctx, source_id, fingerprint, run_id)
         return KollektivTaskResult(
             status=KollektivTaskStatus.FAILED,
             message="No documents provided for processing",
@@ -148,28 +151,37 @@ async def process_documents(
 
     services = ctx["worker_services"]
     try:
-        # Break down document list into batches
-        document_batches = services.chunker.batch_documents(documents)
-        batch_jobs_ids = []
-        for batch in document_batches:
-            job = await ctx["arq_redis"].enqueue_job("chunk_document_batch", batch, user_id)
-            batch_jobs_ids.append(job.job_id)
-        logger.debug(f"Scheduled the following batch jobs: {batch_jobs_ids}")
-
-        # 2. Schedule summary generation
-        summary_job = await ctx["arq_redis"].enqueue_job("generate_summary", documents, source_id)
-        summary_job_id = summary_job.job_id
+        # Break down document list (or their claim checks) into batches sized to the observed chunking throughput
+        token_budget = await services.batch_sizer.token_budget(BatchKind.CHUNKING)
+        document_batches = services.chunker.batch_documents(documents, token_budget=token_budget)
+        claims = [document for document in documents if isinstance(document, ClaimCheck)]
+
+        # 1. Create the fan-in before any child can finish, the completion check runs when the last child reports
+        fan_in_id = await FanIn(ctx["arq_redis"]).create(
+            len(document_batches) + 1,
+            "check_content_processing_complete",
+            user_id,
+            source_id,
+            claims,
+            fingerprint,
+            run_id,
+        )
 
-        # 3. Schedule result checker
-        checker_job = await ctx["arq_redis"].enqueue_job(
-            "check_content_processing_complete", batch_jobs_ids, summary_job_id, user_id, source_id
+        # 2. Schedule chunking of document batches and summary generation in one go
+        summary_job_id = _summary_job_id(fan_in_id)
+        jobs = await enqueue_jobs(
+            ctx["arq_redis"],
+            [JobSpec("chunk_document_batch", (batch, user_id, fan_in_id)) for batch in document_batches]
+            + [JobSpec("generate_summary", (documents, source_id, fan_in_id), job_id=summary_job_id)],
         )
+        batch_jobs_ids = [job.job_id for job in jobs[:-1]]
+        logger.debug(f"Scheduled the following batch jobs: {batch_jobs_ids}")
 
-        # 4. Create success result
+        # 3. Create success result
         result = KollektivTaskResult(
             status=KollektivTaskStatus.SUCCESS,
             message="Documents scheduled for processing",
-            data={"batch_jobs": batch_jobs_ids, "checker_job_id": checker_job.job_id, "summary_job_id": summary_job_id},
+            data={"batch_jobs": batch_jobs_ids, "fan_in_id": fan_in_id, "summary_job_id": summary_job_id},
         )
 
         return result
@@ -184,6 +196,7 @@ async def process_documents(
         )
 
         # Publish failure event
+        await _release_lease(ctx, source_id, fingerprint, run_id)
         await publish_event(
             ctx,
             EventPublisher.create_event(
@@ -198,81 +211,199 @@ async def process_documents(
 
 
 async def chunk_document_batch(
-    ctx: dict[str, Any], document_batch: list[Document], user_id: UUID
+    ctx: dict[str, Any], document_batch: list[Document] | list[ClaimCheck], user_id: UUID, fan_in_id: str | None = None
 ) -> KollektivTaskResult:
-    """Process a batch of documents."""
+    """Process a batch of documents.
+
+    Chunks are persisted by child jobs. The batch reports to the parent fan-in only once all of them finished, via
+    `complete_document_batch`, so this job does not wait for them. Documents checkpointed by an earlier attempt are
+    skipped.
+    """
     # Get access to the services
     try:
         services = ctx["worker_services"]
+        document_batch = await _load_payloads(ctx, document_batch)
+
+        # 0. Skip documents completed by an earlier attempt
+        source_id = document_batch[0].source_id if document_batch else None
+        completed = await IngestionCheckpoint(ctx["arq_redis"]).completed(
+            source_id, CheckpointStage.DOCUMENTS, [document.document_id for document in document_batch]
+        )
+        if completed:
+            logger.info(f"Skipping {len(completed)} documents of source {source_id} completed by an earlier attempt")
+            document_batch = [document for document in document_batch if document.document_id not in completed]
+            if not document_batch:
+                return await _count_down(
+                    ctx,
+                    fan_in_id,
+                    KollektivTaskResult(
+                        status=KollektivTaskStatus.SUCCESS, message="Document batch was already processed"
+                    ),
+                )
+
         # 1. Break down into chunks
+        started = time.perf_counter()
         blocking = functools.partial(services.chunker.process_documents, documents=document_batch)
         loop = asyncio.get_running_loop()
         chunks = await loop.run_in_executor(None, blocking)
+        await services.batch_sizer.record(
+            BatchKind.CHUNKING, sum(chunk.token_count for chunk in chunks), time.perf_counter() - started
+        )
 
-        # 2. Break down into chunk batches
-        blocking = functools.partial(services.chunker.batch_chunks, chunks=chunks)
+        # 2. Break down into chunk batches sized to the observed persistence throughput
+        token_budget = await services.batch_sizer.token_budget(BatchKind.PERSISTENCE)
+        blocking = functools.partial(services.chunker.batch_chunks, chunks=chunks, token_budget=token_budget)
         loop = asyncio.get_running_loop()
         chunk_batches = await loop.run_in_executor(None, blocking)
 
-        # 3. Send chunks to storage
-        chunk_job_ids = []
-        for chunk_batch in chunk_batches:
-            job = await ctx["arq_redis"].enqueue_job("persist_chunks", chunk_batch, user_id)
-            chunk_job_ids.append(job.job_id)
+        # 3. Send chunks to storage, completion is reported by the last storage job
+        batch_fan_in_id = await FanIn(ctx["arq_redis"]).create(
+            len(chunk_batches),
+            "complete_document_batch",
+            fan_in_id,
+            ctx["job_id"],
+            source_id,
+            [document.document_id for document in document_batch],
+        )
+        jobs = await enqueue_jobs(
+            ctx["arq_redis"],
+            [JobSpec("persist_chunks", (chunk_batch, user_id, batch_fan_in_id)) for chunk_batch in chunk_batches],
+        )
+        chunk_job_ids = [job.job_id for job in jobs]
+
+        return KollektivTaskResult(
+            status=KollektivTaskStatus.SUCCESS,
+            message=f"Scheduled storage of {len(chunk_job_ids)} chunk batches",
+            data={"chunk_jobs": chunk_job_ids, "fan_in_id": batch_fan_in_id},
+        )
+    except Exception as e:
+        logger.exception(f"Error processing document batch: {e}")
+        return await _count_down(
+            ctx,
+            fan_in_id,
+            KollektivTaskResult(
+                status=KollektivTaskStatus.FAILED,
+                message=f"Failed to process document batch: {str(e)}",
+            ),
+        )
 
-        # Wait for all storage jobs to complete
-        results = await _gather_job_results(ctx, chunk_job_ids, "chunk_document_batch")
 
-        # Check results
+async def complete_document_batch(
+    ctx: dict[str, Any],
+    fan_in_id: str,
+    parent_fan_in_id: str | None,
+    batch_job_id: str,
+    source_id: UUID | None = None,
+    document_ids: list[UUID] | None = None,
+) -> KollektivTaskResult:
+    """Continuation of chunk_document_batch, runs once all chunk batches of a document batch are stored.
+
+    Args:
+        ctx: Context dictionary containing worker services and Redis connection
+        fan_in_id: ID of the fan-in of persist_chunks jobs
+        parent_fan_in_id: ID of the content processing fan-in the document batch belongs to
+        batch_job_id: Job id of the chunk_document_batch job, its member name in the parent fan-in
+        source_id: UUID of the source the documents belong to
+        document_ids: IDs of the documents of the batch, checkpointed once all their chunks are stored
+
+    Returns:
+        KollektivTaskResult: Aggregated storage result of the document batch
+    """
+    fan_in = FanIn(ctx["arq_redis"])
+    try:
+        results = list((await fan_in.results(fan_in_id)).values())
         failures = [r for r in results if r.status == KollektivTaskStatus.FAILED]
         if failures:
-            return KollektivTaskResult(
+            result = KollektivTaskResult(
                 status=KollektivTaskStatus.FAILED,
                 message=f"Failed to store {len(failures)} chunk batches",
                 data={"failures": failures},
             )
-
-        return KollektivTaskResult(
-            status=KollektivTaskStatus.SUCCESS,
-            message=f"Successfully stored {len(chunk_job_ids)} chunk batches",
-            data={"stored_chunks": len(chunk_job_ids)},
-        )
+        else:
+            if source_id is not None:
+                await IngestionCheckpoint(ctx["arq_redis"]).mark_completed(
+                    source_id, CheckpointStage.DOCUMENTS, document_ids or []
+                )
+            result = KollektivTaskResult(
+                status=KollektivTaskStatus.SUCCESS,
+                message=f"Successfully stored {len(results)} chunk batches",
+                data={"stored_chunks": len(results)},
+            )
     except Exception as e:
-        logger.exception(f"Error processing document batch: {e}")
-        return KollektivTaskResult(
-            status=KollektivTaskStatus.FAILED,
-            message=f"Failed to process document batch: {str(e)}",
+        logger.exception(f"Error completing document batch: {e}")
+        result = KollektivTaskResult(
+            status=KollektivTaskStatus.FAILED, message=f"Failed to complete document batch: {str(e)}"
         )
 
+    await _count_down(ctx, parent_fan_in_id, result, member=batch_job_id)
+    await fan_in.delete(fan_in_id)
+    return result
 
-async def persist_chunks(ctx: dict[str, Any], chunk_batch: list[Chunk], user_id: UUID) -> KollektivTaskResult:
-    """Adds chunks to supabase and Chroma."""
+
+async def persist_chunks(
+    ctx: dict[str, Any], chunk_batch: list[Chunk], user_id: UUID, fan_in_id: str | None = None
+) -> KollektivTaskResult:
+    """Adds chunks to supabase and Chroma.
+
+    Idempotent: chunks are upserted by their deterministic ids, and chunks checkpointed by an earlier attempt are
+    skipped.
+    """
     try:
         services = ctx["worker_services"]
+        checkpoint = IngestionCheckpoint(ctx["arq_redis"])
+        source_id = chunk_batch[0].source_id if chunk_batch else None
+
+        completed = await checkpoint.completed(source_id, CheckpointStage.CHUNKS, [c.chunk_id for c in chunk_batch])
+        pending = [chunk for chunk in chunk_batch if chunk.chunk_id not in completed]
+        if pending:
+            started = time.perf_counter()
+            await asyncio.gather(
+                services.limiters[Backend.CHROMA].call(services.vector_db.add_data, chunks=pending, user_id=user_id),
+                services.limiters[Backend.SUPABASE].call(services.data_service.save_chunks, chunks=pending),
+            )
+            await services.batch_sizer.record(
+                BatchKind.PERSISTENCE, sum(chunk.token_count for chunk in pending), time.perf_counter() - started
+            )
+            await checkpoint.mark_completed(source_id, CheckpointStage.CHUNKS, [chunk.chunk_id for chunk in pending])
 
-        await asyncio.gather(
-            services.vector_db.add_data(chunks=chunk_batch, user_id=user_id),
-            services.data_service.save_chunks(chunks=chunk_batch),
-        )
-
-        return KollektivTaskResult(
+        result = KollektivTaskResult(
             status=KollektivTaskStatus.SUCCESS,
             message=f"Successfully added {len(chunk_batch)} chunks to storage",
             data={"stored_chunks": len(chunk_batch)},
         )
     except Exception as e:
         logger.exception(f"Error adding chunks to storage: {e}")
-        return KollektivTaskResult(
+        result = KollektivTaskResult(
             status=KollektivTaskStatus.FAILED, message=f"Failed to add chunks to storage: {str(e)}"
         )
+    return await _count_down(ctx, fan_in_id, result)
 
 
-async def generate_summary(ctx: dict[str, Any], documents: list[Document], source_id: UUID) -> KollektivTaskResult:
-    """Generate a summary for a source."""
+async def generate_summary(
+    ctx: dict[str, Any],
+    documents: list[Document] | list[ClaimCheck] | None,
+    source_id: UUID,
+    fan_in_id: str | None = None,
+) -> KollektivTaskResult:
+    """Generate a summary for a source, from the given documents or, if None, the documents stored for the source."""
     logger.info(f"Chunking complete, generating summary for source {source_id}")
     try:
         services = ctx["worker_services"]
+        checkpoint = IngestionCheckpoint(ctx["arq_redis"])
+        if await checkpoint.completed(source_id, CheckpointStage.SUMMARY, [source_id]):
+            logger.info(f"Summary of source {source_id} was generated by an earlier attempt, skipping")
+            return await _count_down(
+                ctx,
+                fan_in_id,
+                KollektivTaskResult(status=KollektivTaskStatus.SUCCESS, message="Summary was already generated"),
+            )
+
+        if documents is None:
+            documents = await services.data_service.get_documents_by_source(source_id)
+        else:
+            documents = await _load_payloads(ctx, documents)
         await services.summary_manager.prepare_summary(source_id, documents)
+        await checkpoint.mark_completed(source_id, CheckpointStage.SUMMARY, [source_id])
         result = KollektivTaskResult(
             status=KollektivTaskStatus.SUCCESS,
             message=f"Successfully generated summary for source id {source_id}",
@@ -285,30 +416,47 @@ async def generate_summary(ctx: dict[str, Any], documents: list[Document], sourc
                 metadata={"total_documents": len(documents)},
             ),
         )
-        return result
     except Exception as e:
         logger.exception(f"Error generating summary: {e}")
-        return KollektivTaskResult(status=KollektivTaskStatus.FAILED, message=f"Failed to generate summary: {str(e)}")
+        result = KollektivTaskResult(status=KollektivTaskStatus.FAILED, message=f"Failed to generate summary: {str(e)}")
+    return await _count_down(ctx, fan_in_id, result)
 
 
 async def check_content_processing_complete(
-    ctx: dict[str, Any], chunk_batch_job_ids: list[str], summary_job_id: str, user_id: UUID, source_id: UUID
+    ctx: dict[str, Any],
+    fan_in_id: str,
+    user_id: UUID,
+    source_id: UUID,
+    claims: list[ClaimCheck] | None = None,
+    fingerprint: str | None = None,
+    run_id: str | None = None,
 ) -> KollektivTaskResult:
     """Check completion status of content processing jobs and publish appropriate event.
 
+    Runs as the continuation of the content processing fan-in, i.e. only after every document batch and the summary
+    job reported their results. Once the source completed, its checkpoint and the claim-checked documents are
+    removed. After a failure both are kept, so re-enqueueing `process_documents` with the same claim checks only
+    processes the unfinished batches.
+
     Args:
         ctx: Context dictionary containing worker services and Redis connection
-        chunk_batch_job_ids: List of job IDs to check completion for
-        summary_job_id: ID of the summary generation job
+        fan_in_id: ID of the fan-in holding the document batch and summary results
         user_id: UUID of the user processing the documents
         source_id: UUID of the source being processed
+        claims: Claim checks of the processed documents, released once processing completed
+        fingerprint: Content fingerprint of a coalesced run, its ingestion lease is released either way
+        run_id: Job id of the run's process_documents job, the lease is only released while the run holds it
 
     Returns:
         KollektivTaskResult: Status of the completion check
     """
+    fan_in = FanIn(ctx["arq_redis"])
     try:
+        results = await fan_in.results(fan_in_id)
+        summary_result = results.pop(_summary_job_id(fan_in_id), None)
+
         # 1. Check chunk processing results
-        chunk_results = await _gather_job_results(ctx, chunk_batch_job_ids, "chunk_document_batch")
+        chunk_results = list(results.values())
         chunk_failures = [r for r in chunk_results if r.status == KollektivTaskStatus.FAILED]
 
         if chunk_failures:
@@ -338,12 +486,10 @@ async def check_content_processing_complete(
         )
 
         # 3. Check summary generation
-        summary_job_results = await _gather_job_results(ctx, [summary_job_id], "summary_generation")
-        summary_result = summary_job_results[0]
-        if summary_result.status == KollektivTaskStatus.FAILED:
+        if summary_result is None or summary_result.status == KollektivTaskStatus.FAILED:
             result = KollektivTaskResult(
                 status=KollektivTaskStatus.FAILED,
-                message=f"Summary generation failed: {summary_result.message}",
+                message=f"Summary generation failed: {summary_result.message if summary_result else 'no result'}",
             )
             await publish_event(
                 ctx,
@@ -356,6 +502,8 @@ async def check_content_processing_complete(
             return result
 
         # 4. Publish final completion event
+        await IngestionCheckpoint(ctx["arq_redis"]).clear(source_id)
+        await PayloadStore(ctx["arq_redis"]).delete_many(claims or [])
         await publish_event(
             ctx,
             EventPublisher.create_event(
@@ -383,6 +531,78 @@ async def check_content_processing_complete(
             ),
         )
         return result
+    finally:
+        await fan_in.delete(fan_in_id)
+        await _release_lease(ctx, source_id, fingerprint, run_id)
+
+
+async def handle_webhook_event(ctx: dict[str, Any], event: FireCrawlWebhookEvent) -> KollektivTaskResult:
+    """Handle a webhook event deferred by the webhook endpoint.
+
+    While the job is queued, running or its result is kept, its id stops a redelivered event from being enqueued
+    again. A redelivery that arrives later is dropped by the content service's webhook event log, which treats a
+    re-run of this job, after a worker crash or a retry, as the same delivery, so the event is handled exactly once.
+
+    The endpoint acknowledged the event already, so firecrawl will not send it again: a failed event is retried
+    with a growing delay, up to `job_retries` times, before the job fails.
+    """
+    try:
+        services = ctx["worker_services"]
+        await services.content_service.handle_webhook_event(event=event, job_id=ctx.get("job_id"))
+
+        return KollektivTaskResult(
+            status=KollektivTaskStatus.SUCCESS,
+            message=f"Processed {event.data.event_type} event for job {event.data.firecrawl_id}",
+        )
+    except Exception as e:
+        job_try = ctx.get("job_try", 1)
+        if job_try <= arq_settings.job_retries:
+            logger.warning(f"Retrying webhook event {event.event_id} after attempt {job_try} failed: {e}")
+            raise Retry(defer=job_try * arq_settings.webhook_event_retry_delay) from e
+        logger.exception(f"Error handling webhook event {event.event_id}: {e}")
+        return KollektivTaskResult(
+            status=KollektivTaskStatus.FAILED, message=f"Failed to handle webhook event: {str(e)}"
+        )
+
+
+async def delete_source(ctx: dict[str, Any], user_id: UUID, source_id: UUID) -> KollektivTaskResult:
+    """Delete a source's vectors and stored content without touching the rest of the user collection."""
+    try:
+        services = ctx["worker_services"]
+        deleted_vectors = await services.vector_db.delete_source(user_id=user_id, source_id=source_id)
+        await services.data_service.delete_source_content(source_id=source_id)
+        await services.data_service.delete_datasource(source_id=source_id)
+
+        return KollektivTaskResult(
+            status=KollektivTaskStatus.SUCCESS,
+            message=f"Successfully deleted source {source_id}",
+            data={"deleted_vectors": deleted_vectors},
+        )
+    except Exception as e:
+        logger.exception(f"Error deleting source {source_id}: {e}")
+        return KollektivTaskResult(status=KollektivTaskStatus.FAILED, message=f"Failed to delete source: {str(e)}")
+
+
+async def reindex_source(ctx: dict[str, Any], user_id: UUID, source_id: UUID) -> KollektivTaskResult:
+    """Rebuild a source's vectors from the chunks stored in Supabase."""
+    try:
+        services = ctx["worker_services"]
+        chunks = await services.data_service.get_chunks_by_source(source_id=source_id)
+        if not chunks:
+            return KollektivTaskResult(
+                status=KollektivTaskStatus.FAILED, message=f"No chunks found for source {source_id}"
+            )
+
+        deleted_vectors = await services.vector_db.replace_source(user_id=user_id, source_id=source_id, chunks=chunks)
+
+        return KollektivTaskResult(
+            status=KollektivTaskStatus.SUCCESS,
+            message=f"Successfully reindexed {len(chunks)} chunks of source {source_id}",
+            data={"indexed_chunks": len(chunks), "deleted_vectors": deleted_vectors},
+        )
+    except Exception as e:
+        logger.exception(f"Error reindexing source {source_id}: {e}")
+        return KollektivTaskResult(status=KollektivTaskStatus.FAILED, message=f"Failed to reindex source: {str(e)}")
 
 
 # Export tasks
@@ -391,6 +611,10 @@ task_list: list[TaskFunction] = [
     check_content_processing_complete,
     generate_summary,
     chunk_document_batch,
+    complete_document_batch,
     process_documents,
     persist_chunks,
+    handle_webhook_event,
+    delete_source,
+    reindex_source,
 ]
@@ -1,9 +1,15 @@
+import asyncio
+import signal
 from concurrent import futures
 from typing import Any
 
+from arq.worker import Worker, create_worker
+
 from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.queues import QueueName, allocate_max_jobs
 from src.infra.arq.serializer import deserialize, serialize
 from src.infra.arq.task_definitions import task_list
+from src.infra.arq.worker_metrics import WorkerMetrics, instrument
 from src.infra.arq.worker_services import WorkerServices
 from src.infra.logger import configure_logging, get_logger
 from src.infra.settings import get_settings
@@ -20,17 +26,25 @@ async def on_startup(ctx: dict[str, Any]) -> None:
     ctx["worker_services"] = await WorkerServices.create()
     ctx["arq_redis"] = ctx["worker_services"].arq_redis_pool
     ctx["pool"] = futures.ProcessPoolExecutor()
+    ctx["worker_metrics"] = WorkerMetrics(ctx["arq_redis"], limiters=ctx["worker_services"].limiters)
+    ctx["worker_metrics_task"] = asyncio.create_task(ctx["worker_metrics"].run())
 
 
 async def on_shutdown(ctx: dict[str, Any]) -> None:
     """Runs on shutdown."""
+    ctx["worker_metrics_task"].cancel()
+    await asyncio.gather(ctx["worker_metrics_task"], return_exceptions=True)
     await ctx["worker_services"].shutdown_services()
 
 
 class WorkerSettings:
-    """Settings for the Arq worker."""
+    """Settings for the Arq worker.
+
+    `run_worker` starts one worker per queue from these settings. Running them with the arq CLI consumes only the
+    bulk queue.
+    """
 
-    functions = task_list
+    functions = [instrument(task) for task in task_list]
     on_startup = on_startup
     on_shutdown = on_shutdown
     redis_settings = arq_settings.redis_settings
@@ -42,11 +56,53 @@ class WorkerSettings:
     keep_result = 60  # Keep results for 60 seconds after completion
 
 
-def run_worker() -> None:
-    """Run Arq worker."""
-    import sys
+def create_queue_workers(
+    ctx: dict[str, Any],
+    queue_weights: dict[QueueName, int] = arq_settings.queue_weights,
+    max_jobs: int = arq_settings.max_jobs,
+) -> list[Worker]:
+    """Create a worker per consumed queue, with a share of max_jobs by queue weight.
+
+    The workers share the services in `ctx`, startup and shutdown are handled once by the caller.
+    """
+    return [
+        create_worker(
+            WorkerSettings,
+            queue_name=queue.key,
+            max_jobs=queue_max_jobs,
+            ctx=dict(ctx),
+            on_startup=None,
+            on_shutdown=None,
+            handle_signals=False,
+        )
+        for queue, queue_max_jobs in allocate_max_jobs(queue_weights, max_jobs).items()
+    ]
+
 
-    from arq.cli import cli
+async def run_queue_workers() -> None:
+    """Run the workers of all consumed queues until the process is signalled to stop."""
+    ctx: dict[str, Any] = {}
+    await on_startup(ctx)
+    workers = create_queue_workers(ctx)
+    logger.info(f"Consuming queues: {', '.join(f'{worker.queue_name} ({worker.max_jobs})' for worker in workers)}")
 
-    sys.argv = ["arq", "src.infra.arq.worker.WorkerSettings"]
-    cli()
+    def stop(signum: signal.Signals) -> None:
+        for worker in workers:
+            worker.handle_sig(signum)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop, signum)
+
+    try:
+        await asyncio.gather(*(worker.async_run() for worker in workers))
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await asyncio.gather(*(worker.close() for worker in workers))
+        await on_shutdown(ctx)
+
+
+def run_worker() -> None:
+    """Run Arq workers for all queues."""
+    asyncio.run(run_queue_workers())
@@ -0,0 +1,221 @@
+import asyncio
+import functools
+import os
+import socket
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+import logfire
+from arq.constants import job_key_prefix
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.queues import QueueName
+from src.infra.external.backend_limiter import AdaptiveLimiter, Backend
+from src.infra.logger import get_logger
+from src.models.task_models import KollektivTaskResult, KollektivTaskStatus
+
+arq_settings = get_arq_settings()
+logger = get_logger()
+
+# Logfire (OpenTelemetry) instruments, no-ops until logfire is configured
+_jobs = logfire.metric_counter("arq.jobs", description="Finished jobs by function and outcome")
+_wait_time = logfire.metric_histogram("arq.job.wait_time", unit="s", description="Enqueue to start of a job")
+_run_time = logfire.metric_histogram("arq.job.run_time", unit="s", description="Run time of a job")
+_payload_size = logfire.metric_histogram("arq.job.payload_size", unit="By", description="Serialized job size")
+_queue_depth = logfire.metric_gauge("arq.queue.depth", description="Jobs waiting in a queue")
+_backend_gauges = {
+    "in_flight": logfire.metric_gauge("backend.in_flight", description="Backend calls in flight in a worker"),
+    "waiting": logfire.metric_gauge("backend.waiting", description="Backend calls queued by a worker's limiter"),
+    "limit": logfire.metric_gauge("backend.limit", description="Current concurrency limit of a worker's limiter"),
+}
+_BACKEND_COUNTERS = ("completed", "failed", "slow")
+
+
+def metric_field(name: str, **labels: str) -> str:
+    """Hash field of a metric, labels are encoded as `name;key=value;...`."""
+    return ";".join([name, *(f"{key}={value}" for key, value in labels.items())])
+
+
+def parse_metric_field(field: str) -> tuple[str, dict[str, str]]:
+    """Split a hash field into the metric name and its labels."""
+    name, *labels = field.split(";")
+    return name, dict(label.split("=", 1) for label in labels)
+
+
+class WorkerMetrics:
+    """Records queue depth, wait time, run time, outcome and payload size of ARQ jobs.
+
+    Every job updates in-process counters and logfire instruments. `flush` adds the counters to a Redis hash shared by
+    all workers and sets the depth of every queue, so the hash holds totals across the fleet that can be scraped via
+    the API's metrics endpoint. Redis failures keep the counters for the next flush.
+
+    Recorded per task function: jobs_total (by outcome), and _sum/_count of job_wait_seconds, job_run_seconds and
+    job_payload_bytes. Recorded per queue: queue_depth. Recorded per backend of the worker's limiters:
+    backend_completed_total, backend_failed_total and backend_slow_total, and, per backend and worker,
+    backend_in_flight, backend_waiting and backend_limit. A worker removes its own gauges when it stops.
+    """
+
+    key = "arq_metrics"
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        queues: tuple[QueueName, ...] = tuple(QueueName),
+        flush_interval: float = arq_settings.metrics_flush_interval,
+        limiters: dict[Backend, AdaptiveLimiter] | None = None,
+        worker: str | None = None,
+    ):
+        self.redis = redis
+        self.queues = queues
+        self.flush_interval = flush_interval
+        self.limiters = limiters or {}
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self.pending: Counter[str] = Counter()
+        self._limiter_counts: dict[str, int] = {}  # limiter counters already added to pending
+
+    def _observe(self, name: str, value: float, function: str) -> None:
+        self.pending[metric_field(f"{name}_sum", function=function)] += value
+        self.pending[metric_field(f"{name}_count", function=function)] += 1
+
+    def record_job(
+        self, function: str, outcome: str, wait_seconds: float, run_seconds: float, payload_bytes: int | None
+    ) -> None:
+        """Record a finished job."""
+        attributes = {"function": function}
+        self.pending[metric_field("jobs_total", function=function, outcome=outcome)] += 1
+        _jobs.add(1, {**attributes, "outcome": outcome})
+
+        self._observe("job_wait_seconds", wait_seconds, function)
+        _wait_time.record(wait_seconds, attributes)
+        self._observe("job_run_seconds", run_seconds, function)
+        _run_time.record(run_seconds, attributes)
+        if payload_bytes is not None:
+            self._observe("job_payload_bytes", payload_bytes, function)
+            _payload_size.record(payload_bytes, attributes)
+
+    async def payload_size(self, job_id: str | None) -> int | None:
+        """Size of a job's serialized payload in Redis, None when it cannot be read."""
+        if self.redis is None or job_id is None:
+            return None
+        try:
+            # STRLEN is 0 for a missing key, e.g. when the job was not started by a worker
+            return await self.redis.strlen(job_key_prefix + job_id) or None
+        except RedisError:
+            return None
+
+    def _limiter_gauges(self) -> dict[str, float]:
+        """Add the limiters' outcome counters since the last call to pending and get their current gauges."""
+        gauges = {}
+        for backend, limiter in self.limiters.items():
+            metrics = limiter.metrics()
+            for name in _BACKEND_COUNTERS:
+                field = metric_field(f"backend_{name}_total", backend=backend.value)
+                self.pending[field] += metrics[name] - self._limiter_counts.get(field, 0)
+                self._limiter_counts[field] = metrics[name]
+            for name, gauge in _backend_gauges.items():
+                gauges[metric_field(f"backend_{name}", backend=backend.value, worker=self.worker)] = metrics[name]
+                gauge.set(metrics[name], {"backend": backend.value})
+        return gauges
+
+    async def flush(self) -> None:
+        """Add the pending counters to the shared hash and refresh queue depths and limiter gauges."""
+        if self.redis is None:
+            return
+        gauges = self._limiter_gauges()
+        pending, self.pending = self.pending, Counter()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for queue in self.queues:
+                    pipe.zcard(queue.key)
+                depths = await pipe.execute()
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for field, value in pending.items():
+                    pipe.hincrbyfloat(self.key, field, value)
+                for queue, depth in zip(self.queues, depths, strict=True):
+                    pipe.hset(self.key, metric_field("queue_depth", queue=queue.value), depth)
+                    _queue_depth.set(depth, {"queue": queue.value})
+                if gauges:
+                    pipe.hset(self.key, mapping=gauges)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to flush worker metrics, keeping them for the next flush: {e}")
+            self.pending.update(pending)
+
+    async def remove_gauges(self) -> None:
+        """Remove the limiter gauges of this worker from the shared hash, so a stopped worker reports nothing."""
+        if self.redis is None or not self.limiters:
+            return
+        fields = [
+            metric_field(f"backend_{name}", backend=backend.value, worker=self.worker)
+            for backend in self.limiters
+            for name in _backend_gauges
+        ]
+        try:
+            await self.redis.hdel(self.key, *fields)
+        except RedisError as e:
+            logger.warning(f"Failed to remove limiter gauges of worker {self.worker}: {e}")
+
+    async def run(self) -> None:
+        """Flush metrics every `flush_interval` seconds until cancelled, flushing once more on cancellation."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            await self.flush()
+            await self.remove_gauges()
+
+    async def snapshot(self) -> dict[str, float]:
+        """Get the metrics of all workers from the shared hash."""
+        if self.redis is None:
+            return {}
+        raw = await self.redis.hgetall(self.key)
+        return {(field.decode() if isinstance(field, bytes) else field): float(value) for field, value in raw.items()}
+
+
+def instrument(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Record metrics of every run of an ARQ task function with the `WorkerMetrics` in the job context.
+
+    Failed KollektivTaskResults and exceptions count as failures. Tasks run without metrics when the context has none.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(ctx: dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        metrics: WorkerMetrics | None = ctx.get("worker_metrics")
+        if metrics is None:
+            return await func(ctx, *args, **kwargs)
+
+        enqueue_time: datetime | None = ctx.get("enqueue_time")
+        wait_seconds = (datetime.now(UTC) - enqueue_time).total_seconds() if enqueue_time else 0.0
+        payload_bytes = await metrics.payload_size(ctx.get("job_id"))
+        started = time.perf_counter()
+        outcome = "cancelled"
+        try:
+            result = await func(ctx, *args, **kwargs)
+            failed = isinstance(result, KollektivTaskResult) and result.status == KollektivTaskStatus.FAILED
+            outcome = "failed" if failed else "success"
+            return result
+        except Exception:
+            outcome = "failed"
+            raise
+        finally:
+            metrics.record_job(func.__name__, outcome, wait_seconds, time.perf_counter() - started, payload_bytes)
+
+    return wrapper
+
+
+def render_prometheus(snapshot: dict[str, float], prefix: str = "arq_") -> str:
+    """Render a metrics snapshot in the Prometheus text exposition format."""
+    lines = []
+    for field in sorted(snapshot):
+        name, labels = parse_metric_field(field)
+        rendered_labels = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        value = snapshot[field]
+        lines.append(f"{prefix}{name}{{{rendered_labels}}} {int(value) if value.is_integer() else value}")
+    return "\n".join(lines) + "\n"
@@ -1,23 +1,29 @@
-from typing import Union
+from typing import Any, Union
 
 from arq import ArqRedis
 
 from src.core.chat.summary_manager import SummaryManager
+from src.core.content.batch_sizer import BatchSizer
 from src.core.content.chunker import MarkdownChunker
+from src.core.content.crawler import FireCrawler
 from src.core.search.embedding_manager import EmbeddingManager
 from src.core.search.vector_db import VectorDatabase
+from src.infra.arq.arq_settings import get_arq_settings
 from src.infra.arq.redis_pool import RedisPool
 from src.infra.data.data_repository import DataRepository
 from src.infra.data.redis_repository import RedisRepository
 from src.infra.events.event_publisher import EventPublisher
+from src.infra.external.backend_limiter import AdaptiveLimiter, Backend, create_limiters
 from src.infra.external.chroma_manager import ChromaManager
 from src.infra.external.redis_manager import RedisManager
 from src.infra.external.supabase_manager import SupabaseManager
 from src.infra.logger import get_logger
+from src.services.content_service import ContentService
 from src.services.data_service import DataService
 from src.services.job_manager import JobManager
 
 logger = get_logger()
+arq_settings = get_arq_settings()
 
 
 class WorkerServices:
@@ -40,7 +46,13 @@ class WorkerServices:
         self.chroma_manager: ChromaManager | None = None
         self.event_publisher: EventPublisher | None = None
         self.chunker: MarkdownChunker | None = None
+        self.batch_sizer: BatchSizer | None = None
         self.arq_redis_pool: ArqRedis | None = None
+        self.firecrawler: FireCrawler | None = None
+        self.content_service: ContentService | None = None
+        self.limiters: dict[Backend, AdaptiveLimiter] = create_limiters(
+            arq_settings.backend_max_concurrency, arq_settings.backend_latency_targets
+        )
 
     async def initialize_services(self) -> None:
         """Initialize all necesssary worker services."""
@@ -58,6 +70,7 @@ class WorkerServices:
             # Job & Content Services
             self.job_manager = JobManager(data_service=self.data_service)
             self.chunker = MarkdownChunker()
+            self.batch_sizer = BatchSizer(redis=self.arq_redis_pool)
 
             # Vector operations
             self.chroma_manager = await ChromaManager.create_async()
@@ -71,6 +84,17 @@ class WorkerServices:
             # Events
             self.event_publisher = await EventPublisher.create_async(redis_manager=self.async_redis_manager)
 
+            # Deferred webhook events
+            self.firecrawler = FireCrawler()
+            self.content_service = ContentService(
+                crawler=self.firecrawler,
+                job_manager=self.job_manager,
+                data_service=self.data_service,
+                redis_manager=self.async_redis_manager,
+                event_publisher=self.event_publisher,
+                arq_redis_pool=self.arq_redis_pool,
+            )
+
             # Source summary
             self.summary_manager = SummaryManager(data_service=self.data_service)
 
@@ -84,10 +108,17 @@ class WorkerServices:
         """Shutdown all services."""
         try:
             logger.info("Shutting down")
+            logger.info(f"Backend limiter metrics: {self.limiter_metrics()}")
+            if self.firecrawler is not None:
+                await self.firecrawler.close()
 
         except Exception as e:
             logger.error(f"Error during service shutdown: {e}", exc_info=True)
 
+    def limiter_metrics(self) -> dict[str, dict[str, Any]]:
+        """Get the in-flight, queue and outcome metrics of every backend limiter."""
+        return {backend.value: limiter.metrics() for backend, limiter in self.limiters.items()}
+
     @classmethod
     async def create(cls) -> "WorkerServices":
         """Create a new WorkerServices instance and initialize services."""
@@ -170,21 +170,7 @@ class DataRepository:
         query = client.schema(model_class._db_config["schema"]).table(model_class._db_config["table"]).select("*")
 
         if filters:
-            processed_filters = {}
-            for field, value in filters.items():
-                if isinstance(value, UUID):
-                    processed_filters[field] = str(value)
-                elif isinstance(value, list) and all(isinstance(x, UUID) for x in value):
-                    processed_filters[field] = [str(x) for x in value]
-                else:
-                    processed_filters[field] = value
-
-            # Use processed values in query with correct operators
-            for field, value in processed_filters.items():
-                if isinstance(value, list):
-                    query = query.in_(field, value)  # Use in_ for lists
-                else:
-                    query = query.eq(field, value)  # Use eq for single values
+            query = self._apply_filters(query, filters)
 
         if order_by:
             query = query.order(order_by)
@@ -200,3 +186,49 @@ class DataRepository:
 
         result = await query.execute()
         return [model_class.model_validate(item) for item in result.data]
+
+    @supabase_operation
+    async def delete(self, model_class: type[T], filters: dict[str, Any]) -> int:
+        """Delete all entities matching the filters.
+
+        Args:
+            model_class: The model class to delete from
+            filters: Field:value pairs, same format as in find(). Required to avoid accidental full table deletes.
+
+        Returns:
+            int: Number of deleted records
+
+        Examples:
+            # Delete all chunks of a source
+            deleted = await repo.delete(Chunk, filters={"source_id": source_id})
+        """
+        if not filters:
+            raise ValueError("Refusing to delete without filters")
+
+        client = await self.supabase_manager.get_async_client()
+        query = client.schema(model_class._db_config["schema"]).table(model_class._db_config["table"]).delete()
+        query = self._apply_filters(query, filters)
+
+        logger.debug(f"Executing delete with filters: {filters}")
+        result = await query.execute()
+        return len(result.data)
+
+    @staticmethod
+    def _apply_filters(query: Any, filters: dict[str, Any]) -> Any:
+        """Apply equality and IN filters to a query, converting UUIDs to strings."""
+        processed_filters = {}
+        for field, value in filters.items():
+            if isinstance(value, UUID):
+                processed_filters[field] = str(value)
+            elif isinstance(value, list) and all(isinstance(x, UUID) for x in value):
+                processed_filters[field] = [str(x) for x in value]
+            else:
+                processed_filters[field] = value
+
+        # Use processed values in query with correct operators
+        for field, value in processed_filters.items():
+            if isinstance(value, list):
+                query = query.in_(field, value)  # Use in_ for lists
+            else:
+                query = query.eq(field, value)  # Use eq for single values
+        return query
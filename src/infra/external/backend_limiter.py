@@ -0,0 +1,181 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, ParamSpec, TypeVar
+
+from src.infra.logger import get_logger
+
+logger = get_logger()
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class Backend(str, Enum):
+    """Downstream services whose concurrency is limited by the worker."""
+
+    CHROMA = "chroma"
+    SUPABASE = "supabase"
+
+
+class AdaptiveLimiter:
+    """Caps the number of in-flight requests to a backend and adapts the cap to how the backend copes.
+
+    The limit grows by one for every `limit` successful requests while it is fully used (additive increase) and is
+    multiplied by `backoff` when a request fails or takes longer than `latency_target` (multiplicative decrease).
+    Only requests started after the last decrease can decrease the limit again, so a burst of slow requests that all
+    overlapped backs off once. Requests over the limit wait in FIFO order.
+
+    Args:
+        name (str): Name of the backend, used in logs and metrics.
+        max_limit (int): Upper bound of concurrent requests, also the starting limit.
+        min_limit (int): Lower bound of concurrent requests.
+        latency_target (float): Seconds above which a request counts as a sign of overload.
+        backoff (float): Factor the limit is multiplied by on overload.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        min_limit: int = 1,
+        latency_target: float = 5.0,
+        backoff: float = 0.7,
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"Limits of {name} must satisfy 1 <= min_limit <= max_limit")
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(max_limit)
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.slow = 0
+        self.decreases = 0
+        self.wait_seconds = 0.0
+        self.latency = 0.0  # moving average of request latency
+        self._waiters: list[asyncio.Future[None]] = []
+        self._last_decrease = 0.0
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests queued for a slot."""
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def _acquire(self) -> None:
+        if not self._waiters and self._has_capacity():
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation, pass it on
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            self.wait_seconds += time.monotonic() - started
+
+    def _release(self, started: float, failed: bool) -> None:
+        latency = time.monotonic() - started
+        self.latency += 0.2 * (latency - self.latency)
+        saturated = bool(self._waiters) or self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+
+        if failed:
+            self.failed += 1
+        else:
+            self.completed += 1
+            if latency > self.latency_target:
+                self.slow += 1
+
+        if failed or latency > self.latency_target:
+            if started >= self._last_decrease:
+                self._decrease(latency, failed)
+        elif saturated:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        self._wake()
+
+    def _decrease(self, latency: float, failed: bool) -> None:
+        previous = int(self.limit)
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        reason = "request failed" if failed else f"request took {latency:.1f}s"
+        logger.warning(
+            f"Backing off {self.name}: {reason}, limit {previous} -> {int(self.limit)}, "
+            f"{self.in_flight} in flight, {self.waiting} waiting"
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the backend's request slots for the duration of the block.
+
+        Exceptions raised in the block count as failures and decrease the limit before they propagate.
+        """
+        await self._acquire()
+        started = time.monotonic()
+        failed = False
+        try:
+            yield
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(started, failed)
+
+    async def call(self, func: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Await `func(*args, **kwargs)` in one of the backend's request slots."""
+        async with self.slot():
+            return await func(*args, **kwargs)
+
+    def metrics(self) -> dict[str, Any]:
+        """Current limit, in-flight and queued requests and outcome counters of the backend."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "slow": self.slow,
+            "decreases": self.decreases,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "latency": round(self.latency, 3),
+        }
+
+
+def create_limiters(
+    max_concurrency: dict[Backend, int], latency_targets: dict[Backend, float]
+) -> dict[Backend, AdaptiveLimiter]:
+    """Create a limiter per backend."""
+    return {
+        backend: AdaptiveLimiter(
+            backend.value, max_limit=max_concurrency[backend], latency_target=latency_targets[backend]
+        )
+        for backend in Backend
+    }
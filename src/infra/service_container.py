@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+
 from redis.asyncio import Redis
 
 from src.core.chat.conversation_manager import ConversationManager
@@ -7,6 +9,7 @@ from src.core.chat.llm_assistant import ClaudeAssistant
 from src.core.chat.summary_manager import SummaryManager
 from src.core.content.crawler import FireCrawler
 from src.core.search.embedding_manager import EmbeddingManager
+from src.core.search.query_cache import QueryCache
 from src.core.search.reranker import Reranker
 from src.core.search.retriever import Retriever
 from src.core.search.vector_db import VectorDatabase
@@ -48,6 +51,8 @@ class ServiceContainer:
         self.async_redis_client: Redis | None = None
         self.redis_repository: RedisRepository | None = None
         self.embedding_manager: EmbeddingManager | None = None
+        self.query_cache: QueryCache | None = None
+        self.query_cache_metrics_task: asyncio.Task | None = None
         self.ngrok_service: NgrokService | None = None
         self.chroma_manager: ChromaManager | None = None
         self.event_publisher: EventPublisher | None = None
@@ -83,16 +88,19 @@ class ServiceContainer:
             # Vector operations
             self.chroma_manager = await ChromaManager.create_async()
             self.embedding_manager = EmbeddingManager()
+            self.query_cache = QueryCache(redis_manager=self.async_redis_manager)
+            self.query_cache_metrics_task = asyncio.create_task(self.query_cache.run())
             self.vector_db = VectorDatabase(
                 chroma_manager=self.chroma_manager,
                 embedding_manager=self.embedding_manager,
                 data_service=self.data_service,
+                query_cache=self.query_cache,
             )
             self.reranker = Reranker()
             self.retriever = Retriever(vector_db=self.vector_db, reranker=self.reranker)
 
             # Chat Services
-            self.claude_assistant = ClaudeAssistant(retriever=self.retriever)
+            self.claude_assistant = ClaudeAssistant(retriever=self.retriever, query_cache=self.query_cache)
             self.conversation_manager = ConversationManager(
                 redis_repository=self.redis_repository, data_service=self.data_service
             )
@@ -140,5 +148,12 @@ class ServiceContainer:
             if self.event_consumer is not None:
                 await self.event_consumer.stop()
 
+            if self.firecrawler is not None:
+                await self.firecrawler.close()
+
+            if self.query_cache_metrics_task is not None:
+                self.query_cache_metrics_task.cancel()
+                await asyncio.gather(self.query_cache_metrics_task, return_exceptions=True)
+
         except Exception as e:
             logger.error(f"Error during service shutdown: {e}", exc_info=True)
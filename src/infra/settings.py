@@ -4,6 +4,7 @@ import os
 from enum import Enum
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 from urllib.parse import urlparse
 
 from pydantic import Field
@@ -12,6 +13,7 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from src.api.routes import Routes
 from src.infra.logger import get_logger
 from src.models.base_models import Environment
+from src.models.vector_models import CollectionLayout
 
 logger = get_logger()
 
@@ -65,12 +67,134 @@ class Settings(BaseSettings):
     backoff_factor: float = Field(2.0, description="Backoff factor for retries")
     default_page_limit: int = Field(25, description="Default page limit for crawls")
     default_max_depth: int = Field(5, description="Default max depth for crawls")
+    webhook_deferred_processing: bool = Field(
+        False,
+        description="Acknowledge webhooks right away and handle them in a worker instead of in the request",
+        alias="WEBHOOK_DEFERRED_PROCESSING",
+    )
+    crawl_progress_flush_interval: float = Field(
+        5.0,
+        gt=0,
+        description="Seconds between writes of the crawled page count of a running crawl to its job",
+        alias="CRAWL_PROGRESS_FLUSH_INTERVAL",
+    )
+    crawl_progress_ttl: int = Field(
+        60 * 60 * 24,
+        gt=0,
+        description="Seconds the crawled page count of a crawl is kept in Redis after its last page",
+        alias="CRAWL_PROGRESS_TTL",
+    )
+    webhook_event_log_ttl: int = Field(
+        60 * 60 * 24,
+        gt=0,
+        description="Seconds the webhook events of a crawl are logged, redeliveries are dropped meanwhile",
+        alias="WEBHOOK_EVENT_LOG_TTL",
+    )
+
+    # Ingestion batching
+    ingest_target_job_seconds: float = Field(
+        20.0,
+        gt=0,
+        description="Target duration of chunking and chunk persistence jobs",
+        alias="INGEST_TARGET_JOB_SECONDS",
+    )
+    ingest_max_documents_per_batch: int = Field(
+        200, gt=0, description="Maximum number of documents per chunking job", alias="INGEST_MAX_DOCUMENTS_PER_BATCH"
+    )
+    ingest_max_chunks_per_batch: int = Field(
+        1000, gt=0, description="Maximum number of chunks per persistence job", alias="INGEST_MAX_CHUNKS_PER_BATCH"
+    )
+    ingest_max_batch_bytes: int = Field(
+        4 * 1024 * 1024,
+        gt=0,
+        description="Maximum text size of a batch, keeps Supabase and Chroma requests within their size limits",
+        alias="INGEST_MAX_BATCH_BYTES",
+    )
+    ingest_streaming_enabled: bool = Field(
+        False,
+        description="Chunk and persist pages as crawl.page webhooks deliver them instead of after the crawl completed",
+        alias="INGEST_STREAMING_ENABLED",
+    )
+    ingest_spool_enabled: bool = Field(
+        False,
+        description="Spool crawl results to disk instead of holding them in memory, requires claim checks",
+        alias="INGEST_SPOOL_ENABLED",
+    )
+    ingest_spool_dir: str | None = Field(
+        None,
+        description="Directory of crawl result spool files, defaults to the system temp dir",
+        alias="INGEST_SPOOL_DIR",
+    )
 
     # LLM configuration
     main_model: str = Field("claude-3-5-sonnet-20241022", description="Main LLM model")
     evaluator_model_name: str = Field("gpt-4o-mini", description="Evaluator model name")
     embedding_model: str = Field("text-embedding-3-small", description="Embedding model")
 
+    # Rerank skipping
+    rerank_skip_enabled: bool = Field(
+        True, description="Skip reranking when vector search is already decisive", alias="RERANK_SKIP_ENABLED"
+    )
+    rerank_skip_max_candidates: int = Field(
+        2,
+        ge=0,
+        description="Skip reranking when at most this many unique chunks are found",
+        alias="RERANK_SKIP_MAX_CANDIDATES",
+    )
+    rerank_skip_min_distance_gap: float | None = Field(
+        0.25,
+        gt=0,
+        description="Skip reranking when every returned hit is closer than the next hit by at least this distance",
+        alias="RERANK_SKIP_MIN_DISTANCE_GAP",
+    )
+    rerank_latency_budget_ms: int | None = Field(
+        None,
+        gt=0,
+        description="Skip reranking when vector search already used up this many milliseconds",
+        alias="RERANK_LATENCY_BUDGET_MS",
+    )
+    rerank_skip_max_distance: float = Field(
+        1.2,
+        gt=0,
+        description="Without a rerank, drop hits farther than this squared L2 distance, about a cosine similarity "
+        "of 0.4 for normalized embeddings",
+        alias="RERANK_SKIP_MAX_DISTANCE",
+    )
+
+    # RAG context packing
+    rag_context_token_budget: int = Field(
+        3000,
+        gt=0,
+        description="Maximum tokens of retrieved context passed back to the LLM",
+        alias="RAG_CONTEXT_TOKEN_BUDGET",
+    )
+    rag_context_min_trim_tokens: int = Field(
+        100,
+        ge=0,
+        description="Trim a chunk to the remaining budget only if at least this many tokens are left",
+        alias="RAG_CONTEXT_MIN_TRIM_TOKENS",
+    )
+
+    # Query cache
+    query_cache_enabled: bool = Field(
+        True, description="Cache multi-query expansions and query embeddings", alias="QUERY_CACHE_ENABLED"
+    )
+    query_cache_max_size: int = Field(
+        1024, gt=0, description="Maximum entries in the in-process query cache", alias="QUERY_CACHE_MAX_SIZE"
+    )
+    query_expansion_cache_ttl: int = Field(
+        60 * 60 * 24,
+        gt=0,
+        description="TTL of cached multi-query expansions in seconds",
+        alias="QUERY_EXPANSION_CACHE_TTL",
+    )
+    query_embedding_cache_ttl: int = Field(
+        60 * 60 * 24 * 7,
+        gt=0,
+        description="TTL of cached query embeddings in seconds",
+        alias="QUERY_EMBEDDING_CACHE_TTL",
+    )
+
     # Base directory is src/
     src_dir: Path = Field(default_factory=lambda: Path(__file__).parent.parent.parent)
 
@@ -111,6 +235,29 @@ class Settings(BaseSettings):
     # Pub/Sub
     process_documents_channel: str = Field("process_documents", description="Process documents channel")
 
+    # Job payload compression
+    job_compression_threshold: int = Field(
+        1024,
+        ge=0,
+        description="Job payloads of at least this many bytes are compressed, 0 disables compression",
+        alias="JOB_COMPRESSION_THRESHOLD",
+    )
+    job_compression_codec: Literal["zlib"] = Field(
+        "zlib",
+        description="Codec for compressed job payloads",
+        alias="JOB_COMPRESSION_CODEC",
+    )
+    job_serializer_mode: Literal["generic", "schema"] = Field(
+        "generic",
+        description="Job payload encoding, schema is faster and smaller. Both are always decoded.",
+        alias="JOB_SERIALIZER_MODE",
+    )
+    job_serializer_trusted: bool = Field(
+        True,
+        description="Rebuild schema encoded models without validation, job payloads are only written by Kollektiv",
+        alias="JOB_SERIALIZER_TRUSTED",
+    )
+
     # Chroma client
     chroma_private_url: str = Field(
         ...,
@@ -122,6 +269,14 @@ class Settings(BaseSettings):
         description="Auth credential for Chroma - username:password",
         alias="CHROMA_CLIENT_AUTH_CREDENTIALS",
     )
+    chroma_collection_layout: CollectionLayout = Field(
+        CollectionLayout.PER_USER,
+        description="Collection layout: a collection per user or N shared collections keyed by hash(user_id)",
+        alias="CHROMA_COLLECTION_LAYOUT",
+    )
+    chroma_shard_count: int = Field(
+        16, gt=0, description="Number of shared collections in the sharded layout", alias="CHROMA_SHARD_COUNT"
+    )
 
     # Add this with other settings
     service: ServiceType = Field(
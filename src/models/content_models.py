@@ -4,7 +4,7 @@ import json
 from datetime import UTC, datetime
 from enum import Enum
 from typing import Any, ClassVar
-from uuid import UUID, uuid4
+from uuid import UUID, uuid4, uuid5
 
 from pydantic import BaseModel, Field, HttpUrl, PrivateAttr, ValidationError, field_validator
 
@@ -237,6 +237,11 @@ class Document(SupabaseModel):
 
     _db_config: ClassVar[dict] = {"schema": "content", "table": "documents", "primary_key": "document_id"}
 
+    @staticmethod
+    def stable_id(source_id: UUID, page: str) -> UUID:
+        """Deterministic id of the document of a page of a source, so the page maps to the same document each time."""
+        return uuid5(source_id, f"document:{page}")
+
 
 class DocumentMetadata(BaseModel):
     """Metadata for a document."""
@@ -270,6 +275,11 @@ class Chunk(SupabaseModel):
     # DB config
     _db_config: ClassVar[dict] = {"schema": "content", "table": "chunks", "primary_key": "chunk_id"}
 
+    @staticmethod
+    def stable_id(document_id: UUID, position: int) -> UUID:
+        """Deterministic id of the chunk at `position` of a document, so re-chunking a document yields the same ids."""
+        return uuid5(document_id, f"chunk:{position}")
+
     @field_validator("headers", mode="before")
     @classmethod
     def ensure_headers_is_dict(cls, value: Any) -> dict[str, Any]:
@@ -323,7 +333,14 @@ class SourceOverview(BaseModel):
     summary: SourceSummary = Field(default=..., description="Summary of the source")
 
 
-# PUT /sources/{source_id} <<< this can be a list
-# DELETE /sources/{source_id} <<< this can be a list
+# DELETE /sources/{source_id}
+# POST /sources/{source_id}/reindex
+class SourceTaskResponse(APIModel):
+    """Response for source operations that are executed asynchronously by the worker."""
 
-# DELETE /sources/{source_id} <<< this can be a list
+    source_id: UUID = Field(..., description="ID of the source")
+    task_id: str = Field(..., description="ID of the background task handling the operation")
+    message: str = Field(..., description="Human-readable description of the scheduled operation")
+
+
+# PUT /sources/{source_id} <<< this can be a list
@@ -18,3 +18,11 @@ class KollektivTaskResult(BaseModel):
     status: KollektivTaskStatus = Field(..., description="Status of the task")
     message: str = Field(..., description="Message of the task")
     data: dict[str, Any] | None = Field(None, description="Any additional data for the task")
+
+
+class ClaimCheck(BaseModel):
+    """Reference to a job payload stored outside of the job itself (claim-check pattern)."""
+
+    key: str = Field(..., description="Redis key the payload is stored under")
+    size: int = Field(..., description="Size of the serialized payload in bytes")
+    weight: int | None = Field(None, description="Size of the payload itself, e.g. characters of a document")
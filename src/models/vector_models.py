@@ -1,5 +1,6 @@
 """Holds all vector related models."""
 
+import hashlib
 from enum import Enum
 from typing import Any, Literal
 from uuid import UUID
@@ -55,14 +56,41 @@ class VectorSearchParams(BaseModel):
     )
 
 
+class CollectionLayout(str, Enum):
+    """How user vectors are laid out across Chroma collections."""
+
+    PER_USER = "per_user"  # one collection per user, named after the user id
+    SHARDED = "sharded"  # N shared collections, users assigned by hash(user_id) and isolated by metadata filters
+
+
 class VectorCollection(SupabaseModel):
     """Represents a vector collection consisting of vectors and metadata."""
 
     user_id: UUID = Field(..., description="User ID to which the collection belongs to")
     documents_cnt: int = Field(default=0, description="Number of documents in the collection")
     deleted: bool = Field(default=False, description="Whether the collection is deleted")
+    # The layout comes from the settings of the vector database, it is not stored with the collection
+    layout: CollectionLayout = Field(
+        default=CollectionLayout.PER_USER, exclude=True, description="Layout of the collection"
+    )
+    shard_count: int = Field(
+        default=1, gt=0, exclude=True, description="Number of shared collections in the sharded layout"
+    )
+
+    @property
+    def shard(self) -> int:
+        """Stable shard index of the user, independent of Python's per-process hash seed."""
+        digest = hashlib.sha256(self.user_id.bytes).digest()
+        return int.from_bytes(digest[:8], "big") % self.shard_count
 
     @property
     def name(self) -> str:
-        """Generate collection name based on user_id."""
+        """Generate collection name based on user_id and layout."""
+        if self.layout == CollectionLayout.SHARDED:
+            return f"shard_{self.shard:04d}"
         return str(self.user_id)
+
+    @property
+    def is_shared(self) -> bool:
+        """Whether the collection holds vectors of several users."""
+        return self.layout == CollectionLayout.SHARDED
@@ -1,37 +1,59 @@
 import asyncio
 import json
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Awaitable, Callable
 from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID
 
 from arq import ArqRedis
 from pydantic import ValidationError
 
 from src.api.v0.schemas.webhook_schemas import FireCrawlEventType, FireCrawlWebhookEvent, WebhookProvider
-from src.core._exceptions import CrawlerError, JobNotFoundError, NonRetryableError
+from src.core._exceptions import (
+    CrawlerError,
+    DataSourceError,
+    EmptyContentError,
+    JobNotFoundError,
+    NonRetryableError,
+)
 from src.core.content.crawler import FireCrawler
+from src.core.content.document_spool import DocumentSpool
+from src.infra.arq.arq_settings import get_arq_settings
+from src.infra.arq.bulk_enqueue import JobSpec, enqueue_jobs
+from src.infra.arq.claim_check import PayloadStore
+from src.infra.arq.fan_in import FanIn
+from src.infra.arq.ingestion_lease import IngestionLease
+from src.infra.arq.ingestion_stream import IngestionStream
+from src.infra.arq.queues import queue_for
 from src.infra.decorators import generic_error_handler
 from src.infra.events.channels import Channels
 from src.infra.events.event_publisher import EventPublisher
 from src.infra.external.redis_manager import RedisManager
 from src.infra.logger import get_logger
+from src.infra.settings import settings
 from src.models.content_models import (
     AddContentSourceRequest,
     AddContentSourceRequestDB,
     AddContentSourceResponse,
     ContentProcessingEvent,
     DataSource,
+    Document,
     FireCrawlSourceMetadata,
     SourceEvent,
     SourceOverview,
     SourceStage,
+    SourceTaskResponse,
 )
 from src.models.firecrawl_models import CrawlRequest
 from src.models.job_models import CrawlJobDetails, Job, JobStatus, JobType, ProcessingJobDetails
+from src.models.task_models import ClaimCheck
+from src.services.crawl_progress import CrawlProgress
 from src.services.data_service import DataService
 from src.services.job_manager import JobManager
+from src.services.webhook_event_log import WebhookEventLog
 
 logger = get_logger()
+arq_settings = get_arq_settings()
 
 
 class ContentService:
@@ -154,8 +176,58 @@ class ContentService:
         source = await self.data_service.retrieve_datasource(source_id=source_id)
         return AddContentSourceResponse.from_source(source)
 
-    async def handle_webhook_event(self, event: FireCrawlWebhookEvent) -> None:
-        """Handles webhook events related to content ingestion."""
+    async def _get_user_source(self, source_id: UUID, user_id: UUID) -> DataSource:
+        """Get a source and make sure it belongs to the user."""
+        source = await self.data_service.get_datasource(source_id)
+        if source is None or source.user_id != user_id:
+            raise DataSourceError(source_id=source_id, error_message="Source not found")
+        return source
+
+    async def delete_source(self, source_id: UUID, user_id: UUID) -> SourceTaskResponse:
+        """DELETE /sources/{source_id} entrypoint. Schedules removal of the source's vectors and content."""
+        source = await self._get_user_source(source_id=source_id, user_id=user_id)
+        job = await self.arq_redis_pool.enqueue_job(
+            "delete_source", source.user_id, source.source_id, _queue_name=queue_for("delete_source")
+        )
+        logger.info(f"Enqueued deletion of source {source_id} with job id: {job.job_id}")
+        return SourceTaskResponse(source_id=source_id, task_id=job.job_id, message="Source deletion scheduled")
+
+    async def reindex_source(self, source_id: UUID, user_id: UUID) -> SourceTaskResponse:
+        """POST /sources/{source_id}/reindex entrypoint. Schedules a rebuild of the source's vectors."""
+        source = await self._get_user_source(source_id=source_id, user_id=user_id)
+        job = await self.arq_redis_pool.enqueue_job(
+            "reindex_source", source.user_id, source.source_id, _queue_name=queue_for("reindex_source")
+        )
+        logger.info(f"Enqueued reindexing of source {source_id} with job id: {job.job_id}")
+        return SourceTaskResponse(source_id=source_id, task_id=job.job_id, message="Source reindexing scheduled")
+
+    async def defer_webhook_event(self, event: FireCrawlWebhookEvent) -> bool:
+        """Enqueue handling of a webhook event in a worker, so the webhook can be acknowledged right away.
+
+        The job id is derived from the event id, so a redelivered event that is still queued or whose result is still
+        kept is not enqueued again.
+
+        Returns:
+            bool: True if the event was enqueued, False if it was received before
+        """
+        job = await self.arq_redis_pool.enqueue_job(
+            "handle_webhook_event",
+            event,
+            _job_id=f"handle_webhook_event:{event.event_id}",
+            _queue_name=queue_for("handle_webhook_event"),
+        )
+        if job is None:
+            logger.info(f"Dropped duplicate {event.data.event_type} event {event.event_id}")
+            return False
+        logger.debug(f"Enqueued {event.data.event_type} event {event.event_id} with job id: {job.job_id}")
+        return True
+
+    async def handle_webhook_event(self, event: FireCrawlWebhookEvent, job_id: str | None = None) -> None:
+        """Handles webhook events related to content ingestion.
+
+        `job_id` is the id of the worker job handling a deferred event, a re-run of that job handles the event again.
+        The event is forgotten whenever handling does not finish, including when the job is cancelled or times out.
+        """
         logger.info(
             "Processing webhook event",
             {
@@ -165,6 +237,12 @@ class ContentService:
             },
         )
 
+        # Drop redelivered events before any database work
+        event_log = WebhookEventLog(self.arq_redis_pool)
+        if not await event_log.record(event, owner=job_id):
+            logger.info(f"Dropped duplicate {event.data.event_type} event of crawl {event.data.firecrawl_id}")
+            return
+
         try:
             job = await self.job_manager.get_by_firecrawl_id(event.data.firecrawl_id)
 
@@ -177,21 +255,35 @@ class ContentService:
                         await self._handle_page_crawled(job=job, event=event)
 
                     case FireCrawlEventType.CRAWL_COMPLETED:
+                        await self._flush_crawl_progress(job)
                         await self._handle_crawl_completed(job)
 
                     case FireCrawlEventType.CRAWL_FAILED:
+                        await self._flush_crawl_progress(job)
                         await self._handle_crawl_failure(job, event.data.error or "Unknown error")
 
         except JobNotFoundError:
             logger.exception("Job not found", {"firecrawl_id": event.data.firecrawl_id})
+            await event_log.forget(event)
             raise
         except Exception as e:
             logger.exception(
                 "Firecrawl webhook event handling failed",
                 {"event_type": event.data.event_type, "job_id": job.job_id if job else None, "error": str(e)},
             )
+            await event_log.forget(event)
+            raise
+        except BaseException:
+            await event_log.forget(event)
             raise
 
+    async def rebuild_crawl_job(self, firecrawl_id: str) -> Job:
+        """Rebuild the status, timestamps and page count of a crawl job by replaying its logged webhook events."""
+        job = await self.job_manager.get_by_firecrawl_id(firecrawl_id)
+        replay = await WebhookEventLog(self.arq_redis_pool).replay(firecrawl_id)
+        logger.info(f"Rebuilt crawl job {job.job_id} from its webhook events: {replay}")
+        return await self.job_manager.update_job(job_id=job.job_id, updates=replay.job_updates())
+
     async def _handle_started(self, job: Job) -> None:
         """Handle crawl.started event"""
         try:
@@ -226,18 +318,71 @@ class ContentService:
             raise
 
     async def _handle_page_crawled(self, job: Job, event: FireCrawlWebhookEvent) -> None:
-        """Handle crawl.page event - increment page count"""
+        """Handle crawl.page event - when streaming, process the page right away, then increment the page count.
+
+        The page is counted once it was handled, so a retry of an event whose processing failed does not count it twice.
+        """
+        if settings.ingest_streaming_enabled and event.data.data:
+            await self._stream_pages(job, event.data.data)
+
         try:
-            await self.job_manager.update_job(
-                job_id=job.job_id, updates={"details": {"pages_crawled": job.details.pages_crawled + 1}}
-            )
-            logger.debug(f"Updated job {job.job_id} pages_crawled to {job.details.pages_crawled + 1}")
+            pages_crawled, flush_due = await CrawlProgress(self.arq_redis_pool).increment(job.job_id)
+            if flush_due:
+                await self.job_manager.update_job(
+                    job_id=job.job_id, updates={"details": {"pages_crawled": pages_crawled}}
+                )
+                logger.debug(f"Updated job {job.job_id} pages_crawled to {pages_crawled}")
         except Exception as e:
             logger.error("Failed to update page count", {"job_id": job.job_id, "error": str(e)})
             raise
 
+    async def _flush_crawl_progress(self, job: Job) -> None:
+        """Write the final page count of a crawl to its job."""
+        pages_crawled = await CrawlProgress(self.arq_redis_pool).count(job.job_id)
+        if pages_crawled is not None:
+            await self.job_manager.update_job(job_id=job.job_id, updates={"details": {"pages_crawled": pages_crawled}})
+            logger.debug(f"Updated job {job.job_id} pages_crawled to {pages_crawled}")
+
+    async def _stream_pages(self, job: Job, pages: list[dict[str, Any]]) -> None:
+        """Chunk and persist pages of a running crawl, reporting to the source's ingestion stream."""
+        source_id = job.details.source_id
+        stream = IngestionStream(self.arq_redis_pool)
+        documents = await stream.claim(source_id, self.crawler.documents_from_pages(pages=pages, source_id=source_id))
+        if not documents:
+            return
+
+        added_to: str | None = None
+        try:
+            source = await self.data_service.get_datasource(source_id)
+            latch_id = await stream.latch(source_id, source.user_id)
+            await self.data_service.save_documents(documents=documents)
+            if await stream.add(latch_id):
+                added_to = latch_id
+            else:
+                # The crawl was finalized in the meantime, store the late page without holding up completion
+                logger.warning(f"Page of source {source_id} arrived after its crawl was finalized")
+            await self.arq_redis_pool.enqueue_job(
+                "chunk_document_batch",
+                documents,
+                source.user_id,
+                added_to,
+                _queue_name=queue_for("chunk_document_batch"),
+            )
+        except Exception:
+            # Release the pages for a redelivery or the final crawl results, and the job the fan-in would wait for
+            logger.exception(f"Failed to stream {len(documents)} pages of source {source_id}, releasing them")
+            await stream.unclaim(source_id, documents)
+            if added_to is not None:
+                await stream.remove(added_to)
+            raise
+        logger.debug(f"Streamed {len(documents)} pages of source {source_id} to processing")
+
     async def _handle_crawl_completed(self, job: Job) -> None:
         """Handle crawl.completed event"""
+        if settings.ingest_spool_enabled and arq_settings.claim_check_enabled and not settings.ingest_streaming_enabled:
+            await self._handle_spooled_crawl_completed(job)
+            return
+
         # 1. Get source & documents
         documents, source = await asyncio.gather(
             self.crawler.get_results(
@@ -247,18 +392,131 @@ class ContentService:
             self.data_service.get_datasource(job.details.source_id),
         )
 
-        # 2. Enqueue processing job
-        processing_job = await self.arq_redis_pool.enqueue_job(
-            "process_documents",
-            documents,
-            user_id=source.user_id,
-            source_id=source.source_id,
+        # Pages were processed as they arrived, only the rest of the crawl needs to be processed
+        if settings.ingest_streaming_enabled:
+            if await self._finalize_stream(source, documents):
+                await self._record_processing_scheduled(
+                    job, source, [document.document_id for document in documents], documents_to_save=[]
+                )
+            return
+
+        # 2. Attach to an in-flight run of the same content instead of processing it twice
+        lease = IngestionLease(self.arq_redis_pool)
+        fingerprint = lease.fingerprint(documents)
+        run_id = await lease.acquire(source.source_id, fingerprint)
+        if run_id is None:
+            logger.info(f"Processing of source {source.source_id} is already in flight, attaching")
+            return
+
+        # 3. Enqueue processing job, passing documents by reference so they are written to Redis only once
+        async def payload() -> list[Document] | list[ClaimCheck]:
+            if not arq_settings.claim_check_enabled:
+                return documents
+            return await PayloadStore(self.arq_redis_pool).put_many(
+                documents, weigh=lambda document: len(document.content)
+            )
+
+        if not await self._enqueue_processing(source, lease, fingerprint, run_id, payload):
+            return
+
+        # 4. Update source, jobs, and save documents
+        await self._record_processing_scheduled(
+            job, source, [document.document_id for document in documents], documents_to_save=documents
         )
-        logger.info(f"Enqueued processing job with id: {processing_job.job_id}")
 
-        # 3. Update source, jobs, and save documents
-        saved_documents, _, processing_job = await asyncio.gather(
-            self.data_service.save_documents(documents=documents),
+    async def _handle_spooled_crawl_completed(self, job: Job) -> None:
+        """Handle crawl.completed event with the results spooled to disk, so at most one batch is held in memory.
+
+        Documents are claim-checked and saved batch by batch, processing receives the claim checks only.
+        """
+        source = await self.data_service.get_datasource(job.details.source_id)
+        async with DocumentSpool(directory=settings.ingest_spool_dir) as spool:
+            # 1. Spool results, fingerprinting them on the way
+            digests: list[str] = []
+            async for document_batch in self.crawler.iter_results(
+                firecrawl_id=job.details.firecrawl_id, source_id=source.source_id
+            ):
+                await spool.append(document_batch)
+                digests.extend(IngestionLease.digest(document) for document in document_batch)
+            if not len(spool):
+                logger.error(f"No data accumulated for job {job.details.firecrawl_id}")
+                raise EmptyContentError(f"No content found for job {job.details.firecrawl_id}")
+            logger.info(f"Spooled {len(spool)} documents ({spool.size} bytes) of source {source.source_id}")
+
+            # 2. Attach to an in-flight run of the same content instead of processing it twice
+            lease = IngestionLease(self.arq_redis_pool)
+            fingerprint = lease.combine(digests)
+            run_id = await lease.acquire(source.source_id, fingerprint)
+            if run_id is None:
+                logger.info(f"Processing of source {source.source_id} is already in flight, attaching")
+                return
+
+            # 3. Claim-check documents batch by batch, then enqueue processing by reference
+            async def payload() -> list[ClaimCheck]:
+                store = PayloadStore(self.arq_redis_pool)
+                claims: list[ClaimCheck] = []
+                try:
+                    async for document_batch in spool.batches(settings.ingest_max_documents_per_batch):
+                        claims.extend(
+                            await store.put_many(document_batch, weigh=lambda document: len(document.content))
+                        )
+                except Exception:
+                    await store.delete_many(claims)
+                    raise
+                return claims
+
+            if not await self._enqueue_processing(source, lease, fingerprint, run_id, payload):
+                return
+
+            # 4. Save documents batch by batch, then update source and jobs
+            async for document_batch in spool.batches(settings.ingest_max_documents_per_batch):
+                await self.data_service.save_documents(documents=document_batch)
+            await self._record_processing_scheduled(job, source, spool.document_ids, documents_to_save=[])
+
+    async def _enqueue_processing(
+        self,
+        source: DataSource,
+        lease: IngestionLease,
+        fingerprint: str,
+        run_id: str,
+        payload: Callable[[], Awaitable[list[Document] | list[ClaimCheck]]],
+    ) -> bool:
+        """Enqueue the process_documents job of a run whose lease was acquired, releasing the lease if it fails.
+
+        Returns:
+            bool: False if the run's job could not be enqueued because a job with its id exists
+        """
+        try:
+            documents = await payload()
+            processing_job = await self.arq_redis_pool.enqueue_job(
+                "process_documents",
+                documents,
+                user_id=source.user_id,
+                source_id=source.source_id,
+                fingerprint=fingerprint,
+                _job_id=run_id,
+                _queue_name=queue_for("process_documents"),
+            )
+        except Exception:
+            await lease.release(source.source_id, fingerprint, run_id)
+            raise
+        if processing_job is None:
+            # Run ids are unique, so this only happens if the id was reused, e.g. by a manual re-enqueue
+            logger.error(f"Processing job {run_id} of source {source.source_id} already exists, not processing again")
+            await lease.release(source.source_id, fingerprint, run_id)
+            if arq_settings.claim_check_enabled:
+                await PayloadStore(self.arq_redis_pool).delete_many(documents)
+            return False
+        logger.info(f"Enqueued processing job with id: {processing_job.job_id}")
+        return True
+
+    async def _record_processing_scheduled(
+        self, job: Job, source: DataSource, document_ids: list[UUID], documents_to_save: list[Document]
+    ) -> None:
+        """Save documents, complete the crawl job, create the processing job and mark the source as scheduled."""
+        saves = [self.data_service.save_documents(documents=documents_to_save)] if documents_to_save else []
+        *_, processing_job = await asyncio.gather(
+            *saves,
             self.job_manager.update_job(
                 job_id=job.job_id,
                 updates={"status": JobStatus.COMPLETED, "completed_at": datetime.now(UTC)},
@@ -266,21 +524,21 @@ class ContentService:
             self.job_manager.create_job(
                 job_type=JobType.PROCESSING,
                 details=ProcessingJobDetails(
-                    document_ids=[document.document_id for document in documents],
+                    document_ids=document_ids,
                     source_id=source.source_id,
                 ),
             ),
         )
         logger.debug(f"Updated job {job.job_id} status to COMPLETED")
 
-        # 4. Update source
+        # Update source
         await asyncio.gather(
             self.data_service.update_datasource(
                 source_id=source.source_id,
                 updates={
                     "metadata": FireCrawlSourceMetadata(
                         crawl_config=source.metadata.crawl_config,  # Keep existing
-                        total_pages=len(documents),
+                        total_pages=len(document_ids),
                     ),
                     "status": SourceStage.PROCESSING_SCHEDULED,
                     "job_id": processing_job.job_id,  # How dirty. Overwriting of the job id.
@@ -298,6 +556,45 @@ class ContentService:
 
         logger.debug(f"Updated source {source.source_id} status to PROCESSING")
 
+    async def _finalize_stream(self, source: DataSource, documents: list[Document]) -> bool:
+        """Process the pages of a completed crawl that were not streamed and close the source's ingestion stream.
+
+        The summary is generated from the stored documents of the source once all pages are processed.
+
+        Returns:
+            bool: False if the stream was finalized before, e.g. by a redelivered crawl.completed webhook
+        """
+        stream = IngestionStream(self.arq_redis_pool)
+        if not await stream.begin_finalize(source.source_id):
+            logger.info(f"Ingestion stream of source {source.source_id} is already finalized, attaching")
+            return False
+
+        latch_id = await stream.latch(source.source_id, source.user_id)
+        missing = await stream.claim(source.source_id, documents)
+        if missing:
+            await self.data_service.save_documents(documents=missing)
+        batch_size = settings.ingest_max_documents_per_batch
+        jobs = [
+            JobSpec("chunk_document_batch", (missing[start : start + batch_size], source.user_id, latch_id))
+            for start in range(0, len(missing), batch_size)
+        ]
+        jobs.append(
+            JobSpec(
+                "generate_summary",
+                (None, source.source_id, latch_id),
+                job_id=FanIn.child_job_id(latch_id, "generate_summary"),
+            )
+        )
+
+        await stream.add(latch_id, len(jobs))
+        await enqueue_jobs(self.arq_redis_pool, jobs)
+        await stream.close(latch_id)
+        logger.info(
+            f"Finalized ingestion stream of source {source.source_id}: "
+            f"{len(documents) - len(missing)} pages were streamed, {len(missing)} processed at completion"
+        )
+        return True
+
     async def _handle_crawl_failure(self, job: Job, error: str) -> None:
         """Handle crawl.failed event"""
         # Update job with error
@@ -0,0 +1,55 @@
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.infra.logger import get_logger
+from src.infra.settings import settings
+
+logger = get_logger()
+
+
+class CrawlProgress:
+    """Counts the crawled pages of running crawls in Redis, so crawl.page webhooks do not update the job each time.
+
+    Every page increments an atomic counter per job, so concurrent webhooks never lose a page. The count is written
+    to the job at most once per `flush_interval` seconds, by whichever webhook finds the flush due, and once more
+    when the crawl ends. Counters expire after `ttl` seconds, so pages delivered after the end keep counting on.
+
+    Key layout:
+    - crawl_progress:{job_id}:pages - number of crawled pages
+    - crawl_progress:{job_id}:flush - set while a flush of the count is not due
+    """
+
+    key_prefix = "crawl_progress"
+
+    def __init__(
+        self,
+        redis: Redis,
+        flush_interval: float = settings.crawl_progress_flush_interval,
+        ttl: int = settings.crawl_progress_ttl,
+    ):
+        self.redis = redis
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+
+    def _key(self, job_id: UUID, name: str) -> str:
+        return f"{self.key_prefix}:{job_id}:{name}"
+
+    async def increment(self, job_id: UUID, pages: int = 1) -> tuple[int, bool]:
+        """Count crawled pages of a job.
+
+        Returns:
+            tuple[int, bool]: The number of pages crawled so far and whether the caller should flush it to the job
+        """
+        pages_key = self._key(job_id, "pages")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.incrby(pages_key, pages)
+            pipe.expire(pages_key, self.ttl)
+            pipe.set(self._key(job_id, "flush"), 1, nx=True, px=int(self.flush_interval * 1000))
+            count, _, flush_due = await pipe.execute()
+        return count, bool(flush_due)
+
+    async def count(self, job_id: UUID) -> int | None:
+        """Number of pages crawled for a job, None if no page was counted."""
+        count = await self.redis.get(self._key(job_id, "pages"))
+        return int(count) if count is not None else None
@@ -235,6 +235,32 @@ class DataService:
         await self.repository.save(chunks)
         logger.debug(f"Saved {len(chunks)} chunks")
 
+    async def get_chunks_by_source(self, source_id: UUID, page_size: int = 1000) -> list[Chunk]:
+        """Get all chunks of a source.
+
+        Chunks are read in pages ordered by chunk id, since Supabase caps the rows returned by a single query.
+        """
+        chunks: list[Chunk] = []
+        while True:
+            page = await self.repository.find(
+                Chunk, filters={"source_id": source_id}, order_by="chunk_id", limit=page_size, offset=len(chunks)
+            )
+            chunks.extend(Chunk.model_validate(chunk) for chunk in page)
+            if len(page) < page_size:
+                return chunks
+
+    async def delete_source_content(self, source_id: UUID) -> None:
+        """Delete chunks, documents and summaries of a source."""
+        deleted_chunks = await self.repository.delete(Chunk, filters={"source_id": source_id})
+        deleted_documents = await self.repository.delete(Document, filters={"source_id": source_id})
+        await self.repository.delete(SourceSummary, filters={"source_id": source_id})
+        logger.debug(f"Deleted {deleted_chunks} chunks and {deleted_documents} documents of source {source_id}")
+
+    async def delete_datasource(self, source_id: UUID) -> None:
+        """Delete a data source record."""
+        await self.repository.delete(DataSource, filters={"source_id": source_id})
+        logger.debug(f"Deleted data source {source_id}")
+
     async def save_collection(self, collection: VectorCollection) -> None:
         """Save collection to Supabase."""
         logger.debug(f"Saving collection {collection.name}")
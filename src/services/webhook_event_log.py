@@ -0,0 +1,171 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from redis.asyncio import Redis
+
+from src.api.v0.schemas.webhook_schemas import FireCrawlEventType, FireCrawlWebhookEvent
+from src.infra.logger import get_logger
+from src.infra.settings import settings
+from src.models.job_models import JobStatus
+
+logger = get_logger()
+
+TERMINAL_EVENTS = (FireCrawlEventType.CRAWL_COMPLETED, FireCrawlEventType.CRAWL_FAILED)
+
+
+@dataclass
+class CrawlReplay:
+    """State of a crawl job rebuilt from its logged webhook events."""
+
+    status: JobStatus = JobStatus.PENDING
+    pages_crawled: int = 0
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    error: str | None = None
+
+    def apply(self, event_type: FireCrawlEventType, received_at: datetime, error: str | None = None) -> None:
+        """Apply an event. Terminal events win over events that arrive after them."""
+        terminal = self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+        match event_type:
+            case FireCrawlEventType.CRAWL_STARTED:
+                self.started_at = self.started_at or received_at
+            case FireCrawlEventType.CRAWL_PAGE:
+                self.pages_crawled += 1
+            case FireCrawlEventType.CRAWL_COMPLETED if not terminal:
+                self.status, self.completed_at = JobStatus.COMPLETED, received_at
+            case FireCrawlEventType.CRAWL_FAILED if not terminal:
+                self.status, self.completed_at, self.error = JobStatus.FAILED, received_at, error or "Unknown error"
+        if self.status == JobStatus.PENDING:
+            self.status = JobStatus.IN_PROGRESS
+            self.started_at = self.started_at or received_at
+
+    def job_updates(self) -> dict[str, Any]:
+        """Updates that bring a crawl job to the replayed state."""
+        updates: dict[str, Any] = {"status": self.status, "details": {"pages_crawled": self.pages_crawled}}
+        for field in ("started_at", "completed_at", "error"):
+            if getattr(self, field) is not None:
+                updates[field] = getattr(self, field)
+        return updates
+
+
+class WebhookEventLog:
+    """Append-only log of the webhook events of crawls, which drops redelivered events and can replay a crawl.
+
+    An event is identified by its firecrawl id, type and page id, the page id being the URL of the page of a
+    crawl.page event. Recording an event adds its identity to a hash per crawl, an O(1) check that drops duplicates
+    before any database work, and appends new events to a stream per crawl. Stream entries are compact: the event id,
+    type, page id, time and error, without page content. A crawl.started that arrives after the crawl ended is
+    dropped as stale.
+
+    An event can be recorded on behalf of an owner, the job handling it. A re-run of the same job, after a worker
+    crash for example, is not a duplicate and records the event again.
+
+    Key layout (all keys expire after `ttl` seconds):
+    - webhook_log:{firecrawl_id}:seen   - hash of recorded event identities to their owner
+    - webhook_log:{firecrawl_id}:events - stream of recorded events
+    """
+
+    key_prefix = "webhook_log"
+
+    def __init__(self, redis: Redis, ttl: int = settings.webhook_event_log_ttl):
+        self.redis = redis
+        self.ttl = ttl
+
+    def _key(self, firecrawl_id: str, name: str) -> str:
+        return f"{self.key_prefix}:{firecrawl_id}:{name}"
+
+    @staticmethod
+    def page_id(event: FireCrawlWebhookEvent) -> str:
+        """Id of the page of a crawl.page event, its URL or, without one, a hash of the page. Empty for other events.
+
+        A crawl.page event without a page falls back to the event id.
+        """
+        if event.data.event_type != FireCrawlEventType.CRAWL_PAGE:
+            return ""
+        if not event.data.data:
+            return str(event.event_id)
+        page = event.data.data[0]
+        metadata = page.get("metadata") or {}
+        url = metadata.get("sourceURL") or metadata.get("og:url") or metadata.get("url")
+        return url or hashlib.sha256(json.dumps(page, sort_keys=True).encode()).hexdigest()
+
+    @classmethod
+    def identity(cls, event: FireCrawlWebhookEvent) -> str:
+        """Identity of an event within its crawl."""
+        return f"{event.data.event_type.value}:{cls.page_id(event)}"
+
+    async def record(self, event: FireCrawlWebhookEvent, owner: str | None = None) -> bool:
+        """Record an event, returning False if it is a duplicate or stale and should be dropped.
+
+        An event recorded by `owner` before is not a duplicate for the same owner.
+        """
+        firecrawl_id = event.data.firecrawl_id
+        seen_key = self._key(firecrawl_id, "seen")
+        identity = self.identity(event)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hsetnx(seen_key, identity, owner or "")
+            pipe.expire(seen_key, self.ttl)
+            pipe.hget(seen_key, identity)
+            pipe.hmget(seen_key, [f"{event_type.value}:" for event_type in TERMINAL_EVENTS])
+            added, _, recorded_by, ended = await pipe.execute()
+        if isinstance(recorded_by, bytes):
+            recorded_by = recorded_by.decode()
+        if not added and (owner is None or recorded_by != owner):
+            return False
+        if event.data.event_type == FireCrawlEventType.CRAWL_STARTED and any(
+            recorded is not None for recorded in ended
+        ):
+            logger.debug(f"Dropping crawl.started of crawl {firecrawl_id} that already ended")
+            return False
+
+        entry = {
+            "event_id": str(event.event_id),
+            "type": event.data.event_type.value,
+            "page": self.page_id(event),
+            "received_at": event.timestamp.isoformat(),
+        }
+        if event.data.error:
+            entry["error"] = event.data.error
+        events_key = self._key(firecrawl_id, "events")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(events_key, entry)
+            pipe.expire(events_key, self.ttl)
+            await pipe.execute()
+        return True
+
+    async def forget(self, event: FireCrawlWebhookEvent) -> None:
+        """Forget an event whose handling failed, so that its redelivery is handled. Its log entry stays."""
+        await self.redis.hdel(self._key(event.data.firecrawl_id, "seen"), self.identity(event))
+
+    async def entries(self, firecrawl_id: str) -> list[dict[str, str]]:
+        """Logged events of a crawl, in the order they were recorded."""
+        entries = await self.redis.xrange(self._key(firecrawl_id, "events"))
+        return [
+            {
+                (key.decode() if isinstance(key, bytes) else key): (
+                    value.decode() if isinstance(value, bytes) else value
+                )
+                for key, value in fields.items()
+            }
+            for _, fields in entries
+        ]
+
+    async def replay(self, firecrawl_id: str) -> CrawlReplay:
+        """Rebuild the state of a crawl's job from its logged events.
+
+        Events recorded again after a failed attempt are applied once.
+        """
+        replay = CrawlReplay()
+        applied = set()
+        for entry in await self.entries(firecrawl_id):
+            identity = f"{entry['type']}:{entry['page']}"
+            if identity in applied:
+                continue
+            applied.add(identity)
+            replay.apply(
+                FireCrawlEventType(entry["type"]), datetime.fromisoformat(entry["received_at"]), entry.get("error")
+            )
+        return replay
@@ -1,4 +1,6 @@
+import json
 from typing import Any
+from uuid import NAMESPACE_URL, UUID, uuid5
 
 from src.api.v0.schemas.webhook_schemas import (
     FireCrawlWebhookEvent,
@@ -11,6 +13,11 @@ from src.api.v0.schemas.webhook_schemas import (
 class FireCrawlWebhookHandler:
     """Handles FireCrawl webhook processing logic."""
 
+    @staticmethod
+    def event_id(raw_payload: dict[str, Any]) -> UUID:
+        """Deterministic id of a webhook event, so a redelivered event gets the id of the original delivery."""
+        return uuid5(NAMESPACE_URL, "firecrawl:" + json.dumps(raw_payload, sort_keys=True, separators=(",", ":")))
+
     @staticmethod
     def _parse_firecrawl_payload(data: dict[str, Any]) -> FireCrawlWebhookResponse:
         """Parse FireCrawl webhook payload into a structured response object.
@@ -37,7 +44,12 @@ class FireCrawlWebhookHandler:
         event_data: FireCrawlWebhookResponse, raw_payload: dict[str, Any]
     ) -> FireCrawlWebhookEvent:
         """Create internal webhook event from parsed payload."""
-        return FireCrawlWebhookEvent(provider=WebhookProvider.FIRECRAWL, raw_payload=raw_payload, data=event_data)
+        return FireCrawlWebhookEvent(
+            event_id=FireCrawlWebhookHandler.event_id(raw_payload),
+            provider=WebhookProvider.FIRECRAWL,
+            raw_payload=raw_payload,
+            data=event_data,
+        )
 
     @staticmethod
     def _create_webhook_response(event: FireCrawlWebhookEvent) -> WebhookResponse:
@@ -47,3 +59,13 @@ class FireCrawlWebhookHandler:
             message=f"Processed {event.data.event_type} event for job {event.data.firecrawl_id}",
             provider=WebhookProvider.FIRECRAWL,
         )
+
+    @staticmethod
+    def _create_deferred_response(event: FireCrawlWebhookEvent, queued: bool) -> WebhookResponse:
+        """Create API response for a webhook whose processing was deferred to a worker."""
+        action = "Queued" if queued else "Already received"
+        return WebhookResponse(
+            event_id=event.event_id,
+            message=f"{action} {event.data.event_type} event for job {event.data.firecrawl_id}",
+            provider=WebhookProvider.FIRECRAWL,
+        )
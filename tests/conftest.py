@@ -316,7 +316,6 @@ async def integration_app():
     # Mock only external services that can't be run in tests
     mock_crawler = AsyncMock(spec=FireCrawler)
     mock_crawler.api_key = "test-key"
-    mock_crawler.firecrawl_app = MagicMock()
     mock_crawler.start_crawl = AsyncMock(return_value=MagicMock(success=True, job_id="test-crawl-id"))
 
     # Mock get_results to return proper Document objects
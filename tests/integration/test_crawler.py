@@ -0,0 +1,133 @@
+import asyncio
+import json
+from uuid import UUID
+
+import httpx
+import pytest
+import uvicorn
+from tenacity import RetryError, wait_none
+
+from scripts.firecrawl_stub import FirecrawlStub, StubConfig
+from src.core._exceptions import CrawlerError
+from src.core.content.crawler import FireCrawler
+from src.infra.settings import get_settings
+from src.models.firecrawl_models import CrawlRequest
+
+settings = get_settings()
+
+
+async def wait_until(condition, timeout: float = 5) -> None:
+    """Poll `condition` until it holds, failing after `timeout` seconds."""
+
+    async def poll() -> None:
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.fixture
+async def firecrawl_stub():
+    """Serve the Firecrawl stand-in on a free local port, yielding the stub, its API URL and the received webhooks."""
+    webhooks = []
+
+    def receive_webhook(request: httpx.Request) -> httpx.Response:
+        webhooks.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    stub = FirecrawlStub(
+        StubConfig(page_bytes=200, page_rate=0, results_page_size=2),
+        webhook_client=httpx.AsyncClient(transport=httpx.MockTransport(receive_webhook)),
+    )
+    server = uvicorn.Server(uvicorn.Config(stub.app, host="127.0.0.1", port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    try:
+        await wait_until(lambda: server.started or task.done())
+        if task.done():
+            task.result()
+        port = server.servers[0].sockets[0].getsockname()[1]
+        yield stub, f"http://127.0.0.1:{port}/v1", webhooks
+    finally:
+        server.should_exit = True
+        await task
+
+
+@pytest.fixture
+def _no_retry_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FireCrawler._post_crawl.retry, "wait", wait_none())
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_start_crawl(firecrawl_stub):
+    """The crawl is submitted with the API key and camelCase parameters, without blocking the event loop."""
+    stub, api_url, _ = firecrawl_stub
+    crawler = FireCrawler(api_key="test_key", api_url=api_url)
+    request = CrawlRequest(url="http://example.com", page_limit=10, max_depth=2)
+
+    response = await crawler.start_crawl(request)
+    await crawler.close()
+
+    assert response.success
+    assert response.job_id in stub.crawls
+    headers, body = stub.requests[0]
+    assert headers["authorization"] == "Bearer test_key"
+    assert body == crawler._build_params(request).dict()
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+@pytest.mark.usefixtures("_no_retry_wait")
+async def test_start_crawl_retry_logic(firecrawl_stub):
+    """Gateway errors are retried with one idempotency key, the crawl gives up after max attempts."""
+    stub, api_url, _ = firecrawl_stub
+    crawler = FireCrawler(api_key="test_key", api_url=api_url)
+    request = CrawlRequest(url="http://example.com", page_limit=10)
+
+    stub.errors = [502, 503]
+    response = await crawler.start_crawl(request)
+    assert response.job_id in stub.crawls
+    assert len({headers["x-idempotency-key"] for headers, _ in stub.requests}) == 1
+
+    stub.requests.clear()
+    stub.errors = [502] * 5
+    with pytest.raises(RetryError):
+        await crawler.start_crawl(request)
+    await crawler.close()
+
+    assert len(stub.requests) == settings.max_retries
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_start_crawl_non_retryable_error(firecrawl_stub):
+    """Non-retryable HTTP errors raise CrawlerError immediately."""
+    stub, api_url, _ = firecrawl_stub
+    crawler = FireCrawler(api_key="test_key", api_url=api_url)
+
+    stub.errors = [400]
+    with pytest.raises(CrawlerError):
+        await crawler.start_crawl(CrawlRequest(url="http://example.com", page_limit=10, max_depth=2))
+    await crawler.close()
+
+    assert len(stub.requests) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_crawl_against_firecrawl_stub(firecrawl_stub):
+    """A crawl sends its webhooks in order and its results are fetched page by page over HTTP."""
+    stub, api_url, webhooks = firecrawl_stub
+    crawler = FireCrawler(api_key="test_key", api_url=api_url)
+    source_id = UUID("00000000-0000-0000-0000-000000000000")
+
+    response = await crawler.start_crawl(CrawlRequest(url="http://example.com", page_limit=5))
+    await wait_until(lambda: stub.crawls[response.job_id].status == "completed")
+    documents = await crawler.get_results(response.job_id, source_id)
+    await crawler.close()
+
+    assert [webhook["type"] for webhook in webhooks] == ["crawl.started", *["crawl.page"] * 5, "crawl.completed"]
+    assert {webhook["id"] for webhook in webhooks} == {response.job_id}
+    streamed = {page["metadata"]["sourceURL"]: page["markdown"] for webhook in webhooks for page in webhook["data"]}
+    assert {document.metadata.source_url: document.content for document in documents} == streamed
+    assert len(documents) == 5
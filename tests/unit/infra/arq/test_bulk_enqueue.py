@@ -0,0 +1,95 @@
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from arq import ArqRedis
+from arq.constants import default_queue_name, job_key_prefix, result_key_prefix
+from fakeredis import FakeAsyncRedis
+from redis.asyncio.client import Pipeline
+
+from src.infra.arq.bulk_enqueue import JobSpec, enqueue_jobs
+from src.infra.arq.serializer import deserialize, serialize
+
+
+@pytest.fixture
+def redis():
+    """ArqRedis backed by fake Redis."""
+    return ArqRedis(
+        connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+    )
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_enqueued_like_enqueue_job(redis):
+    """Bulk enqueued jobs have the same queue entries and job info as jobs enqueued one by one."""
+    jobs = await enqueue_jobs(redis, [JobSpec("task", (i,), {"flag": True}) for i in range(5)], chunk_size=2)
+
+    assert await redis.zcard(default_queue_name) == 5
+    infos = [await job.info() for job in jobs]
+    assert [(info.function, info.args, info.kwargs) for info in infos] == [
+        ("task", [i], {"flag": True}) for i in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_existing_and_repeated_job_ids_are_skipped(redis):
+    """Job IDs that already have a job or a result, or repeat within the call, are not enqueued."""
+    await redis.enqueue_job("task", _job_id="queued")
+    await redis.set(result_key_prefix + "finished", b"result")
+
+    jobs = await enqueue_jobs(
+        redis,
+        [JobSpec("task", job_id=job_id) for job_id in ("queued", "finished", "new", "new")],
+    )
+
+    assert [job.job_id if job else None for job in jobs] == [None, None, "new", None]
+    assert await redis.zcard(default_queue_name) == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_deferral_and_expiry_are_kept(redis):
+    """Queue name, deferral and expiry are applied per job."""
+    await enqueue_jobs(
+        redis,
+        [
+            JobSpec("task", job_id="now", queue_name="other"),
+            JobSpec("task", job_id="later", queue_name="other", defer_by=timedelta(minutes=1), expires=120),
+        ],
+    )
+
+    now_score = await redis.zscore("other", "now")
+    later_score = await redis.zscore("other", "later")
+    assert later_score - now_score == pytest.approx(60_000, abs=100)
+    assert 0 < await redis.pttl(job_key_prefix + "later") <= 120_000
+
+
+@pytest.mark.asyncio
+async def test_watch_conflict_falls_back_to_single_enqueue(redis):
+    """If a watched job changes during the transaction, jobs are enqueued one by one."""
+    pipeline = redis.pipeline
+
+    def conflicting_pipeline(transaction: bool = True) -> Pipeline:
+        # Touch a watched job key right after the existence check
+        pipe = pipeline(transaction=transaction)
+        if not transaction:
+            execute = pipe.execute
+
+            async def execute_and_conflict() -> list[Any]:
+                result = await execute()
+                await redis.set(job_key_prefix + "a", b"")
+                await redis.delete(job_key_prefix + "a")
+                return result
+
+            pipe.execute = execute_and_conflict
+        return pipe
+
+    with (
+        patch.object(redis, "pipeline", conflicting_pipeline),
+        patch.object(redis, "enqueue_job", wraps=redis.enqueue_job) as enqueue_job,
+    ):
+        jobs = await enqueue_jobs(redis, [JobSpec("task", job_id="a"), JobSpec("task", job_id="b")])
+
+    assert [job.job_id for job in jobs] == ["a", "b"]
+    assert enqueue_job.await_count == 2
+    assert await redis.zcard(default_queue_name) == 2
@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.infra.arq.checkpoint import CheckpointStage, IngestionCheckpoint
+from src.models.content_models import Chunk
+
+
+@pytest.fixture
+def checkpoint():
+    return IngestionCheckpoint(FakeAsyncRedis(), ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_completed_returns_checkpointed_ids(checkpoint):
+    """Only ids marked completed for the source and stage are reported as completed."""
+    source_id, done, pending = uuid4(), uuid4(), uuid4()
+    await checkpoint.mark_completed(source_id, CheckpointStage.DOCUMENTS, [done])
+
+    assert await checkpoint.completed(source_id, CheckpointStage.DOCUMENTS, [done, pending]) == {done}
+    assert await checkpoint.completed(source_id, CheckpointStage.CHUNKS, [done]) == set()
+    assert await checkpoint.completed(uuid4(), CheckpointStage.DOCUMENTS, [done]) == set()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_expires_and_clears(checkpoint):
+    """Checkpoint keys expire after the ttl and are removed once the source completed."""
+    source_id, chunk_id = uuid4(), uuid4()
+    await checkpoint.mark_completed(source_id, CheckpointStage.CHUNKS, [chunk_id])
+    await checkpoint.mark_completed(source_id, CheckpointStage.SUMMARY, [source_id])
+
+    assert 0 < await checkpoint.redis.ttl(f"checkpoint:{source_id}:chunks") <= 60
+
+    await checkpoint.clear(source_id)
+    assert await checkpoint.redis.keys(f"checkpoint:{source_id}:*") == []
+
+
+def test_chunk_ids_are_stable_per_document_position():
+    """Re-chunking a document yields the same chunk ids."""
+    document_id = uuid4()
+
+    assert Chunk.stable_id(document_id, 0) == Chunk.stable_id(document_id, 0)
+    assert Chunk.stable_id(document_id, 0) != Chunk.stable_id(document_id, 1)
+    assert Chunk.stable_id(document_id, 0) != Chunk.stable_id(uuid4(), 0)
@@ -0,0 +1,77 @@
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.infra.arq.claim_check import PayloadStore
+from src.infra.arq.task_definitions import _load_payloads
+from src.models.content_models import Document, DocumentMetadata
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis()
+
+
+@pytest.fixture
+def store(redis):
+    return PayloadStore(redis, ttl=60)
+
+
+def make_document(i: int) -> Document:
+    return Document(
+        source_id=uuid4(),
+        content=f"content {i}",
+        metadata=DocumentMetadata(source_url=f"https://example.com/{i}", title=f"Page {i}"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_payloads_round_trip_in_order(store):
+    """Stored payloads are returned in the order of the claim checks."""
+    documents = [make_document(i) for i in range(3)]
+
+    claims = await store.put_many(documents)
+    loaded = await store.get_many(list(reversed(claims)))
+
+    assert [document.content for document in loaded] == ["content 2", "content 1", "content 0"]
+    assert all(claim.size > 0 for claim in claims)
+
+
+@pytest.mark.asyncio
+async def test_payloads_expire(store, redis):
+    """Every payload is stored with the configured TTL."""
+    (claim,) = await store.put_many([make_document(0)])
+
+    assert 0 < await redis.ttl(claim.key) <= 60
+
+
+@pytest.mark.asyncio
+async def test_missing_payload_raises(store):
+    """Loading a deleted payload fails loudly instead of processing partial input."""
+    claims = await store.put_many([make_document(0), make_document(1)])
+    await store.delete_many(claims[:1])
+
+    with pytest.raises(KeyError):
+        await store.get_many(claims)
+
+
+@pytest.mark.asyncio
+async def test_empty_payloads_skip_redis():
+    """Empty inputs never touch Redis."""
+    store = PayloadStore(redis=None)
+
+    assert await store.put_many([]) == []
+    assert await store.get_many([]) == []
+    await store.delete_many([])
+
+
+@pytest.mark.asyncio
+async def test_tasks_accept_claims_and_inline_documents(store, redis):
+    """Tasks resolve claim checks and keep accepting jobs enqueued with inline documents."""
+    documents = [make_document(0)]
+    claims = await store.put_many(documents)
+    ctx = {"arq_redis": redis}
+
+    assert (await _load_payloads(ctx, claims))[0].content == "content 0"
+    assert await _load_payloads(ctx, documents) == documents
@@ -0,0 +1,131 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.infra.arq.fan_in import FanIn
+from src.infra.arq.queues import queue_for
+from src.models.task_models import KollektivTaskResult, KollektivTaskStatus
+
+
+@pytest.fixture
+def redis():
+    """Fake Redis with a mocked arq enqueue."""
+    client = FakeAsyncRedis()
+    client.enqueue_job = AsyncMock()
+    return client
+
+
+@pytest.fixture
+def fan_in(redis):
+    return FanIn(redis, ttl=60)
+
+
+def make_result(status: KollektivTaskStatus = KollektivTaskStatus.SUCCESS) -> KollektivTaskResult:
+    return KollektivTaskResult(status=status, message=status.value)
+
+
+@pytest.mark.asyncio
+async def test_continuation_runs_once_after_last_child(fan_in, redis):
+    """Only the last child to report enqueues the continuation, with the latch id and stored arguments."""
+    source_id = uuid4()
+    latch_id = await fan_in.create(3, "continue", source_id)
+
+    completed = [await fan_in.count_down(latch_id, f"job-{i}", make_result()) for i in range(3)]
+
+    assert completed == [False, False, True]
+    redis.enqueue_job.assert_awaited_once_with(
+        "continue", latch_id, source_id, _job_id=fan_in.continuation_job_id(latch_id), _queue_name=queue_for("continue")
+    )
+
+
+@pytest.mark.asyncio
+async def test_results_are_keyed_by_member(fan_in):
+    """The continuation can read every child's result by member name."""
+    latch_id = await fan_in.create(2, "continue")
+    await fan_in.count_down(latch_id, "ok", make_result())
+    await fan_in.count_down(latch_id, "failed", make_result(KollektivTaskStatus.FAILED))
+
+    results = await fan_in.results(latch_id)
+
+    assert results["ok"].status == KollektivTaskStatus.SUCCESS
+    assert results["failed"].status == KollektivTaskStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_retried_child_is_counted_once(fan_in, redis):
+    """A child reporting twice does not complete the latch on behalf of a missing sibling."""
+    latch_id = await fan_in.create(2, "continue")
+
+    await fan_in.count_down(latch_id, "job-1", make_result())
+    assert not await fan_in.count_down(latch_id, "job-1", make_result())
+
+    redis.enqueue_job.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_empty_fan_in_fires_immediately(fan_in, redis):
+    """A latch without children continues straight away."""
+    latch_id = await fan_in.create(0, "continue")
+
+    redis.enqueue_job.assert_awaited_once_with(
+        "continue", latch_id, _job_id=fan_in.continuation_job_id(latch_id), _queue_name=queue_for("continue")
+    )
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_latch(fan_in, redis):
+    """Deleting a latch removes all of its keys."""
+    latch_id = await fan_in.create(1, "continue")
+    await fan_in.count_down(latch_id, "job-1", make_result())
+
+    await fan_in.delete(latch_id)
+
+    assert await redis.keys(f"fan_in:{latch_id}:*") == []
+
+
+@pytest.mark.asyncio
+async def test_open_latch_fires_only_after_close(fan_in, redis):
+    """Children of an open latch can all report before it is closed, closing then fires the continuation."""
+    latch_id = await fan_in.create_open("continue")
+    assert await fan_in.add(latch_id, 2)
+    assert not await fan_in.count_down(latch_id, "job-1", make_result())
+    assert not await fan_in.count_down(latch_id, "job-2", make_result())
+    redis.enqueue_job.assert_not_awaited()
+
+    assert await fan_in.close(latch_id)
+
+    redis.enqueue_job.assert_awaited_once()
+    assert not await fan_in.close(latch_id)
+    assert not await fan_in.add(latch_id)
+
+
+@pytest.mark.asyncio
+async def test_closed_latch_waits_for_added_children(fan_in, redis):
+    """Closing fixes the count to the children added so far, the last of them fires the continuation."""
+    latch_id = await fan_in.create_open("continue")
+    await fan_in.add(latch_id)
+    await fan_in.add(latch_id, 2)
+    await fan_in.count_down(latch_id, "job-1", make_result())
+
+    assert await fan_in.close(latch_id)
+    redis.enqueue_job.assert_not_awaited()
+
+    assert not await fan_in.count_down(latch_id, "job-2", make_result())
+    assert await fan_in.count_down(latch_id, "job-3", make_result())
+    redis.enqueue_job.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_removed_children_are_not_waited_for(fan_in, redis):
+    """A child taken back from an open latch is not part of the count, after closing it can no longer be removed."""
+    latch_id = await fan_in.create_open("continue")
+    await fan_in.add(latch_id, 2)
+    assert await fan_in.remove(latch_id)
+    await fan_in.count_down(latch_id, "job-1", make_result())
+
+    assert await fan_in.close(latch_id)
+
+    redis.enqueue_job.assert_awaited_once()
+    assert not await fan_in.remove(latch_id)
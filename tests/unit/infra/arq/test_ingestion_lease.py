@@ -0,0 +1,55 @@
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.infra.arq.ingestion_lease import IngestionLease
+from src.models.content_models import Document, DocumentMetadata
+
+
+def make_document(url: str, content: str) -> Document:
+    return Document(source_id=uuid4(), content=content, metadata=DocumentMetadata(source_url=url))
+
+
+@pytest.fixture
+def lease():
+    return IngestionLease(FakeAsyncRedis(), ttl=60)
+
+
+def test_fingerprint_depends_on_content_only():
+    """Documents with the same URLs and content share a fingerprint regardless of order and ids."""
+    a, b = make_document("https://a", "alpha"), make_document("https://b", "beta")
+    same = [make_document("https://b", "beta"), make_document("https://a", "alpha")]
+
+    assert IngestionLease.fingerprint([a, b]) == IngestionLease.fingerprint(same)
+    assert IngestionLease.fingerprint([a, b]) != IngestionLease.fingerprint([a, make_document("https://b", "beta!")])
+
+
+@pytest.mark.asyncio
+async def test_only_one_trigger_acquires_a_run(lease):
+    """A duplicate trigger finds the run in flight until the run releases its lease."""
+    source_id = uuid4()
+
+    run_id = await lease.acquire(source_id, "fp")
+    assert run_id.startswith(f"process_documents:{source_id}:fp:")
+    assert await lease.acquire(source_id, "fp") is None
+    assert await lease.acquire(source_id, "other-content")
+    assert await lease.redis.get(f"ingestion_lease:{source_id}:fp") == run_id.encode()
+
+    assert await lease.release(source_id, "fp", run_id)
+    retry_id = await lease.acquire(source_id, "fp")
+    assert retry_id is not None
+    assert retry_id != run_id
+
+
+@pytest.mark.asyncio
+async def test_stale_run_cannot_release_a_newer_lease(lease):
+    """A run whose lease expired does not release the lease a newer run of the same content took."""
+    source_id = uuid4()
+    stale_id = await lease.acquire(source_id, "fp")
+    await lease.redis.delete(f"ingestion_lease:{source_id}:fp")  # expired
+    current_id = await lease.acquire(source_id, "fp")
+
+    assert not await lease.release(source_id, "fp", stale_id)
+    assert await lease.redis.get(f"ingestion_lease:{source_id}:fp") == current_id.encode()
+    assert await lease.release(source_id, "fp", current_id)
@@ -0,0 +1,58 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.infra.arq.ingestion_stream import IngestionStream
+from src.models.content_models import Document, DocumentMetadata
+from src.models.task_models import KollektivTaskResult, KollektivTaskStatus
+
+
+def make_document(source_id, url: str) -> Document:
+    return Document(source_id=source_id, content=f"content of {url}", metadata=DocumentMetadata(source_url=url))
+
+
+@pytest.fixture
+def stream():
+    redis = FakeAsyncRedis()
+    redis.enqueue_job = AsyncMock()
+    return IngestionStream(redis, ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_pages_are_claimed_once(stream):
+    """A page found again in the final crawl results is not processed twice, and keeps its document id."""
+    source_id = uuid4()
+    streamed = await stream.claim(source_id, [make_document(source_id, "https://a")])
+
+    results = [make_document(source_id, "https://a"), make_document(source_id, "https://b")]
+    missing = await stream.claim(source_id, results)
+
+    assert [document.metadata.source_url for document in missing] == ["https://b"]
+    assert results[0].document_id == streamed[0].document_id
+
+
+@pytest.mark.asyncio
+async def test_latch_is_shared_and_finalized_once(stream):
+    """All pages of a source report to one fan-in, whose continuation runs once the stream is finalized."""
+    source_id, user_id = uuid4(), uuid4()
+    latch_id = await stream.latch(source_id, user_id)
+    assert await stream.latch(source_id, user_id) == latch_id
+    assert await stream.add(latch_id)
+
+    assert await stream.begin_finalize(source_id)
+    assert not await stream.begin_finalize(source_id)
+    assert await stream.close(latch_id)
+    stream.redis.enqueue_job.assert_not_awaited()
+
+    assert not await stream.add(latch_id)
+    await stream.fan_in.count_down(
+        latch_id, "chunk_document_batch:1", KollektivTaskResult(status=KollektivTaskStatus.SUCCESS, message="ok")
+    )
+    assert stream.redis.enqueue_job.await_args.args[:4] == (
+        "check_content_processing_complete",
+        latch_id,
+        user_id,
+        source_id,
+    )
@@ -0,0 +1,53 @@
+import pytest
+from arq.constants import default_queue_name
+
+from src.infra.arq.queues import TASK_QUEUES, QueueName, allocate_max_jobs, queue_for
+from src.infra.arq.task_definitions import task_list
+from src.infra.arq.worker import create_queue_workers
+
+
+def test_every_task_has_a_queue():
+    """Every registered task is routed explicitly."""
+    assert {task.__name__ for task in task_list} == set(TASK_QUEUES)
+
+
+def test_status_and_finalization_do_not_share_the_bulk_queue():
+    """Events and completion checks are consumed separately from chunk persistence."""
+    assert queue_for("persist_chunks") == default_queue_name
+    assert queue_for("publish_event") != queue_for("persist_chunks")
+    assert queue_for("check_content_processing_complete") not in {queue_for("publish_event"), default_queue_name}
+
+
+def test_unknown_tasks_run_on_the_bulk_queue():
+    assert queue_for("unknown") == QueueName.BULK.key
+
+
+def test_max_jobs_are_split_by_weight():
+    """Queues get a share of the job limit by weight, at least one job, and weight 0 disables a queue."""
+    allocation = allocate_max_jobs({QueueName.CONTROL: 1, QueueName.FINALIZATION: 0, QueueName.BULK: 8}, 90)
+
+    assert allocation == {QueueName.CONTROL: 10, QueueName.BULK: 80}
+    assert allocate_max_jobs({QueueName.CONTROL: 1, QueueName.BULK: 1000}, 10)[QueueName.CONTROL] == 1
+
+
+def test_queues_without_weight_are_rejected():
+    with pytest.raises(ValueError, match="At least one queue must have a positive weight"):
+        allocate_max_jobs({QueueName.BULK: 0}, 10)
+
+
+@pytest.mark.asyncio
+async def test_a_worker_is_created_per_queue():
+    """Workers share the services but keep their own context and leave signals to the runner."""
+    services = object()
+
+    workers = create_queue_workers(
+        {"worker_services": services}, {QueueName.CONTROL: 1, QueueName.BULK: 3}, max_jobs=40
+    )
+
+    assert [(worker.queue_name, worker.max_jobs) for worker in workers] == [
+        (QueueName.CONTROL.key, 10),
+        (QueueName.BULK.key, 30),
+    ]
+    assert all(worker.ctx["worker_services"] is services for worker in workers)
+    assert workers[0].ctx is not workers[1].ctx
+    assert not any(worker._handle_signals for worker in workers)
@@ -1,10 +1,22 @@
 from datetime import UTC, date, datetime, time
+from unittest.mock import patch
 from uuid import UUID, uuid4
 
+import msgpack
 import pytest
+from pydantic import ValidationError
 
-from src.infra.arq.serializer import deserialize, serialize
-from src.models.content_models import Chunk, Document, DocumentMetadata
+from src.infra.arq.serializer import (
+    HEADER_MAGIC,
+    SCHEMA_MAGIC,
+    Compression,
+    MsgpackSerializer,
+    SchemaCodec,
+    deserialize,
+    serialize,
+)
+from src.models.content_models import Chunk, Document, DocumentMetadata, SourceEvent, SourceStage
+from src.models.task_models import ClaimCheck, KollektivTaskResult, KollektivTaskStatus
 
 
 @pytest.fixture
@@ -203,3 +215,124 @@ def test_datetime_timezone_handling():
     assert isinstance(deserialized["naive"], datetime)
     assert deserialized["naive"].tzinfo is None
     assert deserialized["naive"] == naive_dt
+
+
+@pytest.mark.parametrize("codec", list(Compression))
+def test_large_payloads_are_compressed(sample_document, codec):
+    """Payloads above the threshold are compressed with a header and decode back to the same values."""
+    serializer = MsgpackSerializer(compression_threshold=1024, compression=codec)
+    document = sample_document.model_copy(update={"content": "# Heading\n\nRepeated markdown text. " * 200})
+
+    serialized = serializer.serializer({"data": [document] * 5})
+
+    assert serialized[:2] == HEADER_MAGIC + bytes([codec])
+    assert len(serialized) < len(msgpack.packb(serializer._normalize({"data": [document] * 5})))
+    assert serializer.deserializer(serialized)["data"][0] == document
+
+
+def test_small_payloads_are_not_compressed(sample_uuid):
+    """Payloads below the threshold are written as plain msgpack."""
+    serializer = MsgpackSerializer(compression_threshold=1024, compression=Compression.ZLIB)
+
+    serialized = serializer.serializer({"uuid": sample_uuid})
+
+    assert not serialized.startswith(HEADER_MAGIC)
+    assert serializer.deserializer(serialized)["uuid"] == sample_uuid
+
+
+def test_plain_payloads_still_decode_with_compression_enabled(sample_document):
+    """Payloads written without compression are read by a compressing serializer."""
+    plain = MsgpackSerializer(compression_threshold=0).serializer({"data": sample_document})
+
+    deserialized = MsgpackSerializer(compression_threshold=1, compression=Compression.ZLIB).deserializer(plain)
+
+    assert deserialized["data"] == sample_document
+
+
+@pytest.fixture
+def schema_serializer() -> MsgpackSerializer:
+    """Serializer in schema mode without compression."""
+    return MsgpackSerializer(compression_threshold=0, mode="schema")
+
+
+def test_schema_mode_roundtrip(schema_serializer, complex_test_data):
+    """Schema mode restores models, UUIDs and datetimes like the generic mode."""
+    serialized = schema_serializer.serializer({"data": complex_test_data})
+    deserialized = schema_serializer.deserializer(serialized)["data"]
+
+    assert serialized.startswith(SCHEMA_MAGIC)
+    assert deserialized["document"] == complex_test_data["document"]
+    assert deserialized["chunks"] == complex_test_data["chunks"]
+    assert deserialized["metadata"]["ids"] == complex_test_data["metadata"]["ids"]
+    assert deserialized["datetime"] == complex_test_data["datetime"]
+    assert deserialized["mixed_list"] == complex_test_data["mixed_list"]
+
+
+def test_schema_mode_packs_model_lists_by_column(schema_serializer, sample_chunk):
+    """Homogeneous model lists are packed once per field, which is smaller than the generic encoding."""
+    chunks = [sample_chunk.model_copy(update={"chunk_id": uuid4()}) for _ in range(50)]
+
+    serialized = schema_serializer.serializer({"chunks": chunks})
+
+    assert schema_serializer.deserializer(serialized)["chunks"] == chunks
+    assert len(serialized) < len(MsgpackSerializer(compression_threshold=0).serializer({"chunks": chunks})) / 2
+
+
+def test_schema_mode_restores_enums_and_unregistered_models(schema_serializer, sample_uuid):
+    """Enums come back as enum members and models without a tag are referenced by name."""
+    result = KollektivTaskResult(status=KollektivTaskStatus.FAILED, message="failed", data={"id": sample_uuid})
+    event = SourceEvent(source_id=sample_uuid, stage=SourceStage.COMPLETED, metadata={"pages": 3})
+
+    deserialized = schema_serializer.deserializer(schema_serializer.serializer({"result": result, "other": event}))
+
+    assert deserialized["result"].status is KollektivTaskStatus.FAILED
+    assert deserialized["result"] == result
+    assert deserialized["other"] == event
+
+
+def test_payloads_of_either_mode_decode_in_both(schema_serializer, sample_document):
+    """Switching modes does not break jobs that are already queued."""
+    generic = MsgpackSerializer(compression_threshold=0)
+
+    assert generic.deserializer(schema_serializer.serializer({"data": sample_document}))["data"] == sample_document
+    assert schema_serializer.deserializer(generic.serializer({"data": sample_document}))["data"] == sample_document
+
+
+def test_untrusted_schema_payloads_are_validated(sample_chunk):
+    """Untrusted payloads run model validation, so invalid field values are rejected."""
+    writer = MsgpackSerializer(compression_threshold=0, mode="schema")
+    reader = MsgpackSerializer(compression_threshold=0, mode="schema", trusted=False)
+    invalid = sample_chunk.model_construct(**{**sample_chunk.model_dump(), "token_count": "many"})
+
+    with pytest.raises(ValidationError):
+        reader.deserializer(writer.serializer({"chunk": invalid}))
+
+
+def test_schema_payloads_without_appended_fields_get_defaults(schema_serializer):
+    """Models written before a field was appended decode with the default of the new field."""
+    codec = schema_serializer.schema_codec
+    old_claim = msgpack.ExtType(codec.EXT_MODEL, codec.packb([5, ["claim_check:1", 10]]))
+    serialized = SCHEMA_MAGIC + msgpack.packb({"claim": old_claim})
+
+    assert schema_serializer.deserializer(serialized)["claim"] == ClaimCheck(key="claim_check:1", size=10)
+
+
+@pytest.mark.parametrize(
+    ("code", "payload"),
+    [
+        (SchemaCodec.EXT_ENUM, ["os.getenv", "SERVICE"]),
+        (SchemaCodec.EXT_ENUM, ["src.infra.arq.serializer.os.getenv", "SERVICE"]),
+        (SchemaCodec.EXT_ENUM, ["src.models.content_models.Chunk", "x"]),
+        (SchemaCodec.EXT_MODEL, ["src.models.task_models.KollektivTaskStatus", ["failed"]]),
+        (SchemaCodec.EXT_MODEL_COLUMNS, ["builtins.dict", 1, [[1]]]),
+        (SchemaCodec.EXT_MODEL, [999, []]),
+    ],
+)
+def test_schema_payloads_cannot_call_arbitrary_classes(schema_serializer, code, payload):
+    """Class references in a payload only resolve to models and enums of the application, nothing else is called."""
+    codec = schema_serializer.schema_codec
+    serialized = SCHEMA_MAGIC + msgpack.packb({"value": msgpack.ExtType(code, codec.packb(payload))})
+
+    with patch("os.getenv") as getenv, pytest.raises(ValueError, match="(?i)class reference"):
+        schema_serializer.deserializer(serialized)
+    getenv.assert_not_called()
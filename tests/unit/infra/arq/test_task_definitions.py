@@ -1,19 +1,25 @@
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, Mock, call, patch
 from uuid import uuid4
 
 import pytest
+from arq import Retry
 from arq.jobs import Job
+from fakeredis import FakeAsyncRedis
 
-from src.infra.arq.serializer import deserialize
+from src.api.v0.schemas.webhook_schemas import FireCrawlWebhookEvent, WebhookProvider
+from src.infra.arq.checkpoint import CheckpointStage, IngestionCheckpoint
 from src.infra.arq.task_definitions import (
     KollektivTaskResult,
     KollektivTaskStatus,
-    _create_job_reference,
-    _gather_job_results,
+    _count_down,
+    complete_document_batch,
+    handle_webhook_event,
+    persist_chunks,
     publish_event,
 )
 from src.infra.events.channels import Channels
-from src.models.content_models import ContentProcessingEvent, SourceStage
+from src.infra.external.backend_limiter import Backend, create_limiters
+from src.models.content_models import Chunk, ContentProcessingEvent, SourceStage
 from src.models.pubsub_models import EventType
 
 
@@ -47,82 +53,131 @@ def failure_result():
     )
 
 
-def test_create_job_reference_success(mock_context):
-    """Test successful job reference creation."""
-    job_id = str(uuid4())
+@pytest.mark.asyncio
+async def test_count_down_reports_to_fan_in(mock_context, success_result):
+    """Child jobs report their result to the parent's fan-in under their job id."""
+    mock_context["job_id"] = "job-1"
 
-    with patch("src.infra.arq.task_definitions.Job") as mock_job_class:
-        _create_job_reference(mock_context, job_id)
+    with patch("src.infra.arq.task_definitions.FanIn") as mock_fan_in:
+        mock_fan_in.return_value.count_down = AsyncMock()
+        result = await _count_down(mock_context, "latch", success_result)
 
-        mock_job_class.assert_called_once_with(
-            job_id=job_id,
-            redis=mock_context["arq_redis"],
-            _deserializer=deserialize,  # Use the actual deserializer
-        )
+    assert result == success_result
+    mock_fan_in.return_value.count_down.assert_awaited_once_with("latch", "job-1", success_result)
+
+
+@pytest.mark.asyncio
+async def test_count_down_without_fan_in(mock_context, success_result):
+    """Standalone jobs have no fan-in to report to."""
+    with patch("src.infra.arq.task_definitions.FanIn") as mock_fan_in:
+        assert await _count_down(mock_context, None, success_result) == success_result
+
+    mock_fan_in.assert_not_called()
+
+
+def make_chunk(source_id, position: int = 0) -> Chunk:
+    document_id = uuid4()
+    return Chunk(
+        chunk_id=Chunk.stable_id(document_id, position),
+        source_id=source_id,
+        document_id=document_id,
+        headers={"h1": "Title"},
+        text="text",
+        token_count=1,
+        page_title="Title",
+        page_url="https://example.com",
+    )
 
 
-def test_create_job_reference_invalid_id(mock_context):
-    """Test job reference creation with invalid job ID."""
-    with pytest.raises(ValueError, match="Invalid job ID"):  # Changed to match the actual error
-        with patch("src.infra.arq.task_definitions.Job", side_effect=ValueError("Invalid job ID")):
-            _create_job_reference(mock_context, "invalid-id")
+@pytest.fixture
+def storage_context(mock_context):
+    """Context with fake Redis, storage mocks and real backend limiters."""
+    services = mock_context["worker_services"]
+    mock_context.update(arq_redis=FakeAsyncRedis(), job_id="job-1")
+    services.vector_db.add_data = AsyncMock()
+    services.data_service.save_chunks = AsyncMock()
+    services.batch_sizer.record = AsyncMock()
+    services.limiters = create_limiters(
+        {Backend.CHROMA: 4, Backend.SUPABASE: 4}, {Backend.CHROMA: 10, Backend.SUPABASE: 10}
+    )
+    return mock_context
+
+
+@pytest.mark.asyncio
+async def test_persist_chunks_counts_down_on_failure(storage_context):
+    """A failing storage job still reports to the fan-in so the pipeline does not hang."""
+    services = storage_context["worker_services"]
+    services.vector_db.add_data = AsyncMock(side_effect=Exception("Chroma down"))
+    chunk = make_chunk(uuid4())
+
+    with patch("src.infra.arq.task_definitions.FanIn") as mock_fan_in:
+        mock_fan_in.return_value.count_down = AsyncMock()
+        result = await persist_chunks(storage_context, [chunk], uuid4(), "latch")
+
+    assert result.status == KollektivTaskStatus.FAILED
+    assert services.limiters[Backend.CHROMA].failed == 1
+    assert services.limiters[Backend.SUPABASE].completed == 1
+    reported = mock_fan_in.return_value.count_down.await_args.args
+    assert reported[:2] == ("latch", "job-1")
+    assert reported[2].status == KollektivTaskStatus.FAILED
+    checkpoint = IngestionCheckpoint(storage_context["arq_redis"])
+    assert await checkpoint.completed(chunk.source_id, CheckpointStage.CHUNKS, [chunk.chunk_id]) == set()
 
 
 @pytest.mark.asyncio
-async def test_gather_job_results_all_success(mock_context):
-    """Test gathering results when all jobs succeed."""
-    job_ids = [str(uuid4()) for _ in range(3)]
-    success_results = [
-        KollektivTaskResult(status=KollektivTaskStatus.SUCCESS, message=f"Success {i}") for i in range(3)
-    ]
+async def test_persist_chunks_skips_checkpointed_chunks(storage_context):
+    """A re-run storage job only writes the chunks an earlier attempt did not store, then checkpoints them."""
+    services = storage_context["worker_services"]
+    source_id = uuid4()
+    stored, pending = make_chunk(source_id), make_chunk(source_id, 1)
+    checkpoint = IngestionCheckpoint(storage_context["arq_redis"])
+    await checkpoint.mark_completed(source_id, CheckpointStage.CHUNKS, [stored.chunk_id])
 
-    mock_jobs = []
-    for job_id, result in zip(job_ids, success_results, strict=False):
-        mock_job = Mock(spec=Job)
-        mock_job.job_id = job_id
-        mock_job.result = AsyncMock(return_value=result)
-        mock_jobs.append(mock_job)
+    result = await persist_chunks(storage_context, [stored, pending], uuid4())
 
-    with patch("src.infra.arq.task_definitions._create_job_reference", side_effect=mock_jobs):
-        results = await _gather_job_results(mock_context, job_ids, "test_operation")
+    assert result.status == KollektivTaskStatus.SUCCESS
+    assert services.vector_db.add_data.await_args.kwargs["chunks"] == [pending]
+    services.data_service.save_chunks.assert_awaited_once_with(chunks=[pending])
+    completed = await checkpoint.completed(source_id, CheckpointStage.CHUNKS, [stored.chunk_id, pending.chunk_id])
+    assert completed == {stored.chunk_id, pending.chunk_id}
 
-        assert len(results) == 3
-        assert all(r.status == KollektivTaskStatus.SUCCESS for r in results)
+    await persist_chunks(storage_context, [stored, pending], uuid4())
+    services.data_service.save_chunks.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_gather_job_results_with_failures(mock_context):
-    """Test gathering results when some jobs fail."""
-    job_ids = [str(uuid4()) for _ in range(3)]
-    mixed_results = [
-        KollektivTaskResult(status=KollektivTaskStatus.SUCCESS, message="Success"),
-        KollektivTaskResult(status=KollektivTaskStatus.FAILED, message="Failed 1"),
-        KollektivTaskResult(status=KollektivTaskStatus.FAILED, message="Failed 2"),
-    ]
-
-    mock_jobs = []
-    for job_id, result in zip(job_ids, mixed_results, strict=False):
-        mock_job = Mock(spec=Job)
-        mock_job.job_id = job_id
-        mock_job.result = AsyncMock(return_value=result)
-        mock_jobs.append(mock_job)
-
-    with patch("src.infra.arq.task_definitions._create_job_reference", side_effect=mock_jobs):
-        with pytest.raises(Exception, match="test_operation failed: 2 out of 3 jobs failed"):
-            await _gather_job_results(mock_context, job_ids, "test_operation")
+async def test_complete_document_batch_aggregates_and_reports(mock_context, success_result, failure_result):
+    """The document batch continuation reports aggregated storage results to the parent fan-in."""
+    with patch("src.infra.arq.task_definitions.FanIn") as mock_fan_in:
+        fan_in = mock_fan_in.return_value
+        fan_in.results = AsyncMock(return_value={"a": success_result, "b": failure_result})
+        fan_in.count_down = AsyncMock()
+        fan_in.delete = AsyncMock()
+
+        result = await complete_document_batch(mock_context, "batch-latch", "parent-latch", "batch-job")
+
+    assert result.status == KollektivTaskStatus.FAILED
+    fan_in.count_down.assert_awaited_once_with("parent-latch", "batch-job", result)
+    fan_in.delete.assert_awaited_once_with("batch-latch")
 
 
 @pytest.mark.asyncio
-async def test_gather_job_results_execution_error(mock_context):
-    """Test gathering results when job execution fails."""
-    job_ids = [str(uuid4())]
-    mock_job = Mock(spec=Job)
-    mock_job.job_id = job_ids[0]
-    mock_job.result = AsyncMock(side_effect=Exception("Execution failed"))
+async def test_complete_document_batch_checkpoints_stored_documents(storage_context, success_result):
+    """Documents of a fully stored batch are checkpointed, so a retry skips them."""
+    source_id, document_ids = uuid4(), [uuid4(), uuid4()]
+    with patch("src.infra.arq.task_definitions.FanIn") as mock_fan_in:
+        fan_in = mock_fan_in.return_value
+        fan_in.results = AsyncMock(return_value={"a": success_result})
+        fan_in.count_down = AsyncMock()
+        fan_in.delete = AsyncMock()
+
+        result = await complete_document_batch(
+            storage_context, "batch-latch", "parent-latch", "batch-job", source_id, document_ids
+        )
 
-    with patch("src.infra.arq.task_definitions._create_job_reference", return_value=mock_job):
-        with pytest.raises(Exception, match="test_operation failed: Execution failed"):
-            await _gather_job_results(mock_context, job_ids, "test_operation")
+    assert result.status == KollektivTaskStatus.SUCCESS
+    checkpoint = IngestionCheckpoint(storage_context["arq_redis"])
+    assert await checkpoint.completed(source_id, CheckpointStage.DOCUMENTS, document_ids) == set(document_ids)
 
 
 @pytest.mark.asyncio
@@ -179,3 +234,58 @@ async def test_publish_event_unexpected_error(mock_context):
 
     assert result.status == KollektivTaskStatus.FAILED
     assert "unexpected error" in result.message
+
+
+@pytest.mark.asyncio
+async def test_handle_webhook_event_retries_until_handled(mock_context):
+    """A failed event is retried, the retry that succeeds completes the job."""
+    services = mock_context["worker_services"]
+    services.content_service.handle_webhook_event = AsyncMock(side_effect=[Exception("Supabase down"), None])
+    event = FireCrawlWebhookEvent(
+        provider=WebhookProvider.FIRECRAWL,
+        data={"type": "crawl.started", "id": "test-crawl-id", "success": True},
+        raw_payload={},
+    )
+
+    mock_context["job_id"] = f"handle_webhook_event:{event.event_id}"
+    with pytest.raises(Retry):
+        await handle_webhook_event(mock_context, event)
+
+    mock_context["job_try"] = 2
+    handled = await handle_webhook_event(mock_context, event)
+    assert handled.status == KollektivTaskStatus.SUCCESS
+    assert "Processed" in handled.message
+    assert (
+        services.content_service.handle_webhook_event.await_args_list
+        == [call(event=event, job_id=f"handle_webhook_event:{event.event_id}")] * 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_webhook_event_retries_failures(mock_context):
+    """A failed event is retried with a growing delay, the job only fails once the retries are used up."""
+    services = mock_context["worker_services"]
+    services.content_service.handle_webhook_event = AsyncMock(side_effect=Exception("Supabase down"))
+    event = FireCrawlWebhookEvent(
+        provider=WebhookProvider.FIRECRAWL,
+        data={"type": "crawl.started", "id": "test-crawl-id", "success": True},
+        raw_payload={},
+    )
+
+    with patch("src.infra.arq.task_definitions.arq_settings") as mock_settings:
+        mock_settings.job_retries = 2
+        mock_settings.webhook_event_retry_delay = 5
+
+        delays = []
+        for job_try in (1, 2):
+            mock_context["job_try"] = job_try
+            with pytest.raises(Retry) as retry:
+                await handle_webhook_event(mock_context, event)
+            delays.append(retry.value.defer_score)
+
+        mock_context["job_try"] = 3
+        failed = await handle_webhook_event(mock_context, event)
+
+    assert delays == [5000, 10000]
+    assert failed.status == KollektivTaskStatus.FAILED
+    assert "Supabase down" in failed.message
@@ -10,8 +10,9 @@ def test_worker_settings_configuration():
     """Test WorkerSettings class has correct configuration."""
     settings = WorkerSettings()
 
-    # Test task configuration
-    assert settings.functions == task_list
+    # Test task configuration, tasks are wrapped to record metrics
+    assert [function.__wrapped__ for function in settings.functions] == task_list
+    assert [function.__name__ for function in settings.functions] == [task.__name__ for task in task_list]
 
     # Test startup/shutdown handlers
     assert callable(settings.on_startup)
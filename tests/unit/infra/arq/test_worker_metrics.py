@@ -0,0 +1,120 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+
+from src.infra.arq.queues import QueueName
+from src.infra.arq.worker_metrics import WorkerMetrics, instrument, metric_field, render_prometheus
+from src.infra.external.backend_limiter import AdaptiveLimiter, Backend
+from src.models.task_models import KollektivTaskResult, KollektivTaskStatus
+
+
+@pytest.fixture
+def metrics():
+    return WorkerMetrics(FakeAsyncRedis(), flush_interval=60)
+
+
+def job_ctx(metrics: WorkerMetrics, job_id: str = "job-1") -> dict:
+    return {"worker_metrics": metrics, "job_id": job_id, "enqueue_time": datetime.now(UTC) - timedelta(seconds=2)}
+
+
+@pytest.mark.asyncio
+async def test_instrumented_tasks_record_outcome_and_timings(metrics):
+    """Runs are counted by outcome, with wait time since enqueue, run time and payload size."""
+    await metrics.redis.set("arq:job:job-1", b"x" * 100)
+
+    @instrument
+    async def task(ctx: dict, status: KollektivTaskStatus) -> KollektivTaskResult:
+        return KollektivTaskResult(status=status, message="done")
+
+    @instrument
+    async def broken(ctx: dict) -> None:
+        raise RuntimeError("boom")
+
+    await task(job_ctx(metrics), KollektivTaskStatus.SUCCESS)
+    await task(job_ctx(metrics, "missing"), KollektivTaskStatus.FAILED)
+    with pytest.raises(RuntimeError):
+        await broken(job_ctx(metrics))
+
+    pending = metrics.pending
+    assert pending[metric_field("jobs_total", function="task", outcome="success")] == 1
+    assert pending[metric_field("jobs_total", function="task", outcome="failed")] == 1
+    assert pending[metric_field("jobs_total", function="broken", outcome="failed")] == 1
+    assert pending[metric_field("job_run_seconds_count", function="task")] == 2
+    assert pending[metric_field("job_wait_seconds_sum", function="task")] >= 4
+    assert pending[metric_field("job_payload_bytes_sum", function="task")] == 100
+    assert pending[metric_field("job_payload_bytes_count", function="task")] == 1
+
+
+@pytest.mark.asyncio
+async def test_tasks_run_without_metrics():
+    """Without metrics in the context the task is called as is."""
+    task = AsyncMock(return_value="result", __name__="task")
+
+    assert await instrument(task)({}, 1) == "result"
+    task.assert_awaited_once_with({}, 1)
+
+
+@pytest.mark.asyncio
+async def test_flush_accumulates_counters_and_sets_queue_depth(metrics):
+    """Flushed counters add up across flushes, queue depth is the current number of queued jobs."""
+    await metrics.redis.zadd(QueueName.BULK.key, {"a": 1, "b": 2})
+    for _ in range(2):
+        metrics.record_job("task", "success", wait_seconds=1.0, run_seconds=0.5, payload_bytes=None)
+        await metrics.flush()
+
+    snapshot = await metrics.snapshot()
+    assert metrics.pending == {}
+    assert snapshot[metric_field("jobs_total", function="task", outcome="success")] == 2
+    assert snapshot[metric_field("job_run_seconds_sum", function="task")] == 1.0
+    assert snapshot[metric_field("queue_depth", queue=QueueName.BULK.value)] == 2
+    assert snapshot[metric_field("queue_depth", queue=QueueName.CONTROL.value)] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counters(metrics):
+    """Counters are kept for the next flush when Redis is unavailable."""
+    metrics.record_job("task", "success", wait_seconds=1.0, run_seconds=0.5, payload_bytes=None)
+    metrics.redis.pipeline = Mock(side_effect=ConnectionError("down"))
+
+    await metrics.flush()
+
+    assert metrics.pending[metric_field("jobs_total", function="task", outcome="success")] == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_publishes_limiter_metrics():
+    """Limiter outcomes add up as counters, in-flight and queued calls are gauges per worker removed on stop."""
+    limiters = {Backend.CHROMA: AdaptiveLimiter("chroma", max_limit=2, latency_target=10)}
+    metrics = WorkerMetrics(FakeAsyncRedis(), flush_interval=60, limiters=limiters, worker="worker-1")
+    limiter = limiters[Backend.CHROMA]
+
+    async with limiter.slot():
+        await metrics.flush()
+        snapshot = await metrics.snapshot()
+        assert snapshot[metric_field("backend_in_flight", backend="chroma", worker="worker-1")] == 1
+        assert snapshot[metric_field("backend_limit", backend="chroma", worker="worker-1")] == 2
+    await metrics.flush()
+    await metrics.flush()
+
+    snapshot = await metrics.snapshot()
+    assert snapshot[metric_field("backend_in_flight", backend="chroma", worker="worker-1")] == 0
+    assert snapshot[metric_field("backend_completed_total", backend="chroma")] == 1
+
+    await metrics.remove_gauges()
+    snapshot = await metrics.snapshot()
+    assert metric_field("backend_in_flight", backend="chroma", worker="worker-1") not in snapshot
+    assert snapshot[metric_field("backend_completed_total", backend="chroma")] == 1
+
+
+def test_render_prometheus():
+    snapshot = {
+        metric_field("jobs_total", function="task", outcome="success"): 3.0,
+        metric_field("job_run_seconds_sum", function="task"): 1.25,
+    }
+
+    assert render_prometheus(snapshot) == (
+        'arq_job_run_seconds_sum{function="task"} 1.25\narq_jobs_total{function="task",outcome="success"} 3\n'
+    )
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from src.infra.external.backend_limiter import AdaptiveLimiter
+
+
+@pytest.mark.asyncio
+async def test_requests_over_the_limit_wait():
+    """No more than `limit` requests run at once, the rest are queued."""
+    limiter = AdaptiveLimiter("test", max_limit=2)
+    release = asyncio.Event()
+    peak = 0
+
+    async def request() -> None:
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await release.wait()
+
+    tasks = [asyncio.create_task(request()) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert limiter.metrics()["in_flight"] == 2
+    assert limiter.metrics()["waiting"] == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert limiter.completed == 5
+    assert limiter.in_flight == limiter.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_back_off_once_per_burst():
+    """Overlapping failures reduce the limit once, later failures reduce it again."""
+    limiter = AdaptiveLimiter("test", max_limit=10, backoff=0.5)
+
+    async def fail() -> None:
+        await asyncio.sleep(0)
+        raise RuntimeError("overloaded")
+
+    results = await asyncio.gather(*(limiter.call(fail) for _ in range(4)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert limiter.limit == 5
+    assert limiter.failed == 4
+
+    with pytest.raises(RuntimeError):
+        await limiter.call(fail)
+    assert limiter.limit == 2.5
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_back_off_and_saturated_successes_recover():
+    """Requests over the latency target reduce the limit, successes at full use grow it back up to max_limit."""
+    limiter = AdaptiveLimiter("test", max_limit=4, min_limit=1, latency_target=0.01, backoff=0.5)
+
+    await limiter.call(asyncio.sleep, 0.02)
+    assert limiter.limit == 2
+    assert limiter.slow == 1
+
+    for _ in range(20):
+        await asyncio.gather(*(limiter.call(asyncio.sleep, 0) for _ in range(4)))
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    """Cancelling a queued request leaves the slot accounting intact."""
+    limiter = AdaptiveLimiter("test", max_limit=1)
+    release = asyncio.Event()
+
+    holder = asyncio.create_task(limiter.call(release.wait))
+    waiter = asyncio.create_task(limiter.call(asyncio.sleep, 0))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.in_flight == limiter.waiting == 0
+    await limiter.call(asyncio.sleep, 0)
+    assert limiter.completed == 2
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError, match="min_limit"):
+        AdaptiveLimiter("test", max_limit=1, min_limit=2)
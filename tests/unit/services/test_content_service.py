@@ -1,19 +1,35 @@
-from unittest.mock import AsyncMock
-from uuid import UUID
+import asyncio
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, Mock
+from uuid import UUID, uuid4
 
 import pytest
+from arq import ArqRedis
+from fakeredis import FakeAsyncRedis
 
 from src.api.v0.schemas.webhook_schemas import FireCrawlEventType, FireCrawlWebhookEvent, WebhookProvider
+from src.infra.arq.claim_check import PayloadStore
+from src.infra.arq.ingestion_lease import IngestionLease
+from src.infra.arq.ingestion_stream import IngestionStream
+from src.infra.arq.queues import queue_for
+from src.infra.arq.serializer import deserialize, serialize
+from src.infra.settings import settings
 from src.models.content_models import (
     AddContentSourceRequest,
     ContentSourceConfig,
     DataSource,
     DataSourceType,
+    Document,
+    DocumentMetadata,
     FireCrawlSourceMetadata,
     SourceStage,
 )
 from src.models.job_models import CrawlJobDetails, Job, JobStatus, JobType
+from src.models.task_models import ClaimCheck
 from src.services.content_service import ContentService
+from src.services.crawl_progress import CrawlProgress
+from src.services.webhook_event_log import WebhookEventLog
+from src.services.webhook_handler import FireCrawlWebhookHandler
 
 
 @pytest.fixture
@@ -110,6 +126,9 @@ class TestContentService:
     async def test_handle_webhook_crawl_completed(self, content_service, mock_dependencies, sample_data_source):
         """Test successful webhook handling for crawl completion."""
         # Setup
+        content_service.arq_redis_pool = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
         job = Job(
             job_id=UUID("00000000-0000-0000-0000-000000000001"),
             status=JobStatus.IN_PROGRESS,
@@ -163,9 +182,362 @@ class TestContentService:
             },
         )
 
+    async def test_duplicate_crawl_completed_attaches_to_running_processing(
+        self, content_service, mock_dependencies, sample_data_source
+    ):
+        """A redelivered completion webhook does not start a second processing run of the same content."""
+        redis = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
+        content_service.arq_redis_pool = redis
+        job = Job(
+            status=JobStatus.IN_PROGRESS,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(
+                source_id=sample_data_source.source_id, firecrawl_id="test-crawl-id", url="https://example.com"
+            ),
+        )
+        mock_dependencies["job_manager"].get_by_firecrawl_id.return_value = job
+        mock_dependencies["job_manager"].create_job.return_value = Job(
+            job_type=JobType.PROCESSING, details={"document_ids": [], "source_id": sample_data_source.source_id}
+        )
+        mock_dependencies["data_service"].get_datasource.return_value = sample_data_source
+        mock_dependencies["crawler"].get_results.side_effect = lambda **_: [
+            Document(
+                source_id=sample_data_source.source_id,
+                content="content",
+                metadata=DocumentMetadata(source_url="https://example.com"),
+            )
+        ]
+
+        # Bypass the webhook event log, which drops the redelivered event before it gets here
+        await content_service._handle_crawl_completed(job)
+        await content_service._handle_crawl_completed(job)
+
+        queue = queue_for("process_documents")
+        (run,) = await redis.queued_jobs(queue_name=queue)
+        mock_dependencies["job_manager"].create_job.assert_awaited_once()
+        mock_dependencies["data_service"].save_documents.assert_awaited_once()
+
+        # Once the run failed and released its lease, a retry runs under a fresh job id, although the failed job
+        # is still known to ARQ
+        fingerprint = run.kwargs["fingerprint"]
+        assert await IngestionLease(redis).release(sample_data_source.source_id, fingerprint, run.job_id)
+        await content_service._handle_crawl_completed(job)
+
+        assert len(await redis.queued_jobs(queue_name=queue)) == 2
+        assert mock_dependencies["job_manager"].create_job.await_count == 2
+
+    async def test_streamed_pages_are_not_processed_again_on_completion(
+        self, content_service, mock_dependencies, sample_data_source, monkeypatch
+    ):
+        """With streaming enabled, only pages that no crawl.page webhook delivered are processed at completion."""
+        monkeypatch.setattr(settings, "ingest_streaming_enabled", True)
+        redis = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
+        content_service.arq_redis_pool = redis
+        job = Job(
+            status=JobStatus.IN_PROGRESS,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(
+                source_id=sample_data_source.source_id, firecrawl_id="test-crawl-id", url="https://example.com"
+            ),
+        )
+
+        def make_documents(urls: list[str]) -> list[Document]:
+            return [
+                Document(
+                    source_id=sample_data_source.source_id,
+                    content=f"content of {url}",
+                    metadata=DocumentMetadata(source_url=url),
+                )
+                for url in urls
+            ]
+
+        mock_dependencies["job_manager"].get_by_firecrawl_id.return_value = job
+        mock_dependencies["job_manager"].create_job.return_value = Job(
+            job_type=JobType.PROCESSING, details={"document_ids": [], "source_id": sample_data_source.source_id}
+        )
+        mock_dependencies["data_service"].get_datasource.return_value = sample_data_source
+        mock_dependencies["crawler"].documents_from_pages = Mock(
+            side_effect=lambda pages, source_id: make_documents([page["url"] for page in pages])
+        )
+        mock_dependencies["crawler"].get_results.side_effect = lambda **_: make_documents(
+            ["https://example.com/a", "https://example.com/b"]
+        )
+
+        for event_type, pages in (
+            (FireCrawlEventType.CRAWL_PAGE, [{"url": "https://example.com/a"}]),
+            (FireCrawlEventType.CRAWL_COMPLETED, []),
+            (FireCrawlEventType.CRAWL_COMPLETED, []),
+        ):
+            await content_service.handle_webhook_event(
+                FireCrawlWebhookEvent(
+                    provider=WebhookProvider.FIRECRAWL,
+                    data={"type": event_type, "id": "test-crawl-id", "success": True, "data": pages},
+                    raw_payload={},
+                )
+            )
+
+        queued = await redis.queued_jobs(queue_name=queue_for("chunk_document_batch"))
+        batches = [job.args[0] for job in queued if job.function == "chunk_document_batch"]
+        assert sorted(document.metadata.source_url for batch in batches for document in batch) == [
+            "https://example.com/a",
+            "https://example.com/b",
+        ]
+        assert len(await redis.queued_jobs(queue_name=queue_for("process_documents"))) == 0
+        mock_dependencies["job_manager"].create_job.assert_awaited_once()
+
+    async def test_streamed_pages_are_released_when_enqueueing_fails(
+        self, content_service, mock_dependencies, sample_data_source
+    ):
+        """A page that could not be enqueued is unclaimed and taken back from the fan-in, so it is not lost."""
+        redis = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
+        content_service.arq_redis_pool = redis
+        source_id = sample_data_source.source_id
+        job = Job(
+            status=JobStatus.IN_PROGRESS,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(source_id=source_id, firecrawl_id="test-crawl-id", url="https://example.com"),
+        )
+        mock_dependencies["data_service"].get_datasource.return_value = sample_data_source
+        mock_dependencies["crawler"].documents_from_pages = Mock(
+            side_effect=lambda pages, source_id: [
+                Document(source_id=source_id, content="content", metadata=DocumentMetadata(source_url=page["url"]))
+                for page in pages
+            ]
+        )
+        pages = [{"url": "https://example.com/a"}]
+        enqueue_job = redis.enqueue_job
+        redis.enqueue_job = AsyncMock(side_effect=ConnectionError("Redis down"))
+
+        with pytest.raises(ConnectionError):
+            await content_service._stream_pages(job, pages)
+
+        stream = IngestionStream(redis)
+        latch_id = await stream.latch(source_id, sample_data_source.user_id)
+        assert int(await redis.get(f"fan_in:{latch_id}:added")) == 0
+
+        redis.enqueue_job = enqueue_job
+        await content_service._stream_pages(job, pages)
+        (queued,) = await redis.queued_jobs(queue_name=queue_for("chunk_document_batch"))
+        assert queued.args[0][0].metadata.source_url == "https://example.com/a"
+        assert queued.args[2] == latch_id
+
+    async def test_spooled_crawl_results_are_processed_by_reference(
+        self, content_service, mock_dependencies, sample_data_source, monkeypatch, tmp_path
+    ):
+        """With spooling enabled, results are saved in batches and processing receives claim checks only."""
+        monkeypatch.setattr(settings, "ingest_spool_enabled", True)
+        monkeypatch.setattr(settings, "ingest_spool_dir", str(tmp_path))
+        monkeypatch.setattr(settings, "ingest_max_documents_per_batch", 2)
+        redis = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
+        content_service.arq_redis_pool = redis
+        job = Job(
+            status=JobStatus.IN_PROGRESS,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(
+                source_id=sample_data_source.source_id, firecrawl_id="test-crawl-id", url="https://example.com"
+            ),
+        )
+        pages = [
+            [
+                Document(
+                    source_id=sample_data_source.source_id,
+                    content=f"content {page}-{i}",
+                    metadata=DocumentMetadata(source_url=f"https://example.com/{page}/{i}"),
+                )
+                for i in range(2)
+            ]
+            for page in range(2)
+        ]
+
+        async def iter_results(**_: object) -> AsyncIterator[list[Document]]:
+            for page in pages:
+                yield page
+
+        mock_dependencies["job_manager"].get_by_firecrawl_id.return_value = job
+        mock_dependencies["job_manager"].create_job.return_value = Job(
+            job_type=JobType.PROCESSING, details={"document_ids": [], "source_id": sample_data_source.source_id}
+        )
+        mock_dependencies["data_service"].get_datasource.return_value = sample_data_source
+        mock_dependencies["crawler"].iter_results = iter_results
+
+        await content_service.handle_webhook_event(
+            FireCrawlWebhookEvent(
+                provider=WebhookProvider.FIRECRAWL,
+                data={"type": FireCrawlEventType.CRAWL_COMPLETED, "id": "test-crawl-id", "success": True},
+                raw_payload={},
+            )
+        )
+
+        documents = [document for page in pages for document in page]
+        (queued,) = await redis.queued_jobs(queue_name=queue_for("process_documents"))
+        assert all(isinstance(claim, ClaimCheck) for claim in queued.args[0])
+        assert await PayloadStore(redis).get_many(queued.args[0]) == documents
+        saved = [call.kwargs["documents"] for call in mock_dependencies["data_service"].save_documents.await_args_list]
+        assert saved == [documents[:2], documents[2:]]
+        updates = mock_dependencies["data_service"].update_datasource.call_args.kwargs["updates"]
+        assert updates["metadata"].total_pages == 4
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_page_count_is_flushed_periodically_and_on_completion(
+        self, content_service, mock_dependencies, sample_data_source
+    ):
+        """Page webhooks count in Redis, the job is updated once per flush interval and with the final count."""
+        content_service.arq_redis_pool = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
+        job = Job(
+            status=JobStatus.IN_PROGRESS,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(
+                source_id=sample_data_source.source_id, firecrawl_id="test-crawl-id", url="https://example.com"
+            ),
+        )
+        mock_dependencies["job_manager"].get_by_firecrawl_id.return_value = job
+        update_job = mock_dependencies["job_manager"].update_job
+
+        def event(event_type: FireCrawlEventType) -> FireCrawlWebhookEvent:
+            return FireCrawlWebhookEvent(
+                provider=WebhookProvider.FIRECRAWL,
+                data={"type": event_type, "id": "test-crawl-id", "success": True},
+                raw_payload={},
+            )
+
+        await asyncio.gather(
+            *(content_service.handle_webhook_event(event(FireCrawlEventType.CRAWL_PAGE)) for _ in range(5))
+        )
+        update_job.assert_awaited_once_with(job_id=job.job_id, updates={"details": {"pages_crawled": 1}})
+
+        await content_service.handle_webhook_event(event(FireCrawlEventType.CRAWL_FAILED))
+        assert update_job.await_args_list[1].kwargs == {
+            "job_id": job.job_id,
+            "updates": {"details": {"pages_crawled": 5}},
+        }
+
+    async def test_page_is_counted_once_when_its_processing_is_retried(
+        self, content_service, mock_dependencies, sample_data_source, monkeypatch
+    ):
+        """A page whose streaming failed is not counted, so the retry of its event counts it once."""
+        monkeypatch.setattr(settings, "ingest_streaming_enabled", True)
+        content_service.arq_redis_pool = FakeAsyncRedis()
+        content_service._stream_pages = AsyncMock(side_effect=[ConnectionError("Redis down"), None])
+        job = Job(
+            status=JobStatus.IN_PROGRESS,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(
+                source_id=sample_data_source.source_id, firecrawl_id="test-crawl-id", url="https://example.com"
+            ),
+        )
+        mock_dependencies["job_manager"].get_by_firecrawl_id.return_value = job
+        event = FireCrawlWebhookEvent(
+            provider=WebhookProvider.FIRECRAWL,
+            data={
+                "type": FireCrawlEventType.CRAWL_PAGE,
+                "id": "test-crawl-id",
+                "success": True,
+                "data": [{"url": "https://example.com/a"}],
+            },
+            raw_payload={},
+        )
+
+        with pytest.raises(ConnectionError):
+            await content_service.handle_webhook_event(event)
+        await content_service.handle_webhook_event(event)
+
+        assert await CrawlProgress(content_service.arq_redis_pool).count(job.job_id) == 1
+
+    async def test_defer_webhook_event_drops_redeliveries(self, content_service):
+        """A deferred webhook is enqueued once, a redelivery of the same payload maps to the same job and is dropped."""
+        redis = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
+        content_service.arq_redis_pool = redis
+        handler = FireCrawlWebhookHandler()
+        raw_payload = {"success": True, "type": "crawl.page", "id": "test-crawl-id", "data": []}
+
+        def receive() -> FireCrawlWebhookEvent:
+            return handler._create_webhook_event(handler._parse_firecrawl_payload(raw_payload), dict(raw_payload))
+
+        event = receive()
+        assert await content_service.defer_webhook_event(event) is True
+        assert await content_service.defer_webhook_event(receive()) is False
+
+        queue = queue_for("handle_webhook_event")
+        assert await redis.zrange(queue, 0, -1) == [f"handle_webhook_event:{event.event_id}".encode()]
+        (job,) = await redis.queued_jobs(queue_name=queue)
+        assert job.function == "handle_webhook_event"
+        assert job.args[0].event_id == event.event_id
+
+    async def test_cancelled_webhook_job_handles_event_when_rerun(self, content_service, mock_dependencies):
+        """A job cancelled mid-event, by a worker shutdown for example, still handles the event when it is re-run."""
+        content_service.arq_redis_pool = FakeAsyncRedis()
+        job = Job(
+            status=JobStatus.PENDING,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(source_id=uuid4(), firecrawl_id="test-crawl-id", url="https://example.com"),
+        )
+        mock_dependencies["job_manager"].get_by_firecrawl_id.return_value = job
+        mock_dependencies["job_manager"].update_job.side_effect = [asyncio.CancelledError(), job]
+        event = FireCrawlWebhookEvent(
+            provider=WebhookProvider.FIRECRAWL,
+            data={"type": FireCrawlEventType.CRAWL_STARTED, "id": "test-crawl-id", "success": True},
+            raw_payload={},
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await content_service.handle_webhook_event(event, job_id="handle_webhook_event:1")
+        await content_service.handle_webhook_event(event, job_id="handle_webhook_event:1")
+
+        assert mock_dependencies["job_manager"].update_job.await_count == 2
+        assert mock_dependencies["data_service"].update_datasource.await_count == 1
+
+    async def test_rebuild_crawl_job_replays_logged_events(self, content_service, mock_dependencies):
+        """A crawl job is rebuilt from the events in its webhook log, a redelivered page is counted once."""
+        content_service.arq_redis_pool = FakeAsyncRedis()
+        job = Job(
+            status=JobStatus.IN_PROGRESS,
+            job_type=JobType.CRAWL,
+            details=CrawlJobDetails(source_id=uuid4(), firecrawl_id="test-crawl-id", url="https://example.com"),
+        )
+        mock_dependencies["job_manager"].get_by_firecrawl_id.return_value = job
+        event_log = WebhookEventLog(content_service.arq_redis_pool)
+
+        def event(event_type: FireCrawlEventType, url: str | None = None) -> FireCrawlWebhookEvent:
+            pages = [{"markdown": "# Page", "metadata": {"sourceURL": url}}] if url else []
+            return FireCrawlWebhookEvent(
+                provider=WebhookProvider.FIRECRAWL,
+                data={"type": event_type, "id": "test-crawl-id", "success": True, "data": pages},
+                raw_payload={},
+            )
+
+        await event_log.record(event(FireCrawlEventType.CRAWL_STARTED))
+        await event_log.record(event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/a"))
+        await event_log.record(event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/a"))
+        await event_log.record(event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/b"))
+        await event_log.record(event(FireCrawlEventType.CRAWL_COMPLETED))
+
+        await content_service.rebuild_crawl_job("test-crawl-id")
+
+        mock_dependencies["job_manager"].get_by_firecrawl_id.assert_awaited_once_with("test-crawl-id")
+        updates = mock_dependencies["job_manager"].update_job.await_args.kwargs["updates"]
+        assert mock_dependencies["job_manager"].update_job.await_args.kwargs["job_id"] == job.job_id
+        assert updates["status"] == JobStatus.COMPLETED
+        assert updates["details"] == {"pages_crawled": 2}
+        assert updates["started_at"] <= updates["completed_at"]
+
     async def test_handle_webhook_crawl_failed(self, content_service, mock_dependencies, sample_data_source):
         """Test webhook handling for crawl failure."""
         # Setup
+        content_service.arq_redis_pool = ArqRedis(
+            connection_pool=FakeAsyncRedis().connection_pool, job_serializer=serialize, job_deserializer=deserialize
+        )
         error_message = "Network error during crawling"
         job = Job(
             job_id=UUID("00000000-0000-0000-0000-000000000001"),
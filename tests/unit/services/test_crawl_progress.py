@@ -0,0 +1,36 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.services.crawl_progress import CrawlProgress
+
+
+@pytest.fixture
+def progress():
+    return CrawlProgress(FakeAsyncRedis(), flush_interval=0.05, ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_pages_are_all_counted(progress):
+    """Concurrent webhooks never lose a page."""
+    job_id = uuid4()
+    assert await progress.count(job_id) is None
+
+    await asyncio.gather(*(progress.increment(job_id) for _ in range(50)))
+
+    assert await progress.count(job_id) == 50
+
+
+@pytest.mark.asyncio
+async def test_flush_is_due_once_per_interval(progress):
+    """Only the first page of every flush interval flushes the count."""
+    job_id = uuid4()
+
+    assert await progress.increment(job_id) == (1, True)
+    assert await progress.increment(job_id) == (2, False)
+    assert await progress.increment(uuid4()) == (1, True)
+
+    await asyncio.sleep(0.06)
+    assert await progress.increment(job_id) == (3, True)
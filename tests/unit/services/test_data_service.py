@@ -0,0 +1,39 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from src.models.content_models import Chunk
+from src.services.data_service import DataService
+
+
+@pytest.mark.asyncio
+async def test_get_chunks_by_source_reads_all_pages():
+    """Chunks beyond the first page are returned, so a reindex does not treat them as stale."""
+    source_id = uuid4()
+    document_id = uuid4()
+    stored = [
+        Chunk(
+            chunk_id=Chunk.stable_id(document_id, position),
+            source_id=source_id,
+            document_id=document_id,
+            headers={"h1": "Title"},
+            text="text",
+            token_count=1,
+            page_title="Title",
+            page_url="https://example.com",
+        )
+        for position in range(5)
+    ]
+
+    async def find(model_class, filters, order_by, limit, offset) -> list[Chunk]:
+        return stored[offset : offset + limit]
+
+    repository = AsyncMock()
+    repository.find = AsyncMock(side_effect=find)
+
+    chunks = await DataService(repository=repository).get_chunks_by_source(source_id, page_size=2)
+
+    assert chunks == stored
+    assert [call.kwargs["offset"] for call in repository.find.await_args_list] == [0, 2, 4]
+    assert {call.kwargs["order_by"] for call in repository.find.await_args_list} == {"chunk_id"}
@@ -0,0 +1,79 @@
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.api.v0.schemas.webhook_schemas import FireCrawlEventType, FireCrawlWebhookEvent, WebhookProvider
+from src.models.job_models import JobStatus
+from src.services.webhook_event_log import WebhookEventLog
+
+
+@pytest.fixture
+def event_log():
+    return WebhookEventLog(FakeAsyncRedis(), ttl=60)
+
+
+def make_event(
+    event_type: FireCrawlEventType, url: str | None = None, error: str | None = None
+) -> FireCrawlWebhookEvent:
+    pages = [{"markdown": "# Page", "metadata": {"sourceURL": url}}] if url else []
+    return FireCrawlWebhookEvent(
+        provider=WebhookProvider.FIRECRAWL,
+        data={"type": event_type, "id": "crawl-1", "success": error is None, "data": pages, "error": error},
+        raw_payload={},
+    )
+
+
+@pytest.mark.asyncio
+async def test_redelivered_events_are_dropped(event_log):
+    """An event is recorded once per crawl, type and page."""
+    assert await event_log.record(make_event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/a"))
+    assert not await event_log.record(make_event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/a"))
+    assert await event_log.record(make_event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/b"))
+    assert await event_log.record(make_event(FireCrawlEventType.CRAWL_COMPLETED))
+    assert not await event_log.record(make_event(FireCrawlEventType.CRAWL_COMPLETED))
+
+    assert [entry["page"] for entry in await event_log.entries("crawl-1")] == [
+        "https://example.com/a",
+        "https://example.com/b",
+        "",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_forgotten_event_is_recorded_again(event_log):
+    """A failed event is handled on redelivery and still replayed once."""
+    event = make_event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/a")
+    await event_log.record(event)
+    await event_log.forget(event)
+
+    assert await event_log.record(event)
+    assert len(await event_log.entries("crawl-1")) == 2
+    assert (await event_log.replay("crawl-1")).pages_crawled == 1
+
+
+@pytest.mark.asyncio
+async def test_rerun_of_the_owning_job_is_not_a_duplicate(event_log):
+    """The job that recorded an event records it again when re-run, any other job drops it."""
+    event = make_event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/a")
+    assert await event_log.record(event, owner="job-1")
+
+    assert await event_log.record(event, owner="job-1")
+    assert not await event_log.record(event, owner="job-2")
+    assert not await event_log.record(event)
+    assert (await event_log.replay("crawl-1")).pages_crawled == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_rebuilds_job_state_from_out_of_order_events(event_log):
+    """Replaying gives the final state even when events arrived late or out of order."""
+    await event_log.record(make_event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/a"))
+    await event_log.record(make_event(FireCrawlEventType.CRAWL_FAILED, error="Blocked"))
+    await event_log.record(make_event(FireCrawlEventType.CRAWL_PAGE, "https://example.com/b"))
+    assert not await event_log.record(make_event(FireCrawlEventType.CRAWL_STARTED))
+
+    replay = await event_log.replay("crawl-1")
+    updates = replay.job_updates()
+
+    assert updates["status"] == JobStatus.FAILED
+    assert updates["error"] == "Blocked"
+    assert updates["details"] == {"pages_crawled": 2}
+    assert updates["started_at"] <= updates["completed_at"]
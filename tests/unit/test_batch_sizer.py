@@ -0,0 +1,75 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+
+from src.core.content.batch_sizer import BatchKind, BatchSizer, pack_batches
+
+
+def weigh(item: tuple[int, int]) -> tuple[int, int]:
+    return item
+
+
+@pytest.mark.unit
+def test_batches_are_cut_by_tokens_bytes_and_count():
+    """A batch ends before the item that would exceed any of the limits."""
+    items = [(10, 1), (10, 1), (10, 1), (1, 50), (1, 1), (1, 1), (1, 1)]
+
+    batches = pack_batches(items, weigh, max_items=3, max_bytes=50, token_budget=25)
+
+    assert batches == [[(10, 1), (10, 1)], [(10, 1)], [(1, 50)], [(1, 1), (1, 1), (1, 1)]]
+
+
+@pytest.mark.unit
+def test_oversized_item_gets_its_own_batch():
+    """An item larger than the budget is not dropped."""
+    assert pack_batches([(100, 1), (1, 1)], weigh, max_items=10, token_budget=10) == [[(100, 1)], [(1, 1)]]
+
+
+@pytest.mark.unit
+def test_without_budgets_batches_are_cut_by_count():
+    assert pack_batches([(1, 1)] * 5, weigh, max_items=2) == [[(1, 1)] * 2, [(1, 1)] * 2, [(1, 1)]]
+
+
+@pytest.mark.unit
+async def test_budget_follows_observed_throughput():
+    """The token budget moves towards the observed throughput and is clamped."""
+    sizer = BatchSizer(
+        target_job_seconds=10,
+        default_throughput={BatchKind.CHUNKING: 100.0},
+        smoothing=0.5,
+        min_tokens=500,
+        max_tokens=5_000,
+    )
+    assert await sizer.token_budget(BatchKind.CHUNKING) == 1_000
+
+    await sizer.record(BatchKind.CHUNKING, tokens=3_000, seconds=10)
+    assert await sizer.token_budget(BatchKind.CHUNKING) == 2_000
+
+    await sizer.record(BatchKind.CHUNKING, tokens=100_000, seconds=1)
+    assert await sizer.token_budget(BatchKind.CHUNKING) == 5_000
+
+
+@pytest.mark.unit
+async def test_throughput_is_shared_through_redis():
+    """Throughput recorded by one worker sizes the batches planned by another."""
+    redis = FakeAsyncRedis()
+    recorder = BatchSizer(redis=redis, target_job_seconds=1, smoothing=1.0)
+    planner = BatchSizer(redis=redis, target_job_seconds=1)
+
+    await recorder.record(BatchKind.PERSISTENCE, tokens=42_000, seconds=1)
+
+    assert await planner.token_budget(BatchKind.PERSISTENCE) == 42_000
+
+
+@pytest.mark.unit
+async def test_redis_errors_fall_back_to_local_estimate():
+    redis = AsyncMock()
+    redis.hget.side_effect = ConnectionError("down")
+    redis.hset.side_effect = ConnectionError("down")
+    sizer = BatchSizer(redis=redis, target_job_seconds=1, default_throughput={BatchKind.PERSISTENCE: 5_000.0})
+
+    await sizer.record(BatchKind.PERSISTENCE, tokens=5_000, seconds=1)
+
+    assert await sizer.token_budget(BatchKind.PERSISTENCE) == 5_000
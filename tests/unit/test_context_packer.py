@@ -0,0 +1,94 @@
+import pytest
+
+from src.core.search.context_packer import ContextPacker
+
+OVERLAP = "shared sentence copied by add_overlap into the next chunk."
+
+
+class WhitespaceTokenizer:
+    """Stand-in for tiktoken that treats every whitespace separated word as a token."""
+
+    def encode(self, text: str) -> list[str]:
+        return text.split()
+
+    def decode(self, tokens: list[str]) -> str:
+        return " ".join(tokens)
+
+
+def make_result(body: str, relevance_score: float, document_id: str | None = "doc-1", token_count=None) -> dict:
+    return {
+        "text": f"Headers: {{'h1': 'Title'}}\n\n Content: {body}",
+        "relevance_score": relevance_score,
+        "document_id": document_id,
+        "token_count": token_count,
+    }
+
+
+@pytest.fixture
+def packer():
+    return ContextPacker(token_budget=1000, min_trim_tokens=10, tokenizer=WhitespaceTokenizer())
+
+
+@pytest.mark.unit
+def test_adjacent_chunks_are_merged_without_overlap(packer):
+    """A chunk continuing another chunk of the same document is merged and its overlap dropped."""
+    first = make_result(f"First part. {OVERLAP}", 0.9)
+    second = make_result(f"{OVERLAP} Second part.", 0.8)
+
+    spans = packer.pack({0: first, 1: second})
+
+    assert len(spans) == 1
+    assert spans[0].body == f"First part. {OVERLAP} Second part."
+    assert spans[0].text.count(OVERLAP) == 1
+    assert spans[0].chunk_indexes == [0, 1]
+
+
+@pytest.mark.unit
+def test_merge_respects_document_order(packer):
+    """The earlier chunk of a document comes first even if it ranked lower."""
+    first = make_result(f"First part. {OVERLAP}", 0.5)
+    second = make_result(f"{OVERLAP} Second part.", 0.9)
+
+    spans = packer.pack({0: second, 1: first})
+
+    assert spans[0].body == f"First part. {OVERLAP} Second part."
+    assert spans[0].relevance_score == 0.9
+
+
+@pytest.mark.unit
+def test_chunks_of_other_documents_are_not_merged(packer):
+    """Overlapping text alone is not enough to merge chunks from different documents."""
+    first = make_result(f"First part. {OVERLAP}", 0.9, document_id="doc-1")
+    second = make_result(f"{OVERLAP} Second part.", 0.8, document_id="doc-2")
+
+    assert len(packer.pack({0: first, 1: second})) == 2
+
+
+@pytest.mark.unit
+def test_pack_uses_precomputed_token_counts_and_trims_last_span():
+    """Spans are selected by their stored token count and the last one is trimmed to the remaining budget."""
+    packer = ContextPacker(token_budget=60, min_trim_tokens=10, tokenizer=WhitespaceTokenizer())
+    results = {
+        0: make_result("relevant " * 10, 0.9, document_id="doc-1", token_count=30),
+        1: make_result("long " * 200, 0.8, document_id="doc-2", token_count=200),
+    }
+
+    spans = packer.pack(results)
+
+    assert len(spans) == 2
+    assert sum(span.token_count for span in spans) <= 60
+    assert len(packer.tokenizer.encode(spans[1].text)) <= spans[1].token_count + 1
+
+
+@pytest.mark.unit
+def test_pack_drops_span_when_remaining_budget_is_too_small():
+    """A span that does not fit is dropped when too little budget remains to trim it."""
+    packer = ContextPacker(token_budget=50, min_trim_tokens=40, tokenizer=WhitespaceTokenizer())
+    results = {
+        0: make_result("relevant", 0.9, document_id="doc-1", token_count=20),
+        1: make_result("long " * 200, 0.8, document_id="doc-2", token_count=200),
+    }
+
+    spans = packer.pack(results)
+
+    assert [span.chunk_indexes for span in spans] == [[0]]
@@ -1,9 +1,11 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+import json
+import time
+from collections.abc import Callable
 from uuid import UUID
 
+import httpx
 import pytest
-from requests.exceptions import HTTPError, Timeout
-from tenacity import RetryError
+from tenacity import RetryError, wait_none
 
 from src.core._exceptions import CrawlerError
 from src.core.content.crawler import FireCrawler
@@ -36,158 +38,211 @@ def test_build_params():
 
 
 # 3. Retry Logic
+@pytest.fixture
+def _no_retry_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FireCrawler._post_crawl.retry, "wait", wait_none())
+
+
+def crawl_handler(requests: list[httpx.Request], status_codes: list[int]) -> Callable[[httpx.Request], httpx.Response]:
+    """Answer crawl submissions with the queued status codes, and with an accepted crawl once they are used up."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        status_code = status_codes.pop(0) if status_codes else 200
+        if status_code != 200:
+            return httpx.Response(status_code, json={"success": False, "error": "stubbed error"})
+        return httpx.Response(200, json={"success": True, "id": "crawl-id", "url": "http://api/crawl/crawl-id"})
+
+    return handler
+
+
 @pytest.mark.asyncio
 @pytest.mark.unit
-@patch("src.core.content.crawler.FirecrawlApp.async_crawl_url")
-async def test_start_crawl_retry_logic(mock_async_crawl_url):
-    """Test that start_crawl retries on retryable errors but gives up after max attempts."""
-    # Setup
-    crawler = FireCrawler(api_key="test_key")
+async def test_start_crawl():
+    """The crawl is submitted with the API key and camelCase parameters."""
+    requests = []
+    crawler = make_crawler(crawl_handler(requests, []))
+    request = CrawlRequest(url="http://example.com", page_limit=10, max_depth=2)
+
+    response = await crawler.start_crawl(request)
+
+    assert response.success
+    assert response.job_id == "crawl-id"
+    assert requests[0].url == "http://api.firecrawl.dev/v1/crawl"
+    assert requests[0].headers["authorization"] == "Bearer test_key"
+    assert json.loads(requests[0].content) == crawler._build_params(request).dict()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+@pytest.mark.usefixtures("_no_retry_wait")
+async def test_start_crawl_retry_logic():
+    """Test that start_crawl retries gateway errors with one idempotency key but gives up after max attempts."""
+    requests, status_codes = [], [502, 503]
+    crawler = make_crawler(crawl_handler(requests, status_codes))
     request = CrawlRequest(url="http://example.com", page_limit=10)
 
-    # Mock the API call to fail with a retryable error
-    mock_async_crawl_url.side_effect = Timeout("Connection timed out")
+    response = await crawler.start_crawl(request)
+    assert response.job_id == "crawl-id"
+    assert len({request.headers["x-idempotency-key"] for request in requests}) == 1
 
     # Test that it eventually gives up after max retries
+    requests.clear()
+    status_codes.extend([502] * 5)
     with pytest.raises(RetryError):
         await crawler.start_crawl(request)
 
     # Verify the number of retry attempts matches settings
-    expected_calls = settings.max_retries
-    assert mock_async_crawl_url.call_count == expected_calls
+    assert len(requests) == settings.max_retries
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+@pytest.mark.usefixtures("_no_retry_wait")
+async def test_start_crawl_retries_network_errors():
+    """Connection errors are retried until the API is reachable."""
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("Connection refused")
+        return httpx.Response(200, json={"success": True, "id": "crawl-id", "url": "http://api/crawl/crawl-id"})
+
+    crawler = make_crawler(handler)
+
+    response = await crawler.start_crawl(CrawlRequest(url="http://example.com", page_limit=10))
+
+    assert response.job_id == "crawl-id"
+    assert len(attempts) == 2
 
 
 # 4. Error Handling
 @pytest.mark.asyncio
 @pytest.mark.unit
-@patch("src.core.content.crawler.FirecrawlApp.async_crawl_url")
-async def test_start_crawl_non_retryable_error(mock_async_crawl_url):
+async def test_start_crawl_non_retryable_error():
     """Test that non-retryable HTTP errors raise CrawlerError immediately."""
-    settings.max_retries = 1
-
-    crawler = FireCrawler(api_key="test_key")
+    requests = []
+    crawler = make_crawler(crawl_handler(requests, [400]))
     request = CrawlRequest(url="http://example.com", page_limit=10, max_depth=2)
 
-    # Mock a 400 error response
-    mock_response = MagicMock()
-    mock_response.status_code = 400
-    http_error = HTTPError("HTTP Error")
-    http_error.response = mock_response
-    mock_async_crawl_url.side_effect = http_error
-
     with pytest.raises(CrawlerError):
         await crawler.start_crawl(request)
 
-    assert mock_async_crawl_url.call_count == 1  # Should fail immediately
+    assert len(requests) == 1  # Should fail immediately
 
 
 # 5. Result Fetching
+def make_page(number: int) -> dict:
+    return {
+        "markdown": f"page {number}",
+        "metadata": {
+            "title": f"Title {number}",
+            "description": f"Desc {number}",
+            "sourceURL": f"http://example.com/{number}",
+            "og:url": f"http://example.com/{number}",
+        },
+    }
+
+
+def make_crawler(handler) -> FireCrawler:
+    """FireCrawler whose result requests are answered by `handler`."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers={"Authorization": "Bearer test_key"})
+    return FireCrawler(api_key="test_key", api_url="http://api.firecrawl.dev/v1", http_client=client)
+
+
 @pytest.mark.asyncio
 @pytest.mark.unit
 async def test_fetch_results_from_url():
     """Test fetching and parsing results from FireCrawl API."""
-    # Setup mock response
-    mock_response = MagicMock()
-    mock_response.json.return_value = {
-        "data": [
-            {
-                "markdown": "test content",
-                "metadata": {
-                    "title": "Test Title",
-                    "description": "Test Description",
-                    "sourceURL": "http://example.com",
-                    "og:url": "http://example.com",
-                },
-            }
-        ],
-        "next": "http://api.firecrawl.dev/v1/crawl/next-page",
-    }
-    mock_response.raise_for_status = MagicMock()
+    requests = []
+    body = {"data": [make_page(1)], "next": "http://api.firecrawl.dev/v1/crawl/next-page"}
 
-    # Create async context manager mock
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=body)
 
-    with patch("httpx.AsyncClient") as mock_async_client:
-        mock_async_client.return_value.__aenter__.return_value = mock_client
+    crawler = make_crawler(handler)
+    test_url = "http://api.firecrawl.dev/v1/crawl/test-page"
 
-        crawler = FireCrawler(api_key="test_key")
-        test_url = "http://api.firecrawl.dev/v1/crawl/test-page"
+    batch_data, next_url = await crawler._fetch_results_from_url(test_url)
 
-        batch_data, next_url = await crawler._fetch_results_from_url(test_url)
+    # Verify response parsing
+    assert batch_data == body
+    assert next_url == "http://api.firecrawl.dev/v1/crawl/next-page"
 
-        # Verify response parsing
-        assert batch_data == mock_response.json.return_value
-        assert next_url == "http://api.firecrawl.dev/v1/crawl/next-page"
-
-        # Verify request parameters
-        mock_client.get.assert_called_once_with(
-            test_url, headers={"Authorization": f"Bearer {crawler.api_key}"}, timeout=30
-        )
+    # Verify request parameters
+    assert [str(request.url) for request in requests] == [test_url]
+    assert requests[0].headers["Authorization"] == f"Bearer {crawler.api_key}"
 
 
 @pytest.mark.asyncio
 @pytest.mark.unit
-async def test_get_results():
+@pytest.mark.parametrize("prefetch", [True, False])
+async def test_get_results(prefetch):
     """Test full get_results flow including pagination and document creation."""
-    # Setup mock responses for pagination
-    responses = [
-        {
-            "data": [
-                {
-                    "markdown": "page 1",
-                    "metadata": {
-                        "title": "Title 1",
-                        "description": "Desc 1",
-                        "sourceURL": "http://example.com/1",
-                        "og:url": "http://example.com/1",
-                    },
-                }
-            ],
-            "next": "http://api.firecrawl.dev/v1/crawl/page2",
-        },
-        {
-            "data": [
-                {
-                    "markdown": "page 2",
-                    "metadata": {
-                        "title": "Title 2",
-                        "description": "Desc 2",
-                        "sourceURL": "http://example.com/2",
-                        "og:url": "http://example.com/2",
-                    },
-                }
-            ],
-            "next": None,
-        },
-    ]
+    pages = {
+        "/v1/crawl/test_job_id": {"data": [make_page(1)], "next": "http://api.firecrawl.dev/v1/crawl/page2"},
+        "/v1/crawl/page2": {"data": [make_page(2)], "next": None},
+    }
+    crawler = make_crawler(lambda request: httpx.Response(200, json=pages[request.url.path]))
+    source_id = UUID("00000000-0000-0000-0000-000000000000")
 
-    mock_responses = []
-    for r in responses:
-        mock_response = MagicMock()
-        mock_response.json.return_value = r
-        mock_response.raise_for_status = MagicMock()
-        mock_responses.append(mock_response)
+    documents = await crawler.get_results("test_job_id", source_id, prefetch=prefetch)
 
-    mock_client = AsyncMock()
-    mock_client.get.side_effect = mock_responses
+    # Verify we got documents from both pages
+    assert len(documents) == 2
+    assert documents[0].content == "page 1"
+    assert documents[1].content == "page 2"
 
-    with patch("httpx.AsyncClient") as mock_async_client:
-        mock_async_client.return_value.__aenter__.return_value = mock_client
+    # Verify source_id was set correctly
+    assert all(doc.source_id == source_id for doc in documents)
 
-        crawler = FireCrawler(api_key="test_key")
-        source_id = UUID("00000000-0000-0000-0000-000000000000")
+    # Verify metadata was created correctly
+    assert documents[0].metadata.title == "Title 1"
+    assert documents[1].metadata.title == "Title 2"
 
-        documents = await crawler.get_results("test_job_id", source_id)
 
-        # Verify we got documents from both pages
-        assert len(documents) == 2
-        assert documents[0].content == "page 1"
-        assert documents[1].content == "page 2"
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_get_results_prefetches_next_page():
+    """The next page is requested before the current page is converted to documents."""
+    events = []
+    pages = {
+        "/v1/crawl/test_job_id": {"data": [make_page(1)], "next": "http://api.firecrawl.dev/v1/crawl/page2"},
+        "/v1/crawl/page2": {"data": [make_page(2)], "next": None},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        events.append(f"fetch {request.url.path}")
+        return httpx.Response(200, json=pages[request.url.path])
+
+    crawler = make_crawler(handler)
+    convert = crawler._get_documents_from_batch
+
+    def record_convert(batch: dict, source_id: UUID) -> list:
+        time.sleep(0.05)  # give the prefetch time to complete while the batch is converted
+        events.append(f"convert {batch['data'][0]['markdown']}")
+        return convert(batch=batch, source_id=source_id)
+
+    crawler._get_documents_from_batch = record_convert
+
+    await crawler.get_results("test_job_id", UUID("00000000-0000-0000-0000-000000000000"))
+
+    assert events == ["fetch /v1/crawl/test_job_id", "fetch /v1/crawl/page2", "convert page 1", "convert page 2"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_http_client_is_reused_and_closed():
+    """Result requests share one pooled client, which is recreated after close."""
+    crawler = FireCrawler(api_key="test_key")
+    client = crawler.http_client
 
-        # Verify source_id was set correctly
-        assert all(doc.source_id == source_id for doc in documents)
+    assert crawler.http_client is client
+    assert client.headers["Authorization"] == "Bearer test_key"
 
-        # Verify metadata was created correctly
-        assert documents[0].metadata.title == "Title 1"
-        assert documents[1].metadata.title == "Title 2"
+    await crawler.close()
+    assert client.is_closed
+    assert crawler.http_client is not client
+    await crawler.close()
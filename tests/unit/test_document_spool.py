@@ -0,0 +1,51 @@
+from uuid import uuid4
+
+import pytest
+
+from src.core.content.document_spool import DocumentSpool
+from src.models.content_models import Document, DocumentMetadata
+
+
+def make_documents(count: int, offset: int = 0) -> list[Document]:
+    source_id = uuid4()
+    return [
+        Document(
+            source_id=source_id,
+            content=f"content {i}",
+            metadata=DocumentMetadata(title=f"Page {i}", source_url=f"https://example.com/{i}"),
+        )
+        for i in range(offset, offset + count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_documents_are_read_back_in_batches(tmp_path):
+    """Appended documents are read back in order and unchanged, in batches of the requested size."""
+    documents = make_documents(5) + make_documents(3, offset=5)
+    async with DocumentSpool(directory=str(tmp_path)) as spool:
+        await spool.append(documents[:5])
+        await spool.append([])
+        await spool.append(documents[5:])
+
+        batches = [batch async for batch in spool.batches(3)]
+
+        assert [len(batch) for batch in batches] == [3, 3, 2]
+        assert [document for batch in batches for document in batch] == documents
+        assert spool.document_ids == [document.document_id for document in documents]
+        assert len(spool) == 8
+        assert spool.size > 0
+
+        # Reading can be repeated
+        assert [document async for batch in spool.batches(10) for document in batch] == documents
+
+
+@pytest.mark.asyncio
+async def test_spool_file_is_removed_on_close(tmp_path):
+    """Closing the spool removes its file, also when closed twice."""
+    spool = DocumentSpool(directory=str(tmp_path))
+    await spool.append(make_documents(2))
+
+    spool.close()
+    spool.close()
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,120 @@
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+
+from src.core.search.query_cache import QueryCache, QueryCacheKind
+from src.infra.arq.worker_metrics import WorkerMetrics
+
+
+@pytest.fixture
+def cache():
+    return QueryCache(redis_manager=None, max_size=2, expansion_ttl=60, embedding_ttl=60, enabled=True)
+
+
+@pytest.mark.unit
+async def test_expansions_are_cached_by_normalized_query(cache):
+    """Queries differing only in case and whitespace share the cached expansion."""
+    generate = AsyncMock(return_value=["a", "b"])
+
+    first = await cache.get_or_generate_expansions("What is RAG?", "model", 3, generate)
+    second = await cache.get_or_generate_expansions("  what   is rag? ", "model", 3, generate)
+
+    assert first == second == ["a", "b"]
+    generate.assert_awaited_once()
+    assert cache.stats["expansion_miss"] == 1
+    assert cache.stats["expansion_local_hit"] == 1
+    assert cache.hit_rate(QueryCacheKind.EXPANSION) == 0.5
+
+
+@pytest.mark.unit
+async def test_expansion_cache_key_includes_model(cache):
+    """Expansions of another model are not reused."""
+    generate = AsyncMock(return_value=["a"])
+
+    await cache.get_or_generate_expansions("query", "model-a", 3, generate)
+    await cache.get_or_generate_expansions("query", "model-b", 3, generate)
+
+    assert generate.await_count == 2
+
+
+@pytest.mark.unit
+async def test_bypass_skips_cache(cache):
+    """A bypassed lookup always generates and does not populate the cache."""
+    generate = AsyncMock(return_value=["a"])
+
+    await cache.get_or_generate_expansions("query", "model", 3, generate, use_cache=False)
+    await cache.get_or_generate_expansions("query", "model", 3, generate)
+
+    assert generate.await_count == 2
+    assert cache.stats["expansion_bypass"] == 1
+
+
+@pytest.mark.unit
+async def test_embeddings_only_embed_missing_texts(cache):
+    """Only texts without a cached embedding are sent to the embedding function."""
+    embed = Mock(side_effect=lambda texts: [[float(len(text))] for text in texts])
+
+    await cache.get_or_embed(["one"], "model", embed)
+    embeddings = await cache.get_or_embed(["one", "three"], "model", embed)
+
+    assert embeddings == [[3.0], [5.0]]
+    assert [call.args[0] for call in embed.call_args_list] == [["one"], ["three"]]
+
+
+@pytest.mark.unit
+async def test_local_cache_evicts_least_recently_used(cache):
+    """The local LRU keeps at most max_size entries."""
+    embed = Mock(side_effect=lambda texts: [[1.0] for _ in texts])
+
+    await cache.get_or_embed(["a", "b", "c"], "model", embed)
+    await cache.get_or_embed(["a"], "model", embed)
+
+    assert embed.call_count == 2
+
+
+@pytest.mark.unit
+async def test_redis_hits_are_promoted_and_redis_errors_are_misses():
+    """Values found in Redis are used without embedding; Redis failures fall back to embedding."""
+    client = AsyncMock()
+    client.mget.return_value = [json.dumps([0.5]), None]
+    redis_manager = Mock()
+    redis_manager.get_async_client = AsyncMock(return_value=client)
+    cache = QueryCache(redis_manager=redis_manager, max_size=10, expansion_ttl=60, embedding_ttl=60, enabled=True)
+    embed = Mock(return_value=[[2.0]])
+    client.pipeline = Mock(side_effect=ConnectionError("down"))
+
+    embeddings = await cache.get_or_embed(["cached", "new"], "model", embed)
+
+    assert embeddings == [[0.5], [2.0]]
+    embed.assert_called_once_with(["new"])
+    assert cache.stats["embedding_redis_hit"] == 1
+
+    client.mget.side_effect = ConnectionError("down")
+    assert await cache.get_or_embed(["other"], "model", embed) == [[2.0]]
+
+
+@pytest.mark.unit
+async def test_lookups_are_flushed_to_the_metrics_hash():
+    """Lookup counts are added to the shared metrics hash, so they are scraped with the worker metrics."""
+    redis = FakeAsyncRedis()
+    redis_manager = Mock()
+    redis_manager.get_async_client = AsyncMock(return_value=redis)
+    cache = QueryCache(redis_manager=redis_manager, max_size=10, expansion_ttl=60, embedding_ttl=60, enabled=True)
+    embed = Mock(side_effect=lambda texts: [[1.0] for _ in texts])
+
+    await cache.get_or_embed(["one", "two"], "model", embed)
+    await cache.get_or_embed(["one"], "model", embed)
+    await cache.get_or_embed(["one"], "model", embed, use_cache=False)
+    await cache.flush_stats()
+    await cache.flush_stats()
+
+    snapshot = await WorkerMetrics(redis=redis).snapshot()
+    assert snapshot == {
+        "query_cache_lookups_total;kind=embedding;outcome=miss": 2,
+        "query_cache_lookups_total;kind=embedding;outcome=local_hit": 1,
+        "query_cache_lookups_total;kind=embedding;outcome=bypass": 1,
+    }
+    assert not cache.pending
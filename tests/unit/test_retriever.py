@@ -0,0 +1,83 @@
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+import pytest
+
+from src.core.search.rerank_policy import RerankDecision, RerankPolicy
+from src.core.search.retriever import Retriever
+
+
+def make_documents(*distances: float) -> dict[str, dict]:
+    return {f"chunk-{i}": {"text": f"text {i}", "distance": distance} for i, distance in enumerate(distances)}
+
+
+@pytest.fixture
+def policy():
+    return RerankPolicy(enabled=True, max_candidates=2, min_distance_gap=0.25, latency_budget_ms=500, max_distance=1.0)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("distances", "elapsed_ms", "top_n", "expected"),
+    [
+        ((0.3, 0.4), 0, None, RerankDecision.SKIP_FEW_CANDIDATES),
+        ((0.3, 0.4), 0, 2, RerankDecision.SKIP_FEW_CANDIDATES),
+        ((0.3, 0.4), 0, 1, RerankDecision.RERANK),
+        ((0.6, 0.1, 0.9), 0, None, RerankDecision.SKIP_DISTANCE_GAP),
+        ((0.6, 0.1, 0.9, 0.95), 0, 2, RerankDecision.SKIP_DISTANCE_GAP),
+        ((0.6, 0.1, 0.65), 0, None, RerankDecision.RERANK),
+        ((0.6, 0.1, 0.65), 0, 2, RerankDecision.RERANK),
+        ((0.3, 0.35, 0.4), 600, None, RerankDecision.SKIP_LATENCY_BUDGET),
+        ((0.3, 0.35, 0.4), 10, None, RerankDecision.RERANK),
+    ],
+)
+def test_rerank_policy_decisions(policy, distances, elapsed_ms, top_n, expected):
+    """Each skip rule fires on its own condition and anything else is reranked.
+
+    Few candidates are only decisive when all of them are returned. The distance gap must separate every returned
+    result from the next one, not just the best from the runner-up.
+    """
+    assert policy.decide(make_documents(*distances), elapsed_ms, top_n=top_n) == expected
+
+
+@pytest.mark.unit
+def test_rerank_policy_disabled_always_reranks():
+    """A disabled policy never skips."""
+    policy = RerankPolicy(enabled=False)
+
+    assert policy.decide(make_documents(0.1), elapsed_ms=0) == RerankDecision.RERANK
+
+
+@pytest.mark.unit
+def test_rerank_policy_tracks_skip_rate(policy):
+    """Decisions are counted so the skip rate can be reported."""
+    policy.decide(make_documents(0.1), elapsed_ms=0)
+    policy.decide(make_documents(0.3, 0.35, 0.4), elapsed_ms=0)
+
+    assert policy.stats[RerankDecision.SKIP_FEW_CANDIDATES] == 1
+    assert policy.stats[RerankDecision.RERANK] == 1
+    assert policy.skip_rate == 0.5
+
+
+@pytest.mark.unit
+async def test_retrieve_skips_reranker_for_decisive_results(policy):
+    """A decisive vector result is returned in distance order without calling Cohere."""
+    vector_db = Mock()
+    vector_db.query = AsyncMock(return_value={"documents": [["a", "b", "c"]]})
+    vector_db.deduplicate_documents.return_value = make_documents(0.6, 0.1, 0.9)
+    reranker = Mock()
+    retriever = Retriever(vector_db=vector_db, reranker=reranker, rerank_policy=policy)
+
+    results = await retriever.retrieve("query", ["query"], top_n=2, user_id=uuid4())
+
+    reranker.rerank.assert_not_called()
+    assert list(results) == [1, 0]
+    assert results[1]["text"] == "text 1"
+
+
+@pytest.mark.unit
+def test_rank_by_distance_drops_irrelevant_results(policy):
+    """Without a rerank, results farther than the maximum distance are dropped."""
+    results = policy.rank_by_distance(make_documents(1.1, 0.2, 0.9))
+
+    assert list(results) == [1, 2]
@@ -0,0 +1,231 @@
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+import pytest
+
+from src.core.search.collection_migrator import CollectionMigrator
+from src.core.search.query_cache import QueryCache
+from src.core.search.vector_db import VectorDatabase
+from src.models.content_models import Chunk
+from src.models.vector_models import (
+    CohereEmbeddingModelName,
+    CollectionLayout,
+    EmbeddingProvider,
+    VectorCollection,
+)
+
+
+def make_chunk(source_id, chunk_id=None) -> Chunk:
+    return Chunk(
+        chunk_id=chunk_id or uuid4(),
+        source_id=source_id,
+        document_id=uuid4(),
+        headers={"h1": "Header"},
+        text="Chunk text",
+        content="Headers: {'h1': 'Header'}\n\n Content: Chunk text",
+        token_count=3,
+        page_title="Page",
+        page_url="https://example.com",
+    )
+
+
+def paged(ids: list[str]):
+    """Answer collection.get calls with the page of `ids` at their limit and offset."""
+
+    async def get(where, limit, offset, include) -> dict[str, list[str]]:
+        return {"ids": ids[offset : offset + limit]}
+
+    return get
+
+
+@pytest.fixture
+def mock_collection():
+    collection = AsyncMock()
+    collection.name = "test-collection"
+    return collection
+
+
+@pytest.fixture
+def vector_db(mock_collection):
+    db = VectorDatabase(chroma_manager=Mock(), embedding_manager=Mock(), data_service=Mock(), batch_size=2)
+    db.get_or_create_collection = AsyncMock(return_value=mock_collection)
+    return db
+
+
+@pytest.fixture
+def sharded_vector_db(mock_collection):
+    db = VectorDatabase(
+        chroma_manager=Mock(),
+        embedding_manager=Mock(),
+        data_service=Mock(),
+        batch_size=2,
+        layout=CollectionLayout.SHARDED,
+        shard_count=4,
+    )
+    db.get_or_create_collection = AsyncMock(return_value=mock_collection)
+    return db
+
+
+@pytest.mark.unit
+async def test_delete_source_deletes_in_batches(vector_db, mock_collection):
+    """Only the source's ids are deleted, split into batches."""
+    source_id = uuid4()
+    mock_collection.get.side_effect = paged(["a", "b", "c"])
+
+    deleted = await vector_db.delete_source(user_id=uuid4(), source_id=source_id)
+
+    assert deleted == 3
+    assert [call.kwargs for call in mock_collection.get.await_args_list] == [
+        {"where": {"source_id": str(source_id)}, "limit": 2, "offset": offset, "include": []} for offset in (0, 2)
+    ]
+    assert [call.kwargs["ids"] for call in mock_collection.delete.await_args_list] == [["a", "b"], ["c"]]
+
+
+@pytest.mark.unit
+async def test_delete_source_without_vectors(vector_db, mock_collection):
+    """Deleting a source with no vectors is a no-op."""
+    mock_collection.get.return_value = {"ids": []}
+
+    deleted = await vector_db.delete_source(user_id=uuid4(), source_id=uuid4())
+
+    assert deleted == 0
+    mock_collection.delete.assert_not_awaited()
+
+
+@pytest.mark.unit
+async def test_replace_source_upserts_then_deletes_stale(vector_db, mock_collection):
+    """New chunks are upserted first and only stale ids are removed afterwards."""
+    source_id = uuid4()
+    kept = make_chunk(source_id)
+    new = make_chunk(source_id)
+    mock_collection.get.side_effect = paged([str(kept.chunk_id), "stale-1", "stale-2"])
+
+    calls = []
+    mock_collection.upsert.side_effect = lambda **kwargs: calls.append("upsert")
+    mock_collection.delete.side_effect = lambda **kwargs: calls.append("delete")
+
+    deleted = await vector_db.replace_source(user_id=uuid4(), source_id=source_id, chunks=[kept, new])
+
+    assert deleted == 2
+    assert calls == ["upsert", "delete"]
+    upserted_ids = mock_collection.upsert.await_args.kwargs["ids"]
+    assert upserted_ids == [str(kept.chunk_id), str(new.chunk_id)]
+    assert mock_collection.delete.await_args.kwargs["ids"] == ["stale-1", "stale-2"]
+
+
+@pytest.mark.unit
+async def test_replace_source_rejects_foreign_chunks(vector_db, mock_collection):
+    """Chunks of another source cannot be used to replace a source."""
+    with pytest.raises(ValueError, match="must belong to source"):
+        await vector_db.replace_source(user_id=uuid4(), source_id=uuid4(), chunks=[make_chunk(uuid4())])
+
+    mock_collection.upsert.assert_not_awaited()
+    mock_collection.delete.assert_not_awaited()
+
+
+@pytest.mark.unit
+def test_sharded_collection_name_is_stable():
+    """Users map deterministically onto a bounded set of shard collections."""
+    user_id = uuid4()
+    collection = VectorCollection(user_id=user_id, layout=CollectionLayout.SHARDED, shard_count=4)
+
+    assert collection.is_shared
+    assert 0 <= collection.shard < 4
+    assert collection.name == f"shard_{collection.shard:04d}"
+    assert VectorCollection(user_id=user_id, layout=CollectionLayout.SHARDED, shard_count=4).name == collection.name
+    assert VectorCollection(user_id=user_id).name == str(user_id)
+
+
+@pytest.mark.unit
+def test_collection_layout_is_not_persisted():
+    """The layout comes from the settings, it is not part of the stored collection."""
+    collection = VectorCollection(user_id=uuid4(), layout=CollectionLayout.SHARDED, shard_count=4)
+
+    assert "layout" not in collection.model_dump(mode="json", by_alias=True)
+    assert "shard_count" not in collection.model_dump(mode="json", by_alias=True)
+
+
+@pytest.mark.unit
+async def test_migrator_lists_sharded_users_page_by_page():
+    """Users of a shard are discovered with paginated reads instead of a single read of the whole shard."""
+    user_ids = [uuid4() for _ in range(3)]
+    metadatas = [{"user_id": str(user_id)} for user_id in user_ids for _ in range(2)]
+
+    async def get(limit, offset, include) -> dict:
+        page = metadatas[offset : offset + limit]
+        return {"ids": [str(i) for i in range(offset, offset + len(page))], "metadatas": page}
+
+    shard = AsyncMock()
+    shard.get = AsyncMock(side_effect=get)
+    client = AsyncMock()
+    client.list_collections.return_value = ["shard_0000", "other"]
+    client.get_collection.return_value = shard
+    migrator = CollectionMigrator(
+        client=client,
+        source_layout=CollectionLayout.SHARDED,
+        target_layout=CollectionLayout.PER_USER,
+        shard_count=4,
+        batch_size=4,
+    )
+
+    assert await migrator.list_user_ids() == sorted(user_ids)
+    assert [call.kwargs["offset"] for call in shard.get.await_args_list] == [0, 4, 6]
+    client.get_collection.assert_awaited_once_with("shard_0000")
+
+
+@pytest.mark.unit
+async def test_sharded_query_is_filtered_by_user(sharded_vector_db, mock_collection):
+    """Queries against a shared collection only see the user's vectors."""
+    user_id = uuid4()
+
+    await sharded_vector_db.query(user_id=user_id, user_query="question")
+
+    assert mock_collection.query.await_args.kwargs["where"] == {"user_id": str(user_id)}
+
+
+@pytest.mark.unit
+async def test_sharded_delete_source_filters_by_user_and_source(sharded_vector_db, mock_collection):
+    """Source deletes in a shared collection are scoped to both the user and the source."""
+    user_id, source_id = uuid4(), uuid4()
+    mock_collection.get.side_effect = paged(["a"])
+
+    await sharded_vector_db.delete_source(user_id=user_id, source_id=source_id)
+
+    mock_collection.get.assert_awaited_once_with(
+        where={"$and": [{"user_id": str(user_id)}, {"source_id": str(source_id)}]}, limit=2, offset=0, include=[]
+    )
+
+
+@pytest.mark.unit
+async def test_sharded_delete_collection_keeps_shared_collection(sharded_vector_db, mock_collection):
+    """Deleting a user's data in the sharded layout removes vectors, not the shared collection."""
+    user_id = uuid4()
+    mock_collection.get.side_effect = paged(["a", "b", "c"])
+
+    await sharded_vector_db.delete_collection(user_id)
+
+    assert [call.kwargs["offset"] for call in mock_collection.get.await_args_list] == [0, 2]
+    assert mock_collection.get.await_args.kwargs["where"] == {"user_id": str(user_id)}
+    assert [call.kwargs["ids"] for call in mock_collection.delete.await_args_list] == [["a", "b"], ["c"]]
+    sharded_vector_db.chroma_manager.get_async_client.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_query_embeds_with_the_embedding_manager_and_caches(mock_collection):
+    """Query texts are embedded by the embedding manager's function once, later queries use the cached embeddings."""
+    embedding_function = Mock(side_effect=lambda texts: [[0.5, 0.5] for _ in texts])
+    embedding_manager = Mock(provider=EmbeddingProvider.COHERE, model=CohereEmbeddingModelName.BASE_ENG)
+    embedding_manager.get_embedding_function.return_value = embedding_function
+    db = VectorDatabase(
+        chroma_manager=Mock(),
+        embedding_manager=embedding_manager,
+        data_service=Mock(),
+        query_cache=QueryCache(redis_manager=None, max_size=10, expansion_ttl=60, embedding_ttl=60, enabled=True),
+    )
+    db.get_or_create_collection = AsyncMock(return_value=mock_collection)
+
+    await db.query(user_id=uuid4(), user_query=["first", "second"])
+    await db.query(user_id=uuid4(), user_query=["first"])
+
+    embedding_function.assert_called_once_with(["first", "second"])
+    assert mock_collection.query.await_args.kwargs["query_embeddings"] == [[0.5, 0.5]]